@@ -1,32 +1,68 @@
-from crewai import Agent
-from langchain.chat_models import ChatOpenAI
 import os
 from dotenv import load_dotenv
-import openai
+from .prompts import (
+    EXTRACTION_BACKSTORY,
+    EXTRACTION_GOAL,
+    EXTRACTION_ROLE,
+    PROJECT_RECOMMENDER_BACKSTORY,
+    PROJECT_RECOMMENDER_GOAL,
+    PROJECT_RECOMMENDER_ROLE,
+    RESUME_ANALYZER_BACKSTORY,
+    RESUME_ANALYZER_GOAL,
+    RESUME_ANALYZER_ROLE,
+)
+from utils.llm import openai_chat_completion
+from utils.providers import get_openai_client
+from utils.structured_output import openai_json_kwargs
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# CrewAI agents and crews print every step to stdout when verbose
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
+# crewai is imported where agents are built: it is slow to import and only used in crew mode
 
 # Use a simple wrapper for crewai that doesn't rely on LangChain
 class SimpleOpenAIWrapper:
-    def __init__(self, client, model_name="gpt-3.5-turbo", temperature=0.7):
-        self.client = client
+    def __init__(self, client=None, model_name="gpt-3.5-turbo", temperature=0.7):
+        self._client = client
         self.model_name = model_name
         self.temperature = temperature
+
+    @property
+    def client(self):
+        # Without an explicit client, use the shared one, created on first use
+        return self._client or get_openai_client()
         
     def __call__(self, prompt):
-        response = self.client.chat.completions.create(
+        content, _ = self.complete(prompt)
+        return content
+
+    def complete(self, prompt, system_prompt=None, json_mode=False):
+        """
+        Run a single chat completion and return (content, token usage).
+        """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        extra_kwargs = openai_json_kwargs() if json_mode else {}
+        response = openai_chat_completion(
+            self.client,
             model=self.model_name,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=self.temperature
+            messages=messages,
+            temperature=self.temperature,
+            **extra_kwargs
         )
-        return response.choices[0].message.content
+        usage = getattr(response, "usage", None)
+        return response.choices[0].message.content, {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        }
 
 # Initialize our custom LLM wrapper
-llm = SimpleOpenAIWrapper(openai_client)
+llm = SimpleOpenAIWrapper()
 
 class JobSkillAgents:
     def __init__(self):
@@ -36,14 +72,12 @@ class JobSkillAgents:
         """
         Creates an agent specialized in extracting skills and responsibilities from job descriptions.
         """
+        from crewai import Agent
         return Agent(
-            role="Job Description Analyzer",
-            goal="Extract all relevant skills, responsibilities, and requirements from job descriptions",
-            backstory="""You are an expert in analyzing job descriptions and identifying key skills, 
-            responsibilities, and requirements. You have years of experience in HR and recruitment, 
-            and you understand the nuances of job postings across different industries. Your expertise 
-            allows you to accurately identify both technical and soft skills from any job description.""",
-            verbose=True,
+            role=EXTRACTION_ROLE,
+            goal=EXTRACTION_GOAL,
+            backstory=EXTRACTION_BACKSTORY,
+            verbose=CREW_VERBOSE,
             llm=self.llm,
             allow_delegation=False
         )
@@ -52,14 +86,12 @@ class JobSkillAgents:
         """
         Creates an agent specialized in analyzing resumes and identifying skills.
         """
+        from crewai import Agent
         return Agent(
-            role="Resume Analyzer",
-            goal="Extract skills from resumes and identify gaps compared to job requirements",
-            backstory="""You are an expert resume analyst with years of experience in career counseling. 
-            You excel at identifying skills from resumes and understanding how they match or don't match 
-            with job requirements. Your guidance has helped thousands of job seekers improve their resumes 
-            and land their dream jobs.""",
-            verbose=True,
+            role=RESUME_ANALYZER_ROLE,
+            goal=RESUME_ANALYZER_GOAL,
+            backstory=RESUME_ANALYZER_BACKSTORY,
+            verbose=CREW_VERBOSE,
             llm=self.llm,
             allow_delegation=True
         )
@@ -68,14 +100,12 @@ class JobSkillAgents:
         """
         Creates an agent specialized in recommending projects based on skill gaps.
         """
+        from crewai import Agent
         return Agent(
-            role="Project Recommender",
-            goal="Recommend personalized projects to help job seekers build missing skills",
-            backstory="""You are a career development expert who specializes in recommending practical 
-            projects that help people build job-relevant skills. You have a deep understanding of what 
-            employers look for and how candidates can demonstrate their abilities through projects. 
-            Your recommendations are always tailored to the individual's skill gaps and career goals.""",
-            verbose=True,
+            role=PROJECT_RECOMMENDER_ROLE,
+            goal=PROJECT_RECOMMENDER_GOAL,
+            backstory=PROJECT_RECOMMENDER_BACKSTORY,
+            verbose=CREW_VERBOSE,
             llm=self.llm,
             allow_delegation=True
         )
@@ -1,58 +1,176 @@
-from crewai import Crew
-from .agents import JobSkillAgents
+import os
+import queue
+from contextlib import contextmanager
+
+from .agents import CREW_VERBOSE, JobSkillAgents
 from .tasks import JobSkillTasks
-import json
+from .prompts import EXTRACTION_PROMPT, PROJECT_RECOMMENDATION_PROMPT, RESUME_ANALYSIS_PROMPT
+from .pipeline import (
+    EXTRACTION_STEP,
+    PIPELINE_MODE,
+    PROJECT_RECOMMENDATION_STEP,
+    RESUME_ANALYSIS_STEP,
+    PipelineEngine,
+    UsageStats,
+)
+from utils.structured_output import (
+    JobExtraction,
+    ProjectRecommendationList,
+    ResumeAnalysis,
+    StructuredOutputError,
+    parse_structured,
+    to_jsonable,
+)
+from utils.cancellation import check_cancelled
+from utils.tracing import start_span
+
+# Number of prebuilt crews kept per task in crew mode
+CREW_POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", "2"))
+
+
+class CrewPool:
+    """
+    Pool of prebuilt single-task crews.
+
+    Building an Agent, Task and Crew is paid once per pooled crew instead of on
+    every request. A checked-out crew is used by one request at a time; if the
+    pool is empty an extra crew is built, and it is kept if there is room.
+    """
+
+    def __init__(self, factory, size=CREW_POOL_SIZE):
+        self._factory = factory
+        self._crews = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._crews.put(factory())
+
+    @contextmanager
+    def checkout(self):
+        try:
+            crew = self._crews.get_nowait()
+        except queue.Empty:
+            crew = self._factory()
+        try:
+            yield crew
+        finally:
+            try:
+                self._crews.put_nowait(crew)
+            except queue.Full:
+                pass
+
 
 class JobSkillCrew:
-    def __init__(self):
+    def __init__(self, mode=None):
         self.agents = JobSkillAgents()
         self.tasks = JobSkillTasks()
+        self.mode = (mode or PIPELINE_MODE).lower()
+        self.usage = UsageStats()
+        self.pipeline = PipelineEngine(self.agents.llm, usage=self.usage)
+        self.pools = {}
+        if self.mode == "crew":
+            self.pools = {
+                "extraction": CrewPool(lambda: self._build_crew(
+                    self.agents.create_extraction_agent, self.tasks.extraction_task, "")),
+                "resume_analysis": CrewPool(lambda: self._build_crew(
+                    self.agents.create_resume_analyzer_agent, self.tasks.resume_analysis_task, "", {})),
+                "project_recommendation": CrewPool(lambda: self._build_crew(
+                    self.agents.create_project_recommendation_agent, self.tasks.project_recommendation_task, [], [])),
+            }
+
+    def _build_crew(self, create_agent, create_task, *task_inputs):
+        """
+        Build a single-agent, single-task crew; the task description is set per request.
+        """
+        from crewai import Crew
+        agent = create_agent()
+        task = create_task(agent, *task_inputs)
+        return Crew(
+            agents=[agent],
+            tasks=[task],
+            verbose=CREW_VERBOSE,
+            # Stop between agent steps once the request is cancelled (the callback runs in the kickoff thread)
+            step_callback=lambda step: check_cancelled()
+        )
+
+    @staticmethod
+    def _usage_counts(metrics):
+        """
+        (prompt tokens, completion tokens, calls) of CrewAI usage metrics, or None without them.
+        """
+        if isinstance(metrics, dict):
+            return (metrics.get('prompt_tokens', 0), metrics.get('completion_tokens', 0),
+                    metrics.get('successful_requests', 1))
+        if metrics is not None:
+            return (getattr(metrics, 'prompt_tokens', 0), getattr(metrics, 'completion_tokens', 0),
+                    getattr(metrics, 'successful_requests', 1))
+        return None
+
+    def _kickoff(self, crew):
+        """
+        Run a crew and record its token usage.
+        """
+        check_cancelled()
+        with start_span("crew.kickoff", attributes={"crew.agent": crew.agents[0].role}) as span:
+            # A pooled crew's usage_metrics accumulate across kickoffs, so without the
+            # result's own token_usage only this kickoff's increase is recorded
+            before = self._usage_counts(getattr(crew, 'usage_metrics', None)) or (0, 0, 0)
+            result = crew.kickoff()
+            counts = self._usage_counts(getattr(result, 'token_usage', None))
+            if counts is None:
+                after = self._usage_counts(getattr(crew, 'usage_metrics', None))
+                if after is None:
+                    return result
+                counts = tuple(max(0, total - previous) for total, previous in zip(after, before))
+            prompt_tokens, completion_tokens, calls = counts
+            self.usage.record(prompt_tokens, completion_tokens, calls=calls)
+            span.set_attributes({
+                "llm.prompt_tokens": prompt_tokens,
+                "llm.completion_tokens": completion_tokens,
+                "llm.calls": calls,
+            })
+        return result
+
+    def _parse_result(self, result, schema):
+        """
+        Extract the output content from a CrewAI result and validate it against a schema.
+        """
+        # For CrewOutput objects, the content is stored as a string in result.raw
+        if hasattr(result, 'raw'):
+            output_content = result.raw
+        # For older versions, it might be in result.raw_output
+        elif hasattr(result, 'raw_output'):
+            output_content = result.raw_output
+        # For TaskOutput objects, it might be in result.output
+        elif hasattr(result, 'output'):
+            output_content = result.output
+        # If we can't find a known attribute, convert to string
+        else:
+            output_content = str(result)
+
+        if not isinstance(output_content, str):
+            # Return the output content directly
+            return output_content
+
+        try:
+            return to_jsonable(parse_structured(output_content, schema))
+        except StructuredOutputError:
+            # If no valid JSON matching the schema was found, return as raw text
+            return {"raw_text": output_content}
     
     def process_job_description(self, job_description):
         """
         Process a job description to extract skills and requirements.
         """
-        # Create the extraction agent
-        extraction_agent = self.agents.create_extraction_agent()
-        
-        # Create the extraction task
-        extraction_task = self.tasks.extraction_task(extraction_agent, job_description)
-        
-        # Create and run the crew with just the extraction agent and task
-        crew = Crew(
-            agents=[extraction_agent],
-            tasks=[extraction_task],
-            verbose=True
-        )
-        
-        # Run the crew and get the result
-        result = crew.kickoff()
+        if self.mode == "direct":
+            return self.pipeline.run(EXTRACTION_STEP, job_description=job_description)
+
+        # Run the extraction task on a pooled crew with the rendered prompt
+        with self.pools["extraction"].checkout() as crew:
+            crew.tasks[0].description = EXTRACTION_PROMPT.render(job_description=job_description)
+            result = self._kickoff(crew)
         
         # Extract the actual output content from the CrewAI result
         try:
-            # For CrewOutput objects, the content is stored as a string in result.raw
-            if hasattr(result, 'raw'):
-                output_content = result.raw
-            # For older versions, it might be in result.raw_output
-            elif hasattr(result, 'raw_output'):
-                output_content = result.raw_output
-            # For TaskOutput objects, it might be in result.output
-            elif hasattr(result, 'output'):
-                output_content = result.output
-            # If we can't find a known attribute, convert to string
-            else:
-                output_content = str(result)
-                
-            # Try to parse as JSON if it's a string
-            if isinstance(output_content, str):
-                try:
-                    return json.loads(output_content)
-                except json.JSONDecodeError:
-                    # If not valid JSON, return as raw text
-                    return {"raw_text": output_content}
-            else:
-                # Return the output content directly
-                return output_content
+            return self._parse_result(result, JobExtraction)
         except Exception as e:
             # Fallback to returning a simple dictionary with default values
             return {
@@ -67,47 +185,26 @@ class JobSkillCrew:
         """
         Analyze a resume against job requirements.
         """
-        # Create the resume analyzer agent
-        resume_analyzer = self.agents.create_resume_analyzer_agent()
-        
-        # Create the resume analysis task
-        resume_task = self.tasks.resume_analysis_task(resume_analyzer, resume_text, extracted_job_skills)
-        
-        # Create and run the crew
-        crew = Crew(
-            agents=[resume_analyzer],
-            tasks=[resume_task],
-            verbose=True
-        )
-        
-        # Run the crew and get the result
-        result = crew.kickoff()
+        if self.mode == "direct":
+            return self.pipeline.run(
+                RESUME_ANALYSIS_STEP,
+                resume_text=resume_text,
+                key_skills=extracted_job_skills.get('key_skills', []),
+                requirements=extracted_job_skills.get('requirements', [])
+            )
+
+        # Run the resume analysis task on a pooled crew with the rendered prompt
+        with self.pools["resume_analysis"].checkout() as crew:
+            crew.tasks[0].description = RESUME_ANALYSIS_PROMPT.render(
+                resume_text=resume_text,
+                key_skills=extracted_job_skills.get('key_skills', []),
+                requirements=extracted_job_skills.get('requirements', [])
+            )
+            result = self._kickoff(crew)
         
         # Extract the actual output content
         try:
-            # For CrewOutput objects, the content is stored as a string in result.raw
-            if hasattr(result, 'raw'):
-                output_content = result.raw
-            # For older versions, it might be in result.raw_output
-            elif hasattr(result, 'raw_output'):
-                output_content = result.raw_output
-            # For TaskOutput objects, it might be in result.output
-            elif hasattr(result, 'output'):
-                output_content = result.output
-            # If we can't find a known attribute, convert to string
-            else:
-                output_content = str(result)
-                
-            # Try to parse as JSON if it's a string
-            if isinstance(output_content, str):
-                try:
-                    return json.loads(output_content)
-                except json.JSONDecodeError:
-                    # If not valid JSON, return as raw text
-                    return {"raw_text": output_content}
-            else:
-                # Return the output content directly
-                return output_content
+            return self._parse_result(result, ResumeAnalysis)
         except Exception as e:
             # Fallback to returning a simple dictionary
             return {
@@ -125,47 +222,20 @@ class JobSkillCrew:
         """
         Recommend projects based on skill gaps.
         """
-        # Create the project recommendation agent
-        project_recommender = self.agents.create_project_recommendation_agent()
-        
-        # Create the project recommendation task
-        project_task = self.tasks.project_recommendation_task(project_recommender, skill_gaps, current_skills)
-        
-        # Create and run the crew
-        crew = Crew(
-            agents=[project_recommender],
-            tasks=[project_task],
-            verbose=True
-        )
-        
-        # Run the crew and get the result
-        result = crew.kickoff()
+        if self.mode == "direct":
+            return self.pipeline.run(PROJECT_RECOMMENDATION_STEP, skill_gaps=skill_gaps, current_skills=current_skills)
+
+        # Run the project recommendation task on a pooled crew with the rendered prompt
+        with self.pools["project_recommendation"].checkout() as crew:
+            crew.tasks[0].description = PROJECT_RECOMMENDATION_PROMPT.render(
+                skill_gaps=skill_gaps,
+                current_skills=current_skills
+            )
+            result = self._kickoff(crew)
         
         # Extract the actual output content
         try:
-            # For CrewOutput objects, the content is stored as a string in result.raw
-            if hasattr(result, 'raw'):
-                output_content = result.raw
-            # For older versions, it might be in result.raw_output
-            elif hasattr(result, 'raw_output'):
-                output_content = result.raw_output
-            # For TaskOutput objects, it might be in result.output
-            elif hasattr(result, 'output'):
-                output_content = result.output
-            # If we can't find a known attribute, convert to string
-            else:
-                output_content = str(result)
-                
-            # Try to parse as JSON if it's a string
-            if isinstance(output_content, str):
-                try:
-                    return json.loads(output_content)
-                except json.JSONDecodeError:
-                    # If not valid JSON, return as raw text
-                    return {"raw_text": output_content}
-            else:
-                # Return the output content directly
-                return output_content
+            return self._parse_result(result, ProjectRecommendationList)
         except Exception as e:
             # Fallback to returning a simple dictionary
             return [
@@ -0,0 +1,133 @@
+"""
+Lightweight pipeline engine for single-step LLM tasks.
+
+A single-agent CrewAI crew wraps one prompt in an agent loop, a long backstory
+and CrewAI's own prompt scaffolding. PipelineEngine runs the same task prompt as
+one direct templated LLM call and validates the output against its schema.
+CrewAI stays in use for genuinely multi-agent flows and when PIPELINE_MODE=crew.
+"""
+
+import os
+import threading
+
+from .prompts import (
+    EXTRACTION_GOAL,
+    EXTRACTION_PROMPT,
+    EXTRACTION_ROLE,
+    PROJECT_RECOMMENDATION_PROMPT,
+    PROJECT_RECOMMENDER_GOAL,
+    PROJECT_RECOMMENDER_ROLE,
+    RESUME_ANALYSIS_PROMPT,
+    RESUME_ANALYZER_GOAL,
+    RESUME_ANALYZER_ROLE,
+)
+from utils.structured_output import (
+    JobExtraction,
+    ProjectRecommendationList,
+    ResumeAnalysis,
+    StructuredOutputError,
+    generate_structured,
+    to_jsonable,
+)
+from utils.tracing import start_span
+
+# "direct" runs single-step tasks as one LLM call, "crew" runs them through CrewAI
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "direct").lower()
+
+
+class UsageStats:
+    """Thread-safe running totals of LLM calls and token usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def record(self, prompt_tokens=0, completion_tokens=0, calls=1):
+        with self._lock:
+            self.calls += calls
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+            }
+
+
+class PipelineStep:
+    """A single templated LLM task with its system prompt and output schema."""
+
+    def __init__(self, name, system_prompt, template, schema, json_mode=True):
+        self.name = name
+        self.system_prompt = system_prompt
+        self.template = template
+        self.schema = schema
+        # OpenAI JSON mode only supports objects, so array outputs run without it
+        self.json_mode = json_mode
+
+    def render(self, **inputs):
+        return self.template.render(**inputs)
+
+
+EXTRACTION_STEP = PipelineStep(
+    "extraction",
+    f"You are a {EXTRACTION_ROLE}. {EXTRACTION_GOAL}.",
+    EXTRACTION_PROMPT,
+    JobExtraction
+)
+
+RESUME_ANALYSIS_STEP = PipelineStep(
+    "resume_analysis",
+    f"You are a {RESUME_ANALYZER_ROLE}. {RESUME_ANALYZER_GOAL}.",
+    RESUME_ANALYSIS_PROMPT,
+    ResumeAnalysis
+)
+
+PROJECT_RECOMMENDATION_STEP = PipelineStep(
+    "project_recommendation",
+    f"You are a {PROJECT_RECOMMENDER_ROLE}. {PROJECT_RECOMMENDER_GOAL}.",
+    PROJECT_RECOMMENDATION_PROMPT,
+    ProjectRecommendationList,
+    json_mode=False
+)
+
+
+class PipelineEngine:
+    """Executes pipeline steps as direct LLM calls."""
+
+    def __init__(self, llm, usage=None):
+        self.llm = llm
+        self.usage = usage or UsageStats()
+
+    def run(self, step, **inputs):
+        """
+        Run a step and return its validated output as plain JSON types.
+
+        Output that cannot be validated (even after the repair pass) is returned
+        as {"raw_text": ...}, matching the CrewAI path.
+        """
+        def call(prompt):
+            content, usage = self.llm.complete(
+                prompt,
+                system_prompt=step.system_prompt,
+                json_mode=step.json_mode
+            )
+            self.usage.record(usage["prompt_tokens"], usage["completion_tokens"])
+            return content
+
+        with start_span(f"pipeline_step.{step.name}") as span:
+            try:
+                return to_jsonable(generate_structured(call, step.render(**inputs), step.schema))
+            except StructuredOutputError as e:
+                span.set_attribute("structured_output.valid", False)
+                return {"raw_text": e.raw_text}
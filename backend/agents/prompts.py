@@ -0,0 +1,159 @@
+"""
+Prompt templates shared by the CrewAI tasks and the direct LLM pipeline.
+Templates use str.format syntax (literal braces are doubled) and are compiled
+once at import time.
+"""
+
+from string import Formatter
+
+
+class PromptTemplate:
+    """
+    A str.format template parsed once into literal and field segments.
+
+    render() only joins the precompiled segments with the given values, so the
+    template text is not re-parsed on every request.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self._parts = []
+        self.fields = []
+        for literal, field, format_spec, conversion in Formatter().parse(template):
+            if format_spec or conversion:
+                raise ValueError(f"Unsupported format spec in prompt field: {field}")
+            self._parts.append((literal, field))
+            if field is not None and field not in self.fields:
+                self.fields.append(field)
+
+    def render(self, **inputs):
+        chunks = []
+        for literal, field in self._parts:
+            chunks.append(literal)
+            if field is not None:
+                chunks.append(str(inputs[field]))
+        return "".join(chunks)
+
+    def __str__(self):
+        return self.template
+
+
+# Agent roles, goals and backstories
+EXTRACTION_ROLE = "Job Description Analyzer"
+EXTRACTION_GOAL = "Extract all relevant skills, responsibilities, and requirements from job descriptions"
+EXTRACTION_BACKSTORY = """You are an expert in analyzing job descriptions and identifying key skills,
+responsibilities, and requirements. You have years of experience in HR and recruitment,
+and you understand the nuances of job postings across different industries. Your expertise
+allows you to accurately identify both technical and soft skills from any job description."""
+
+RESUME_ANALYZER_ROLE = "Resume Analyzer"
+RESUME_ANALYZER_GOAL = "Extract skills from resumes and identify gaps compared to job requirements"
+RESUME_ANALYZER_BACKSTORY = """You are an expert resume analyst with years of experience in career counseling.
+You excel at identifying skills from resumes and understanding how they match or don't match
+with job requirements. Your guidance has helped thousands of job seekers improve their resumes
+and land their dream jobs."""
+
+PROJECT_RECOMMENDER_ROLE = "Project Recommender"
+PROJECT_RECOMMENDER_GOAL = "Recommend personalized projects to help job seekers build missing skills"
+PROJECT_RECOMMENDER_BACKSTORY = """You are a career development expert who specializes in recommending practical
+projects that help people build job-relevant skills. You have a deep understanding of what
+employers look for and how candidates can demonstrate their abilities through projects.
+Your recommendations are always tailored to the individual's skill gaps and career goals."""
+
+# Prompt for extracting structured data from job descriptions
+EXTRACTION_PROMPT = PromptTemplate("""
+You are an expert in analyzing job descriptions and extracting structured data.
+
+Given the following job description text, identify and extract the following:
+
+1. **Company name** – The organization hiring for the role.
+2. **Role or job title** – The official job title.
+3. **Key skills** – List technical and soft skills mentioned. These should be specific abilities or knowledge areas.
+4. **Requirements** – List qualifications like education, experience, certifications, etc.
+5. **Salary or compensation** – If provided, include it exactly as mentioned.
+
+IMPORTANT GUIDELINES:
+- ONLY use what's explicitly mentioned in the text. Do NOT guess.
+- Avoid repetition or redundancy in skills (e.g., don't list "communication skills" and "excellent communication" separately)
+- Experience and degree requirements should be listed under "requirements" not "key_skills"
+- If salary is not mentioned, leave it as an empty string
+
+Here is the job description:
+{job_description}
+
+IMPORTANT: You MUST return your answer as a valid JSON object with this exact structure:
+{{
+    "company": "Company Name",
+    "role": "Job Title",
+    "key_skills": ["Skill 1", "Skill 2", ...],
+    "requirements": ["Requirement 1", "Requirement 2", ...],
+    "salary": "If mentioned, include it here. Otherwise leave empty."
+}}
+
+Be concise and extract only what's present. Don't include unrelated or generic information.
+Your response must be ONLY the JSON object, nothing else before or after.
+""")
+
+# Prompt for analyzing a resume against job requirements
+RESUME_ANALYSIS_PROMPT = PromptTemplate("""
+Analyze the following resume and compare it with the extracted job skills:
+
+Resume:
+{resume_text}
+
+Job Skills Required:
+Technical Skills: {key_skills}
+Requirements: {requirements}
+
+Identify:
+1. Skills present in the resume
+2. Skills missing from the resume but required by jobs
+3. Strength of existing skills (beginner, intermediate, advanced)
+
+Format your response as a JSON object with the following structure:
+{{
+    "present_skills": [
+        {{"name": "skill1", "type": "technical/soft", "level": "beginner/intermediate/advanced"}},
+        ...
+    ],
+    "missing_skills": [
+        {{"name": "skill1", "type": "technical/soft", "importance": "high/medium/low"}},
+        ...
+    ],
+    "strengths": ["strength1", "strength2", ...],
+    "improvement_areas": ["area1", "area2", ...]
+}}
+""")
+
+# Prompt for recommending projects based on skill gaps
+PROJECT_RECOMMENDATION_PROMPT = PromptTemplate("""
+Based on the identified skill gaps and current skills, recommend 3-5 projects that would help
+the person develop the missing skills required for their target jobs.
+
+Missing Skills: {skill_gaps}
+Current Skills: {current_skills}
+
+For each project, provide:
+1. A title
+2. A brief description
+3. The skills it would help develop
+4. Estimated time to complete
+5. Difficulty level (beginner, intermediate, advanced)
+6. Resources to help get started
+
+Format your response as a JSON array of project objects:
+[
+    {{
+        "title": "Project Title",
+        "description": "Brief project description",
+        "skills_targeted": ["skill1", "skill2", ...],
+        "time_estimate": "X weeks/hours",
+        "difficulty": "beginner/intermediate/advanced",
+        "resources": ["resource1", "resource2", ...]
+    }},
+    ...
+]
+
+Ensure the projects are practical, relevant to the person's career goals, and will effectively
+demonstrate the missing skills to potential employers.
+""")
@@ -1,28 +1,16 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, BackgroundTasks, Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, BackgroundTasks, Body, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import json
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import sys
 import os
-import google.generativeai as genai
-import re
-import time
-import uuid
-import base64
-import tempfile
 import asyncio
-from datetime import datetime
+import sqlite3
+from collections import Counter
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from firecrawl import FirecrawlApp
-import io
-import PyPDF2
-import docx
-import openai
-import requests
-from bs4 import BeautifulSoup
-import traceback
 
 # Load environment variables
 load_dotenv()
@@ -30,37 +18,76 @@ load_dotenv()
 # Add the parent directory to the path so we can import from agents
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.crew import JobSkillCrew
+from utils.cache import create_cache, make_key
+from utils.cancellation import RequestCancellationMiddleware
+from utils.document_text import extract_docx_text, extract_pdf_text
+from utils.hedging import LLM_HEDGING, hedged_call
+from utils.recommendation_cache import RecommendationCache, load_warm_combinations
+from utils.interview_feedback import parse_interview_evaluation
+from utils.job_queue import (FINISHED, JOB_WORKERS, JobQueue, job_view, run_job_workers, validate_callback_url,
+                             wait_for_job)
+from utils.job_store import JobStore, parse_timestamp
+from utils.llm import gemini_generate_content, openai_chat_completion
+from utils.metrics import METRICS_DIR, flush_metrics, register_cache_metrics, register_job_metrics, render_metrics
+from utils.providers import (
+    GEMINI_API_KEY,
+    OPENAI_API_KEY,
+    LazyProvider,
+    gemini_chat_model_name,
+    get_firecrawl_app,
+    get_gemini_model,
+    get_openai_client,
+    preload_providers,
+)
+from utils.skill_extraction import extract_skills_rule_based, find_skill_gaps, is_valid_resume
+from utils.skill_tagger import LOCAL_SKILL_CONFIDENCE, LOCAL_SKILL_EXTRACTOR, shutdown_tagger_pool, tag_skills_async
+from utils.skill_taxonomy import canonical_skill, skill_diff
+from utils.structured_output import (
+    LearningResources,
+    SkillList,
+    StructuredOutputError,
+    generate_structured,
+    gemini_json_config,
+    openai_json_kwargs,
+    to_jsonable,
+)
+from utils.rate_limit import LLMRequestContextMiddleware, current_user
+from utils.tracing import TracingMiddleware, start_span
+from utils.log import get_logger, log_payload
 
-# Configure OpenAI API
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
-    print("OpenAI API key configured successfully")
-    # Set the client to use the API key
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-    
-    try:
-        # Test the API connection
-        models = client.models.list()
-        print("Available OpenAI models:")
-        for model in models.data[:5]:  # Just print the first few to avoid clutter
-            print(f"- {model.id}")
-        print("...")
-    except Exception as e:
-        print(f"Error listing OpenAI models: {str(e)}")
-else:
-    print("Warning: OPENAI_API_KEY not found in environment variables")
-    client = None
+logger = get_logger(__name__)
+
+# Gemini model used for JSON-mode requests (gemini-pro does not support response_mime_type)
+GEMINI_JSON_MODEL = os.getenv("GEMINI_JSON_MODEL", "gemini-1.5-flash")
 
-# Configure Google Generative AI (Gemini) API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("Gemini_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    print("Google Generative AI (Gemini) API key configured successfully")
-else:
-    print("Warning: Gemini API key not found in environment variables")
+# Create the OpenAI, Gemini and Firecrawl clients at startup (in the background) instead of on first use
+PRELOAD_PROVIDERS = os.getenv("PRELOAD_PROVIDERS", "0") == "1"
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Start background work when the server starts and stop it on shutdown.
+    Nothing here delays startup: client preloading, cache warming and the job
+    workers run as tasks.
+    """
+    tasks = [asyncio.create_task(warm_project_recommendations())]
+    if PRELOAD_PROVIDERS:
+        tasks.append(asyncio.create_task(asyncio.to_thread(preload_providers)))
+        if SKILL_MATCHING == "semantic":
+            tasks.append(asyncio.create_task(asyncio.to_thread(skill_matcher.get)))
+        tasks.append(asyncio.create_task(asyncio.to_thread(job_index.get)))
+    if METRICS_DIR:
+        # Share this worker's metrics with the others (see utils/metrics.py)
+        tasks.append(asyncio.create_task(flush_metrics()))
+    if JOB_WORKERS > 0:
+        tasks.append(asyncio.create_task(run_job_workers(job_queue, {"process-job": run_process_job})))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    shutdown_tagger_pool()
 
-app = FastAPI(title="JobSkillTracker API")
+app = FastAPI(title="JobSkillTracker API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -71,12 +98,73 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-# Initialize the JobSkillCrew
-job_skill_crew = JobSkillCrew()
+# Tag LLM calls with the requesting user and route priority for rate limiting (see utils/rate_limit.py)
+app.add_middleware(LLMRequestContextMiddleware)
+
+# Stop a request's work when its client disconnects or its deadline passes (see utils/cancellation.py)
+app.add_middleware(RequestCancellationMiddleware)
+
+# Record a trace span for every request (see utils/tracing.py)
+app.add_middleware(TracingMiddleware)
+
+# The JobSkillCrew is built on first use (crew mode imports crewai and prebuilds crews)
+job_skill_crew = LazyProvider("job_skill_crew", JobSkillCrew)
+
+# "semantic" compares resume and job skills by embedding similarity, "exact" by lowercase name
+SKILL_MATCHING = os.getenv("SKILL_MATCHING", "semantic")
+
+def create_skill_matcher():
+    # Imported on first use, since it loads NumPy and the skill embedding matrix
+    from utils.skill_matching import SkillMatcher
+    return SkillMatcher()
+
+skill_matcher = LazyProvider("skill_matcher", create_skill_matcher)
+
+def create_job_index():
+    # Imported on first use, since it loads NumPy and indexes the whole job corpus
+    from utils.job_search import load_job_corpus
+    return load_job_corpus()
+
+# Postings searched by /search-jobs, /match-job and /match-skill-goals (see utils/job_search.py)
+job_index = LazyProvider("job_index", create_job_index)
+
+def find_resume_skill_gaps(resume_text, job_skills):
+    """
+    Detect the skills in a resume and list the job skills it is missing, matching skills
+    semantically (see utils/skill_matching.py) unless SKILL_MATCHING is "exact".
+    """
+    if SKILL_MATCHING == "semantic":
+        try:
+            return skill_matcher.get().find_skill_gaps(resume_text, job_skills)
+        except Exception as e:
+            logger.warning(f"Semantic skill matching failed, comparing skill names instead: {str(e)}")
+    return find_skill_gaps(resume_text, job_skills)
+
+# Cache of project recommendations keyed by canonical skill gap sets
+project_recommendation_cache = RecommendationCache(
+    maxsize=int(os.getenv("PROJECT_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("PROJECT_CACHE_TTL", "604800")),
+    near_match_threshold=float(os.getenv("PROJECT_CACHE_NEAR_MATCH", "0.8"))
+)
+
+# Cache of structured job extraction results, shared by /process-job and /pipeline
+job_extraction_cache = create_cache(
+    "job_extraction",
+    maxsize=int(os.getenv("JOB_EXTRACTION_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("JOB_EXTRACTION_CACHE_TTL", "86400"))
+)
+
+# Durable queue of background jobs (async /process-job requests), shared by all workers
+job_queue = JobQueue()
+
+# Users' saved jobs, with their skills and analyses, shared by all workers
+job_store = JobStore()
 
-# Initialize Firecrawl with API key from environment variables
-firecrawl_api_key = os.getenv("FIRECRAWL_API_KEY", "")
-firecrawl_app = FirecrawlApp(api_key=firecrawl_api_key) if firecrawl_api_key else None
+# Most jobs one POST /users/{user_id}/saved-jobs request may save
+MAX_SAVED_JOBS_BATCH = 1000
+
+# Longest a GET /jobs/{job_id}?wait= request is held open, in seconds
+JOB_MAX_WAIT = 60.0
 
 # Define request models
 class JobDescription(BaseModel):
@@ -85,15 +173,30 @@ class JobDescription(BaseModel):
     company: Optional[str] = ""
     description: Optional[str] = ""  # Added back for fallback
     useFirecrawl: Optional[bool] = True
+    user_id: Optional[str] = None  # Save the processed job among this user's saved jobs (X-User-Id also sets it)
 
 class ResumeAnalysisRequest(BaseModel):
     resume_text: str
     extracted_job_skills: Optional[Dict[str, List[str]]] = None
+
+class SavedJob(BaseModel):
+    id: str
+    title: Optional[str] = ""
+    company: Optional[str] = ""
+    skills: List[Any] = []  # Skill names, or {"name": ..., "type": ...} objects as saved by the extension
+
+class MultiJobResumeAnalysisRequest(BaseModel):
+    resume_text: str
+    jobs: List[SavedJob]
+    limit: int = 10  # Number of highest-leverage skills to return
     
 class SkillGoalsRequest(BaseModel):
     user_id: str  # Unique identifier for the user
     skill_goals: List[str]  # List of skills the user wants to acquire
     current_skills: List[str] = []  # Optional list of skills the user already has
+    location: str = ""  # Optional location
+    experience_level: str = ""  # Optional experience level
+    limit: int = 20  # Number of postings to return
     
 class JobMatchRequest(BaseModel):
     user_id: str
@@ -101,6 +204,7 @@ class JobMatchRequest(BaseModel):
     job_title: str
     company: str
     url: str
+    limit: int = 20  # Number of similar postings to return
     
 class JobSearchRequest(BaseModel):
     user_id: str
@@ -108,6 +212,11 @@ class JobSearchRequest(BaseModel):
     keywords: List[str] = []  # Optional additional keywords
     location: str = ""  # Optional location
     experience_level: str = ""  # Optional experience level
+    skill_goals: List[str] = []  # Optional skills to learn; postings asking for them rank higher
+    limit: int = 20  # Number of postings to return
+
+class SavedJobsRequest(BaseModel):
+    jobs: List[Dict[str, Any]]  # Saved jobs as stored by the extension (id, title, company, url, dateAdded, skills, ...)
 
 class ProjectRecommendationRequest(BaseModel):
     skill_gaps: List[Dict[str, Any]]
@@ -122,10 +231,64 @@ class ChatRequest(BaseModel):
     target_skill: Optional[str] = None
 
 # Define API endpoints
+async def extract_skills_with_llm(job_description, job_title, company):
+    """
+    Extract skills from a job description with OpenAI, or return None if it is unavailable or fails.
+    """
+    client = get_openai_client()
+    if not client:
+        return None
+    try:
+        # Create prompt for skill extraction
+        prompt = f"Extract all technical and soft skills from the following job description for {job_title} at {company}.\n\nJob Description:\n{job_description[:5000]}\n\nReturn ONLY a JSON object with a \"skills\" array of strings with the skill names. For example: {{\"skills\": [\"JavaScript\", \"React\", \"Communication\", \"Problem Solving\"]}}\nDo not include any explanations, just the JSON object."
+        
+        def call_openai(prompt_text):
+            # Generate response using OpenAI in JSON mode
+            response = openai_chat_completion(
+                client,
+                model="gpt-3.5-turbo",  # Using GPT-3.5 for cost efficiency
+                messages=[
+                    {"role": "system", "content": "You are a skilled job analyzer that extracts technical and soft skills from job descriptions. Return only a JSON object with a skills array without any explanation."},
+                    {"role": "user", "content": prompt_text}
+                ],
+                temperature=0.3,  # Lower temperature for more consistent results
+                max_tokens=1000,
+                **openai_json_kwargs()
+            )
+            return response.choices[0].message.content
+        
+        # LLM calls may wait for rate limit budget, so they run off the event loop
+        skill_list = await asyncio.to_thread(generate_structured, call_openai, prompt, SkillList)
+        logger.info(f"Extracted {len(skill_list.skills)} skills")
+        return skill_list.skills
+    except StructuredOutputError as e:
+        logger.error(f"Error parsing skills from OpenAI response: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error using OpenAI API for skill extraction: {str(e)}")
+    return None
+
+async def tag_job_skills(job_description, job_title):
+    """
+    Extract skills with the local tagger (see utils/skill_tagger.py), recording whether the posting needs the LLM.
+    """
+    with start_span("skills.local") as span:
+        tagged = await tag_skills_async(job_description, job_title)
+        span.set_attributes({"skills.confidence": tagged["confidence"],
+                             "skills.escalated": tagged["confidence"] < LOCAL_SKILL_CONFIDENCE})
+    logger.info(f"Tagged {len(tagged['skills'])} skills locally with confidence {tagged['confidence']}")
+    return tagged
+
+def local_skills_result(tagged):
+    return {"skills": tagged["skills"], "source": "local", "confidence": tagged["confidence"],
+            "skill_confidence": tagged["skill_confidence"]}
+
 @app.post("/extract-job-skills")
-async def extract_job_skills(request: dict = Body(...)):
+async def extract_job_skills(request: dict = Body(...), progressive: bool = Query(False)):
     """
     Extract skills from a job description using AI.
+    With LOCAL_SKILL_EXTRACTOR, postings the local tagger is confident about are answered without AI.
+    With progressive=true, the rule-based (or local) skills are streamed as newline-delimited JSON at once,
+    followed by the AI-refined skills with the skills added and removed by the refinement.
     """
     try:
         job_description = request.get("job_description", "")
@@ -135,134 +298,50 @@ async def extract_job_skills(request: dict = Body(...)):
         if not job_description:
             return {"error": "Job description is required"}
         
-        print(f"Extracting skills from job description for {job_title} at {company}")
-        print(f"Description length: {len(job_description)} characters")
+        logger.info(f"Extracting skills from job description for {job_title} at {company}")
+        logger.info(f"Description length: {len(job_description)} characters")
+        
+        if progressive:
+            async def events():
+                if LOCAL_SKILL_EXTRACTOR:
+                    tagged = await tag_job_skills(job_description, job_title)
+                    yield pipeline_event("local", result=local_skills_result(tagged))
+                    if tagged["confidence"] >= LOCAL_SKILL_CONFIDENCE:
+                        yield pipeline_event("done")
+                        return
+                    rule_based_skills = tagged["skills"]
+                else:
+                    rule_based_skills = extract_skills_rule_based(job_description, job_title)
+                    yield pipeline_event("rule_based", result={"skills": rule_based_skills})
+                refined_skills = await extract_skills_with_llm(job_description, job_title, company)
+                if refined_skills is None:
+                    yield pipeline_event("refined", error="AI skill extraction is unavailable")
+                else:
+                    added, removed = skill_diff(rule_based_skills, refined_skills)
+                    yield pipeline_event("refined", result={"skills": refined_skills, "added": added, "removed": removed})
+                yield pipeline_event("done")
+            
+            return StreamingResponse(events(), media_type="application/x-ndjson")
+        
+        if LOCAL_SKILL_EXTRACTOR:
+            tagged = await tag_job_skills(job_description, job_title)
+            if tagged["confidence"] >= LOCAL_SKILL_CONFIDENCE:
+                return local_skills_result(tagged)
         
         # Use OpenAI API to extract skills if available
-        if OPENAI_API_KEY and client:
-            try:
-                # Create prompt for skill extraction
-                prompt = f"Extract all technical and soft skills from the following job description for {job_title} at {company}.\n\nJob Description:\n{job_description[:5000]}\n\nReturn ONLY a JSON array of strings with the skill names. For example: [\"JavaScript\", \"React\", \"Communication\", \"Problem Solving\"]\nDo not include any explanations, just the JSON array."
-                
-                # Generate response using OpenAI
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",  # Using GPT-3.5 for cost efficiency
-                    messages=[
-                        {"role": "system", "content": "You are a skilled job analyzer that extracts technical and soft skills from job descriptions. Return only a JSON array of skills without any explanation."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,  # Lower temperature for more consistent results
-                    max_tokens=1000
-                )
-                
-                # Extract the response text
-                response_text = response.choices[0].message.content
-                
-                # Extract JSON array from response
-                import re
-                import json
-                
-                # Try to find a JSON array in the response
-                json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-                
-                if json_match:
-                    try:
-                        skills_array = json.loads(json_match.group(0))
-                        print(f"Extracted {len(skills_array)} skills")
-                        return {"skills": skills_array}
-                    except json.JSONDecodeError as e:
-                        print(f"Error parsing JSON from response: {str(e)}")
-                        print(f"Response text: {response_text}")
-                        # Fall back to simple extraction
-                        skills = re.findall(r'"([^"]+)"', response_text)
-                        if skills:
-                            print(f"Extracted {len(skills)} skills using regex")
-                            return {"skills": skills}
-                else:
-                    print(f"No JSON array found in response: {response_text}")
-                    # Try to extract skills using regex as fallback
-                    skills = re.findall(r'"([^"]+)"', response_text)
-                    if skills:
-                        print(f"Extracted {len(skills)} skills using regex")
-                        return {"skills": skills}
-            except Exception as e:
-                print(f"Error using OpenAI API for skill extraction: {str(e)}")
+        skills = await extract_skills_with_llm(job_description, job_title, company)
+        if skills is not None:
+            return {"skills": skills}
         
         # Fallback to rule-based extraction if AI fails or is not available
         skills = extract_skills_rule_based(job_description, job_title)
-        print(f"Extracted {len(skills)} skills using rule-based approach")
+        logger.info(f"Extracted {len(skills)} skills using rule-based approach")
         return {"skills": skills}
         
     except Exception as e:
-        print(f"Unexpected error in skill extraction: {str(e)}")
+        logger.error(f"Unexpected error in skill extraction: {str(e)}")
         return {"error": f"Error extracting skills: {str(e)}"}
 
-def extract_skills_rule_based(job_description, job_title):
-    """
-    Extract skills from job description using rule-based approach.
-    This is a fallback method when AI extraction is not available.
-    """
-    # Common technical skills to look for
-    tech_skills = [
-        "Python", "JavaScript", "Java", "C++", "C#", "Ruby", "PHP", "Swift", "Kotlin", "Go",
-        "React", "Angular", "Vue.js", "Node.js", "Django", "Flask", "Spring", "ASP.NET",
-        "SQL", "NoSQL", "MongoDB", "PostgreSQL", "MySQL", "Oracle", "Firebase",
-        "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "CI/CD", "Git",
-        "Machine Learning", "AI", "Data Science", "TensorFlow", "PyTorch", "NLP",
-        "HTML", "CSS", "SASS", "LESS", "Bootstrap", "Tailwind CSS",
-        "REST API", "GraphQL", "Microservices", "Serverless", "WebSockets",
-        "Agile", "Scrum", "Kanban", "JIRA", "Confluence", "DevOps"
-    ]
-    
-    # Common soft skills to look for
-    soft_skills = [
-        "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Adaptability",
-        "Time Management", "Leadership", "Creativity", "Attention to Detail", "Collaboration",
-        "Analytical Thinking", "Decision Making", "Emotional Intelligence", "Conflict Resolution",
-        "Project Management", "Presentation Skills", "Negotiation", "Customer Service",
-        "Interpersonal Skills", "Work Ethic", "Self-Motivation", "Organization"
-    ]
-    
-    # Combine all skills to check
-    all_skills = tech_skills + soft_skills
-    
-    # Convert job description to lowercase for case-insensitive matching
-    job_desc_lower = job_description.lower()
-    
-    # Find skills mentioned in the job description
-    found_skills = []
-    for skill in all_skills:
-        # Check for exact match or plural form
-        if skill.lower() in job_desc_lower or f"{skill.lower()}s" in job_desc_lower:
-            found_skills.append(skill)
-    
-    # If we found very few skills, add some based on the job title
-    if len(found_skills) < 3:
-        # Add skills based on job title keywords
-        title_lower = job_title.lower()
-        if "python" in title_lower or "data" in title_lower:
-            found_skills.extend(["Python", "SQL", "Data Analysis"])
-        elif "javascript" in title_lower or "frontend" in title_lower or "front-end" in title_lower:
-            found_skills.extend(["JavaScript", "HTML", "CSS", "React"])
-        elif "backend" in title_lower or "back-end" in title_lower:
-            found_skills.extend(["Node.js", "SQL", "API Design"])
-        elif "fullstack" in title_lower or "full-stack" in title_lower:
-            found_skills.extend(["JavaScript", "HTML", "CSS", "Node.js", "SQL"])
-        elif "devops" in title_lower or "cloud" in title_lower:
-            found_skills.extend(["AWS", "Docker", "CI/CD", "Kubernetes"])
-        elif "mobile" in title_lower or "android" in title_lower or "ios" in title_lower:
-            found_skills.extend(["Mobile Development", "Swift", "Kotlin", "React Native"])
-        elif "ui" in title_lower or "ux" in title_lower or "design" in title_lower:
-            found_skills.extend(["UI/UX Design", "Figma", "Adobe XD", "Wireframing"])
-        elif "product" in title_lower or "manager" in title_lower:
-            found_skills.extend(["Product Management", "Agile", "Leadership", "Communication"])
-        
-        # Add some generic soft skills
-        found_skills.extend(["Communication", "Problem Solving", "Teamwork"])
-    
-    # Remove duplicates and return
-    return list(set(found_skills))
-
 @app.post("/extract-resume-text")
 async def extract_resume_text(file: UploadFile = File(...)):
     """
@@ -270,73 +349,55 @@ async def extract_resume_text(file: UploadFile = File(...)):
     This endpoint is specifically optimized for resume text extraction.
     """
     try:
-        print(f"Processing resume file: {file.filename}, content type: {file.content_type}")
+        logger.info(f"Processing resume file: {file.filename}, content type: {file.content_type}")
         
         # Read file content
         try:
             content = await file.read()
-            print(f"Successfully read file content, size: {len(content)} bytes")
+            logger.info(f"Successfully read file content, size: {len(content)} bytes")
         except Exception as e:
-            print(f"Error reading file content: {str(e)}")
+            logger.error(f"Error reading file content: {str(e)}")
             return {"error": f"Error reading file: {str(e)}"}
         
         # Determine file extension
         file_extension = file.filename.split('.')[-1].lower()
-        print(f"Resume file extension: {file_extension}")
+        logger.info(f"Resume file extension: {file_extension}")
         extracted_text = ""
         
         if file_extension == 'pdf':
             # Extract text from PDF with improved error handling for resumes
             try:
-                print("Creating PDF reader...")
-                pdf_file = io.BytesIO(content)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                print(f"Resume PDF has {len(pdf_reader.pages)} pages")
+                extracted_text = extract_pdf_text(content)
                 
-                for page_num in range(len(pdf_reader.pages)):
-                    try:
-                        print(f"Processing page {page_num+1}...")
-                        page = pdf_reader.pages[page_num]
-                        page_text = page.extract_text()
-                        if page_text:
-                            print(f"Extracted {len(page_text)} characters from page {page_num+1}")
-                            extracted_text += page_text + "\n"
-                        else:
-                            print(f"Warning: No text extracted from resume page {page_num+1}")
-                    except Exception as e:
-                        print(f"Error extracting text from resume page {page_num+1}: {str(e)}")
-                        continue
-                        
                 if not extracted_text.strip():
                     # If PyPDF2 failed to extract text, return an error
-                    print("No text extracted from PDF")
+                    logger.warning("No text extracted from PDF")
                     return {"error": "Could not extract text from the PDF resume. Please try a different file format or ensure the PDF contains selectable text."}
             except Exception as e:
-                print(f"Error processing resume PDF: {str(e)}")
+                logger.error(f"Error processing resume PDF: {str(e)}")
                 return {"error": f"Error processing PDF: {str(e)}"}
         
         elif file_extension == 'docx':
             # Extract text from DOCX
             try:
-                doc = docx.Document(io.BytesIO(content))
-                extracted_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-                print(f"Extracted {len(extracted_text)} characters from DOCX")
+                extracted_text = extract_docx_text(content)
+                logger.info(f"Extracted {len(extracted_text)} characters from DOCX")
             except Exception as e:
-                print(f"Error processing DOCX: {str(e)}")
+                logger.error(f"Error processing DOCX: {str(e)}")
                 return {"error": f"Error processing DOCX: {str(e)}"}
         
         elif file_extension == 'txt':
             # Extract text from TXT
             try:
                 extracted_text = content.decode('utf-8')
-                print(f"Extracted {len(extracted_text)} characters from TXT using utf-8")
+                logger.info(f"Extracted {len(extracted_text)} characters from TXT using utf-8")
             except UnicodeDecodeError:
                 try:
                     # Try with a different encoding if utf-8 fails
                     extracted_text = content.decode('latin-1')
-                    print(f"Extracted {len(extracted_text)} characters from TXT using latin-1")
+                    logger.info(f"Extracted {len(extracted_text)} characters from TXT using latin-1")
                 except Exception as e:
-                    print(f"Error decoding TXT file: {str(e)}")
+                    logger.error(f"Error decoding TXT file: {str(e)}")
                     return {"error": f"Error processing TXT file: {str(e)}"}
         
         else:
@@ -344,19 +405,19 @@ async def extract_resume_text(file: UploadFile = File(...)):
         
         # Basic validation of extracted text
         if not extracted_text or len(extracted_text.strip()) < 50:
-            print(f"Extracted text too short: {len(extracted_text.strip()) if extracted_text else 0} characters")
+            logger.warning(f"Extracted text too short: {len(extracted_text.strip()) if extracted_text else 0} characters")
             return {"error": "The extracted text is too short or empty. Please ensure your resume contains extractable text."}
             
         # Print the first 100 characters of extracted text for debugging
-        print(f"Extracted text (first 100 chars): {extracted_text[:100]}")
+        logger.debug(f"Extracted text (first 100 chars): {extracted_text[:100]}")
         
         # Return the extracted text
         # Log success message
-        print(f"Successfully extracted {len(extracted_text)} characters from resume")
+        logger.info(f"Successfully extracted {len(extracted_text)} characters from resume")
         return {"text": extracted_text}
     
     except Exception as e:
-        print(f"Unexpected error processing resume file: {str(e)}")
+        logger.error(f"Unexpected error processing resume file: {str(e)}")
         return {"error": f"Error processing file: {str(e)}"}
 
 @app.post("/upload-paper")
@@ -365,44 +426,30 @@ async def upload_paper(file: UploadFile = File(...)):
     Upload a research paper file (PDF, DOCX, TXT) and extract its text content.
     """
     try:
-        print(f"Processing uploaded file: {file.filename}")
+        logger.info(f"Processing uploaded file: {file.filename}")
         content = await file.read()
         file_extension = file.filename.split('.')[-1].lower()
-        print(f"File extension: {file_extension}")
+        logger.debug(f"File extension: {file_extension}")
         extracted_text = ""
         
         if file_extension == 'pdf':
             # Extract text from PDF with improved error handling
             try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-                print(f"PDF has {len(pdf_reader.pages)} pages")
+                extracted_text = extract_pdf_text(content)
                 
-                for page_num in range(len(pdf_reader.pages)):
-                    try:
-                        page = pdf_reader.pages[page_num]
-                        page_text = page.extract_text()
-                        if page_text:
-                            extracted_text += page_text + "\n"
-                        else:
-                            print(f"Warning: No text extracted from page {page_num+1}")
-                    except Exception as e:
-                        print(f"Error extracting text from page {page_num+1}: {str(e)}")
-                        continue
-                        
                 if not extracted_text.strip():
                     # If PyPDF2 failed to extract text, try a fallback method
-                    print("Using fallback method for PDF text extraction")
+                    logger.warning("Using fallback method for PDF text extraction")
                     # Save the PDF temporarily and use a different approach if needed
                     # This is a placeholder for a more robust extraction method
                     extracted_text = "The PDF content could not be fully extracted. Please provide a summary of what the paper is about in your message, and I'll help you analyze it based on your description."
             except Exception as e:
-                print(f"Error processing PDF: {str(e)}")
+                logger.error(f"Error processing PDF: {str(e)}")
                 raise
         
         elif file_extension == 'docx':
             # Extract text from DOCX
-            doc = docx.Document(io.BytesIO(content))
-            extracted_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            extracted_text = extract_docx_text(content)
         
         elif file_extension == 'txt':
             # Extract text from TXT
@@ -412,12 +459,12 @@ async def upload_paper(file: UploadFile = File(...)):
             return {"error": f"Unsupported file format: {file_extension}. Please upload a PDF, DOCX, or TXT file."}
         
         # Return the extracted text
-        print(f"Extracted text length: {len(extracted_text)}")
-        print(f"First 100 chars: {extracted_text[:100]}")
+        logger.info(f"Extracted text length: {len(extracted_text)}")
+        logger.debug(f"First 100 chars: {extracted_text[:100]}")
         return {"paper_text": extracted_text}
     
     except Exception as e:
-        print(f"Error processing uploaded file: {str(e)}")
+        logger.error(f"Error processing uploaded file: {str(e)}")
         return {"error": f"Error processing uploaded file: {str(e)}"}
 
 @app.post("/chat")
@@ -425,10 +472,11 @@ async def chat_with_ai(request: ChatRequest):
     """
     Chat with AI using Gemini API
     """
-    print(f"Received chat request: {request}")
+    logger.info("Received chat request", extra={"mode": request.mode, "history_length": len(request.chat_history or [])})
+    log_payload(logger, "Chat request", request.model_dump())
     try:
         if not GEMINI_API_KEY:
-            print("Gemini API key not configured")
+            logger.warning("Gemini API key not configured")
             return JSONResponse(
                 status_code=500,
                 content={"detail": "Gemini API key not configured"}
@@ -436,38 +484,15 @@ async def chat_with_ai(request: ChatRequest):
         
         # Initialize Gemini model with the correct model name
         try:
-            # List available models to debug
-            models = genai.list_models()
-            model_names = [model.name for model in models]
-            print(f"Available Gemini models: {model_names}")
-            
-            # First try to find Gemini Flash
-            gemini_model_name = None
-            for model_name in model_names:
-                if "flash" in model_name.lower() and "gemini" in model_name.lower():
-                    gemini_model_name = model_name
-                    print(f"Found Gemini Flash model: {gemini_model_name}")
-                    break
-            
-            # If Flash not found, try any Gemini model
-            if not gemini_model_name:
-                for model_name in model_names:
-                    if "gemini" in model_name.lower():
-                        gemini_model_name = model_name
-                        print(f"Found Gemini model: {gemini_model_name}")
-                        break
-            
-            if not gemini_model_name:
-                print("No Gemini model found, falling back to default")
-                gemini_model_name = "models/gemini-1.5-flash"
-            
-            print(f"Using Gemini model: {gemini_model_name}")
-            gemini_model = genai.GenerativeModel(gemini_model_name)
+            # The model is discovered once per process
+            gemini_model_name = await asyncio.to_thread(gemini_chat_model_name.get)
+            logger.debug(f"Using Gemini model: {gemini_model_name}")
+            gemini_model = get_gemini_model(gemini_model_name)
         except Exception as model_error:
-            print(f"Error initializing Gemini model: {str(model_error)}")
+            logger.error(f"Error initializing Gemini model: {str(model_error)}")
             # Fall back to OpenAI if Gemini fails
-            if OPENAI_API_KEY and client:
-                print("Falling back to OpenAI for chat")
+            if OPENAI_API_KEY:
+                logger.warning("Falling back to OpenAI for chat")
                 return await chat_with_openai(request)
             else:
                 return JSONResponse(
@@ -506,7 +531,7 @@ async def chat_with_ai(request: ChatRequest):
         
         # Create the prompt with context
         prompt = f"{system_prompt}\n\nConversation history:\n{conversation_history}\n\nUser: {request.message}\n\nAssistant:"
-        print(f"Generated prompt for Gemini: {prompt[:200]}...")
+        logger.debug("Generated prompt for Gemini: %s...", prompt[:200])
         
         # Generate response with Gemini
         generation_config = {
@@ -517,25 +542,28 @@ async def chat_with_ai(request: ChatRequest):
         }
         
         try:
-            response = gemini_model.generate_content(
-                prompt,
-                generation_config=generation_config
+            # With LLM_HEDGING, a slow Gemini call is raced against OpenAI
+            response_text = await hedged_call(
+                "chat",
+                ("gemini", lambda: gemini_generate_content(gemini_model, prompt,
+                                                           generation_config=generation_config).text),
+                ("openai", lambda: openai_chat_text(chat_openai_messages(request))) if OPENAI_API_KEY else None,
             )
-            print(f"Gemini response received: {response.text[:100]}...")
+            logger.debug("Chat response received: %s...", response_text[:100])
             
             # Return the response
             return {
-                "response": response.text,
+                "response": response_text,
                 "chat_history": request.chat_history + [
                     {"role": "user", "content": request.message},
-                    {"role": "assistant", "content": response.text}
+                    {"role": "assistant", "content": response_text}
                 ]
             }
         except Exception as gemini_error:
-            print(f"Error with Gemini API: {str(gemini_error)}")
-            # Fall back to OpenAI if Gemini fails
-            if OPENAI_API_KEY and client:
-                print("Falling back to OpenAI for chat after Gemini error")
+            logger.error(f"Error with Gemini API: {str(gemini_error)}")
+            # Fall back to OpenAI if Gemini fails (a hedged call has already tried it)
+            if OPENAI_API_KEY and not LLM_HEDGING:
+                logger.warning("Falling back to OpenAI for chat after Gemini error")
                 return await chat_with_openai(request)
             else:
                 # Return a fallback response
@@ -548,55 +576,65 @@ async def chat_with_ai(request: ChatRequest):
                     ]
                 }
     except Exception as e:
-        print(f"Error in chat API: {str(e)}")
-        traceback_str = traceback.format_exc()
-        print(f"Traceback: {traceback_str}")
+        logger.exception(f"Error in chat API: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={"detail": f"Error generating chat response: {str(e)}"}
         )
 
+def chat_openai_messages(request: ChatRequest):
+    """
+    OpenAI chat messages for a chat request: a system prompt for the chat mode,
+    the chat history and the current user message.
+    """
+    # Prepare system prompt based on chat mode
+    if request.mode == "paper_summary":
+        system_prompt = "You are an expert research assistant who specializes in summarizing academic papers."
+    elif request.mode == "skill_roadmap":
+        system_prompt = "You are a career development coach who creates personalized learning roadmaps."
+    else:
+        system_prompt = "You are a helpful AI assistant that provides accurate, informative responses."
+    
+    # Create messages array with system message, chat history, and current user message
+    messages = [
+        {"role": "system", "content": system_prompt}
+    ]
+    
+    # Add chat history if available
+    if request.chat_history:
+        for msg in request.chat_history:
+            if msg.get("role") in ["user", "assistant", "system"]:
+                messages.append({
+                    "role": msg.get("role"),
+                    "content": msg.get("content", "")
+                })
+    
+    # Add current user message
+    messages.append({"role": "user", "content": request.message})
+    return messages
+
+def openai_chat_text(messages, temperature=0.7):
+    """
+    Reply text of a GPT-3.5 chat completion (blocking)
+    """
+    response = openai_chat_completion(
+        get_openai_client(),
+        model="gpt-3.5-turbo",  # Using GPT-3.5 for cost efficiency
+        messages=messages,
+        temperature=temperature,
+        max_tokens=800
+    )
+    return response.choices[0].message.content
+
 async def chat_with_openai(request: ChatRequest):
     """
     Fallback chat function using OpenAI
     """
     try:
-        print("Using OpenAI for chat")
-        # Prepare system prompt based on chat mode
-        if request.mode == "paper_summary":
-            system_prompt = "You are an expert research assistant who specializes in summarizing academic papers."
-        elif request.mode == "skill_roadmap":
-            system_prompt = "You are a career development coach who creates personalized learning roadmaps."
-        else:
-            system_prompt = "You are a helpful AI assistant that provides accurate, informative responses."
-        
-        # Create messages array with system message, chat history, and current user message
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
-        
-        # Add chat history if available
-        if request.chat_history:
-            for msg in request.chat_history:
-                if msg.get("role") in ["user", "assistant", "system"]:
-                    messages.append({
-                        "role": msg.get("role"),
-                        "content": msg.get("content", "")
-                    })
-        
-        # Add current user message
-        messages.append({"role": "user", "content": request.message})
-        
+        logger.debug("Using OpenAI for chat")
         # Generate response using OpenAI
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Using GPT-3.5 for cost efficiency
-            messages=messages,
-            temperature=0.7,
-            max_tokens=800
-        )
-        
-        openai_response = response.choices[0].message.content
-        print(f"OpenAI response received: {openai_response[:100]}...")
+        openai_response = await asyncio.to_thread(openai_chat_text, chat_openai_messages(request))
+        logger.debug("OpenAI response received: %s...", openai_response[:100])
         
         # Return the response
         return {
@@ -607,7 +645,7 @@ async def chat_with_openai(request: ChatRequest):
             ]
         }
     except Exception as e:
-        print(f"Error in OpenAI chat fallback: {str(e)}")
+        logger.error(f"Error in OpenAI chat fallback: {str(e)}")
         # Return a fallback response
         fallback_response = "I'm having trouble connecting to my AI service right now. Could you please try again in a moment?"
         return {
@@ -618,105 +656,224 @@ async def chat_with_openai(request: ChatRequest):
             ]
         }
 
-@app.post("/process-job")
-async def process_job(job_data: JobDescription):
+def prepare_job_description(job_data: JobDescription):
     """
-    Process a job description using CrewAI.
+    Resolve the job description text for a job, scraping the URL with Firecrawl when requested.
+    Updates job_data.title and job_data.company if Firecrawl extracts them.
     """
+    # Shared Firecrawl client, or None if no API key is configured
+    firecrawl_app_local = get_firecrawl_app()
+
+    job_description = job_data.description
+    
+    # Try to use Firecrawl if requested and available
+    if job_data.useFirecrawl and firecrawl_app_local:
+        try:
+            logger.debug(f"Attempting to scrape URL with Firecrawl: {job_data.url}")
+            # Use Firecrawl to get a clean version of the job page
+            with start_span("firecrawl.scrape_url", kind="CLIENT", attributes={"url": job_data.url}):
+                scrape_result = firecrawl_app_local.scrape_url(job_data.url, params={'formats': ['markdown', 'extract']})
+            
+            # Log the scrape result for debugging
+            log_payload(logger, "Firecrawl scrape result", scrape_result)
+            
+            if scrape_result.get('markdown'):
+                logger.debug("Using Firecrawl markdown content")
+                job_description = scrape_result['markdown']
+            elif scrape_result.get('extract'):
+                logger.debug("Using Firecrawl extract content")
+                job_description = scrape_result['extract']
+            else:
+                logger.warning("No usable content found in Firecrawl result, falling back to provided description")
+            
+            # Try to extract structured data if available
+            if scrape_result.get('extract_result'):
+                extract_result = scrape_result['extract_result']
+                if extract_result.get('job_title'):
+                    job_data.title = extract_result['job_title']
+                    logger.info(f"Updated job title from Firecrawl: {job_data.title}")
+                if extract_result.get('company_name'):
+                    job_data.company = extract_result['company_name']
+                    logger.info(f"Updated company name from Firecrawl: {job_data.company}")
+        except Exception as e:
+            logger.exception(f"Error using Firecrawl: {str(e)}")
+            logger.warning("Falling back to provided job description")
+    else:
+        if not job_data.useFirecrawl:
+            logger.debug("Firecrawl not requested by client")
+        elif not firecrawl_app_local:
+            logger.warning("Firecrawl not available (API key missing)")
+    
+    # Ensure we have a job description to work with
+    if not job_description or len(job_description.strip()) < 10:
+        logger.warning("Job description is too short or empty, using fallback text")
+        job_description = f"Job title: {job_data.title}, Company: {job_data.company}"
+    
+    # Limit the job description length to prevent overwhelming the LLM
+    max_length = 8000
+    if len(job_description) > max_length:
+        logger.warning(f"Job description too long ({len(job_description)} chars), truncating to {max_length} chars")
+        job_description = job_description[:max_length]
+    
+    logger.debug(f"Processing job description with CrewAI (length: {len(job_description)} chars)")
+    return job_description
+
+def extract_job_details(job_description):
+    """
+    Extract structured job details with the JobSkillCrew, caching results by job description.
+    """
+    cache_key = make_key(job_skill_crew.get().mode, job_description)
+    cached_result = job_extraction_cache.get(cache_key)
+    if cached_result is not None:
+        logger.debug("Using cached job extraction result")
+        return cached_result
+    
+    result = job_skill_crew.get().process_job_description(job_description)
+    
+    # Convert CrewOutput to a dictionary if needed
+    if hasattr(result, 'raw_output'):
+        # If it's a CrewOutput object with raw_output attribute
+        result_dict = result.raw_output
+    elif hasattr(result, '__dict__'):
+        # If it has a __dict__ attribute, convert it to a dictionary
+        result_dict = result.__dict__
+    elif isinstance(result, str):
+        # If it's a string, try to parse it as JSON
+        try:
+            result_dict = json.loads(result)
+        except json.JSONDecodeError:
+            result_dict = {"raw_text": result}
+    else:
+        # Otherwise, just use the result as is
+        result_dict = result
+    
+    # Don't cache unparsed output so the next request gets another chance
+    if not (isinstance(result_dict, dict) and "raw_text" in result_dict):
+        job_extraction_cache.set(cache_key, result_dict)
+    return result_dict
+
+async def run_process_job(payload):
+    """
+    Scrape (if requested) and extract a job posting; the result of a process-job job.
+    """
+    job_data = JobDescription(**payload)
+    job_description = await asyncio.to_thread(prepare_job_description, job_data)
+    result_dict = await asyncio.to_thread(extract_job_details, job_description)
+    log_payload(logger, "CrewAI result (processed)", result_dict)
+    await save_processed_job(job_data, job_description, result_dict)
+    return {"result": result_dict}
+
+async def save_processed_job(job_data, job_description, result_dict):
+    """
+    Store a processed job among its user's saved jobs; a storage error only logs a warning.
+    Jobs of callers that gave no user id are not saved.
+    """
+    if not job_data.user_id or not isinstance(result_dict, dict) or "raw_text" in result_dict:
+        return
+    job = {
+        "id": job_data.url,
+        "url": job_data.url,
+        "title": job_data.title or result_dict.get("role") or "",
+        "company": job_data.company or result_dict.get("company") or "",
+        "description": job_description,
+        "skills": result_dict.get("key_skills") or [],
+        "extraction": result_dict,
+    }
     try:
-        # Initialize Firecrawl if API key is available
-        firecrawl_app_local = None
-        if os.environ.get("FIRECRAWL_API_KEY"):
-            firecrawl_app_local = FirecrawlApp(api_key=os.environ.get("FIRECRAWL_API_KEY"))
-            print(f"Firecrawl initialized with API key")
-        else:
-            print(f"Firecrawl API key not found in environment variables")
+        await asyncio.to_thread(job_store.save_jobs, job_data.user_id, [job])
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Could not save processed job: {str(e)}")
 
-        job_description = job_data.description
-        
-        # Try to use Firecrawl if requested and available
-        if job_data.useFirecrawl and firecrawl_app_local:
+@app.post("/process-job")
+async def process_job(
+    job_data: JobDescription,
+    async_mode: bool = Query(False, alias="async"),
+    callback_url: Optional[str] = Query(None),
+    prefer: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+    x_user_id: Optional[str] = Header(None),
+):
+    """
+    Process a job description using CrewAI.
+
+    With ?async=true (or a "Prefer: respond-async" header) the job is queued
+    and a 202 response with its job_id returns at once; poll GET /jobs/{job_id}
+    or stream GET /jobs/{job_id}/events for the result, or pass callback_url to
+    have the finished job POSTed there. A retried submission with the same
+    Idempotency-Key header returns the original job; keys are scoped to the
+    named user, so they need a user_id field or X-User-Id header.
+    """
+    if not job_data.user_id and x_user_id:
+        job_data.user_id = x_user_id
+    if async_mode or (prefer and "respond-async" in prefer.lower()):
+        if idempotency_key and not job_data.user_id:
+            # Anonymous callers fall back to their client address, which callers behind one NAT or
+            # proxy share, so their keys could return each other's jobs
+            raise HTTPException(status_code=400, detail="Idempotency-Key requires a user_id field or X-User-Id header")
+        if callback_url:
             try:
-                print(f"Attempting to scrape URL with Firecrawl: {job_data.url}")
-                # Use Firecrawl to get a clean version of the job page
-                scrape_result = firecrawl_app_local.scrape_url(job_data.url, params={'formats': ['markdown', 'extract']})
-                
-                # Log the scrape result for debugging
-                print(f"Firecrawl scrape result: {json.dumps(scrape_result, indent=2)}")
-                
-                if scrape_result.get('markdown'):
-                    print(f"Using Firecrawl markdown content")
-                    job_description = scrape_result['markdown']
-                elif scrape_result.get('extract'):
-                    print(f"Using Firecrawl extract content")
-                    job_description = scrape_result['extract']
-                else:
-                    print(f"No usable content found in Firecrawl result, falling back to provided description")
-                
-                # Try to extract structured data if available
-                if scrape_result.get('extract_result'):
-                    extract_result = scrape_result['extract_result']
-                    if extract_result.get('job_title'):
-                        job_data.title = extract_result['job_title']
-                        print(f"Updated job title from Firecrawl: {job_data.title}")
-                    if extract_result.get('company_name'):
-                        job_data.company = extract_result['company_name']
-                        print(f"Updated company name from Firecrawl: {job_data.company}")
-            except Exception as e:
-                print(f"Error using Firecrawl: {str(e)}")
-                print(f"Traceback: {traceback.format_exc()}")
-                print(f"Falling back to provided job description")
-        else:
-            if not job_data.useFirecrawl:
-                print(f"Firecrawl not requested by client")
-            elif not firecrawl_app_local:
-                print(f"Firecrawl not available (API key missing)")
-        
-        # Ensure we have a job description to work with
-        if not job_description or len(job_description.strip()) < 10:
-            print(f"Job description is too short or empty, using fallback text")
-            job_description = f"Job title: {job_data.title}, Company: {job_data.company}"
-        
-        # Limit the job description length to prevent overwhelming the LLM
-        max_length = 8000
-        if len(job_description) > max_length:
-            print(f"Job description too long ({len(job_description)} chars), truncating to {max_length} chars")
-            job_description = job_description[:max_length]
-        
-        print(f"Processing job description with CrewAI (length: {len(job_description)} chars)")
-        
+                await asyncio.to_thread(validate_callback_url, callback_url)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        job, created = await asyncio.to_thread(
+            job_queue.submit, "process-job", job_data.model_dump(), job_data.user_id or current_user(),
+            idempotency_key, callback_url)
+        logger.info("Queued process-job job" if created else "Returning existing job for idempotency key",
+                    extra={"job_id": job["id"]})
+        status_url = f"/jobs/{job['id']}"
+        return JSONResponse(
+            status_code=200 if job["status"] in FINISHED else 202,
+            content={**job_view(job), "status_url": status_url, "events_url": f"{status_url}/events"},
+            headers={"Location": status_url},
+        )
+    try:
         # Process with CrewAI
         try:
-            result = job_skill_crew.process_job_description(job_description)
-            
-            # Convert CrewOutput to a dictionary if needed
-            if hasattr(result, 'raw_output'):
-                # If it's a CrewOutput object with raw_output attribute
-                result_dict = result.raw_output
-            elif hasattr(result, '__dict__'):
-                # If it has a __dict__ attribute, convert it to a dictionary
-                result_dict = result.__dict__
-            elif isinstance(result, str):
-                # If it's a string, try to parse it as JSON
-                try:
-                    result_dict = json.loads(result)
-                except json.JSONDecodeError:
-                    result_dict = {"raw_text": result}
-            else:
-                # Otherwise, just use the result as is
-                result_dict = result
-                
-            print(f"CrewAI result (processed): {json.dumps(result_dict, indent=2) if isinstance(result_dict, dict) else str(result_dict)}")
-            return {"result": result_dict}
+            return await run_process_job(job_data.model_dump())
         except Exception as e:
-            print(f"Error processing with CrewAI: {str(e)}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception(f"Error processing with CrewAI: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error processing with CrewAI: {str(e)}")
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0)):
+    """
+    Status of a background job, with its result or error once finished.
+    With ?wait=N the request is held for up to N seconds (at most 60) until the job finishes.
+    """
+    job = await wait_for_job(job_queue, job_id, min(wait, JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events for a background job: a "status" event whenever the
+    job changes, ending with its result or error once it finishes.
+    """
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current = job
+        yield f"event: status\ndata: {json.dumps(job_view(current))}\n\n"
+        while current["status"] not in FINISHED:
+            updated = await wait_for_job(job_queue, job_id, 15.0, changed_since=current["updated_at"])
+            if updated is None:
+                return
+            if updated["updated_at"] == current["updated_at"]:
+                # Comment line so proxies do not close an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            current = updated
+            yield f"event: status\ndata: {json.dumps(job_view(current))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.post("/analyze-resume")
 async def analyze_resume(request: ResumeAnalysisRequest):
     """
@@ -725,39 +882,36 @@ async def analyze_resume(request: ResumeAnalysisRequest):
     try:
         # Print debug info about the received resume
         resume_length = len(request.resume_text) if request.resume_text else 0
-        print(f"Received resume text with length: {resume_length}")
+        logger.info(f"Received resume text with length: {resume_length}")
         if resume_length > 0:
-            print(f"First 100 chars: {request.resume_text[:100]}")
+            logger.debug(f"First 100 chars: {request.resume_text[:100]}")
         
         # Print debug info about the extracted job skills
         if request.extracted_job_skills:
-            print(f"Received extracted job skills: {request.extracted_job_skills}")
+            log_payload(logger, "Received extracted job skills", request.extracted_job_skills)
         else:
-            print("No extracted job skills received")
+            logger.debug("No extracted job skills received")
         
         # Basic validation for empty or very short text
         if not request.resume_text or len(request.resume_text.strip()) < 50:
-            print("Resume validation failed: Empty or too short text")
+            logger.warning("Resume validation failed: Empty or too short text")
             return {"error": "The uploaded document appears to be empty or too short. Please upload a valid resume."}
         
         # Validate if the document is a resume
         if not is_valid_resume(request.resume_text):
-            print("Resume validation failed: Not a valid resume format")
+            logger.warning("Resume validation failed: Not a valid resume format")
             return {"error": "The uploaded document does not appear to be a valid resume. Please ensure your document contains sections like education, experience, and skills."}
         
-        print("Resume validation passed, proceeding with analysis using Gemini API")
-        
-        # Extract skills using regex as a simple fallback method
-        import re
-        skills = list(set(re.findall(r'\b(python|java|javascript|typescript|c\+\+|c#|ruby|php|swift|kotlin|go|rust|sql|html|css|react|angular|vue|node\.js|django|flask|spring|express|tensorflow|pytorch|docker|kubernetes|aws|azure|gcp|git)\b', request.resume_text.lower())))
+        logger.info("Resume validation passed, proceeding with analysis using Gemini API")
         
         # For missing skills, use job skills that aren't in the detected skills
-        missing = []
+        all_job_skills = []
         if request.extracted_job_skills:
             tech_skills = request.extracted_job_skills.get('technical_skills', [])
             soft_skills = request.extracted_job_skills.get('soft_skills', [])
             all_job_skills = tech_skills + soft_skills
-            missing = [skill for skill in all_job_skills if skill.lower() not in [s.lower() for s in skills]]
+        # Embedding skills may call OpenAI (SKILL_EMBEDDINGS=openai), so it runs off the event loop
+        skills, missing = await asyncio.to_thread(find_resume_skill_gaps, request.resume_text, all_job_skills)
         
         # If no skills found, use hardcoded ones
         if not skills:
@@ -774,8 +928,7 @@ async def analyze_resume(request: ResumeAnalysisRequest):
         }
         
     except Exception as e:
-        print(f"Error in analyze_resume: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception(f"Error in analyze_resume: {str(e)}")
         
         return {
             "skills": ["Python", "Data Analysis", "JavaScript", "HTML/CSS", "SQL", "Communication"],
@@ -783,13 +936,202 @@ async def analyze_resume(request: ResumeAnalysisRequest):
             "error": None
         }
 
+# Most saved jobs one /analyze-resume-jobs request may compare a resume with
+MAX_GAP_ANALYSIS_JOBS = 1000
+
+@app.post("/analyze-resume-jobs")
+async def analyze_resume_jobs(request: MultiJobResumeAnalysisRequest):
+    """
+    Analyze a resume against many saved jobs at once: each job's skill coverage, how many jobs
+    ask for each missing skill, and the skills that would raise coverage the most.
+    """
+    if len(request.jobs) > MAX_GAP_ANALYSIS_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_GAP_ANALYSIS_JOBS} jobs can be analyzed at once")
+    if not request.resume_text or len(request.resume_text.strip()) < 50:
+        return {"error": "The uploaded document appears to be empty or too short. Please upload a valid resume."}
+    if not is_valid_resume(request.resume_text):
+        return {"error": "The uploaded document does not appear to be a valid resume. Please ensure your document contains sections like education, experience, and skills."}
+    
+    def analyze():
+        # Imported on first use, since it loads NumPy
+        from utils.skill_gaps import analyze_job_gaps
+        jobs = [job.model_dump() for job in request.jobs]
+        return analyze_job_gaps(request.resume_text, jobs, find_resume_skill_gaps, limit=request.limit)
+    
+    with start_span("skills.gap_analysis", attributes={"skills.jobs": len(request.jobs)}):
+        result = await asyncio.to_thread(analyze)
+    logger.info(f"Analyzed resume against {len(request.jobs)} jobs, mean coverage {result['mean_coverage']}")
+    return dict(result, error=None)
+
+def parse_experience_level(value):
+    """The experience level a request filters by, or None; an unrecognized level is a 400 error."""
+    if not value:
+        return None
+    from utils.job_search import EXPERIENCE_LEVELS, experience_level
+    level = experience_level(value)
+    if level is None:
+        raise HTTPException(status_code=400, detail=f"Unknown experience level {value!r}; expected one of {', '.join(EXPERIENCE_LEVELS)}")
+    return level
+
+async def search_job_index(span_name, **query):
+    """Run a search of the job corpus in a worker thread, under a trace span."""
+    query["limit"] = max(0, min(query.get("limit", 20), 100))
+    with start_span(span_name) as span:
+        result = await asyncio.to_thread(lambda: job_index.get().search(**query))
+        span.set_attribute("jobs.matches", result["total"])
+    return dict(result, error=None)
+
+@app.post("/search-jobs")
+async def search_jobs(request: JobSearchRequest):
+    """
+    Search the job corpus for postings that fit a resume: its skills and the keywords are matched
+    against postings, optionally filtered by location and experience level and boosted by skill goals.
+    """
+    level = parse_experience_level(request.experience_level)
+    skills = (await tag_skills_async(request.resume_text))["skills"] if request.resume_text.strip() else []
+    if not skills and not request.keywords and not request.skill_goals:
+        return {"error": "No skills found in the resume; add keywords to search by.", "total": 0, "results": []}
+    result = await search_job_index(
+        "jobs.search", query=" ".join(skills + request.keywords + request.skill_goals), skills=skills,
+        goals=request.skill_goals, location=request.location, level=level, limit=request.limit)
+    return dict(result, skills=skills)
+
+def tokenize_job_query(job_title, job_description, words=20):
+    """The most frequent words of a posting's description beyond its title, to match similar postings by."""
+    from utils.job_search import tokenize
+    title_words = set(tokenize(job_title))
+    counts = Counter(word for word in tokenize(job_description) if word not in title_words and len(word) > 2)
+    return [word for word, _ in counts.most_common(words)]
+
+@app.post("/match-job")
+async def match_job(request: JobMatchRequest):
+    """Find the postings in the job corpus most similar to a job posting, by title, description words and skills."""
+    tagged = await tag_skills_async(request.job_description, request.job_title)
+    keywords = " ".join(tokenize_job_query(request.job_title, request.job_description))
+    result = await search_job_index(
+        "jobs.match", query=f"{request.job_title} {' '.join(tagged['skills'])} {keywords}",
+        skills=tagged["skills"], limit=request.limit, exclude=[request.url] if request.url else [])
+    return dict(result, skills=tagged["skills"])
+
+@app.post("/match-skill-goals")
+async def match_skill_goals(request: SkillGoalsRequest):
+    """
+    Find postings for a user's skill goals: postings asking for the goal skills rank first, and among
+    them those needing the fewest skills the user does not have yet.
+    """
+    if not request.skill_goals:
+        raise HTTPException(status_code=400, detail="skill_goals must not be empty")
+    level = parse_experience_level(request.experience_level)
+    result = await search_job_index(
+        "jobs.skill_goals", query=" ".join(request.skill_goals), skills=request.current_skills,
+        goals=request.skill_goals, location=request.location, level=level, limit=request.limit)
+    return result
+
+@app.post("/users/{user_id}/saved-jobs")
+async def save_user_jobs(user_id: str, request: SavedJobsRequest):
+    """
+    Save (insert or replace) a batch of a user's jobs, keyed by job id.
+    Returns the user's sync cursor after the change.
+    """
+    if len(request.jobs) > MAX_SAVED_JOBS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SAVED_JOBS_BATCH} jobs can be saved at once")
+    try:
+        cursor = await asyncio.to_thread(job_store.save_jobs, user_id, request.jobs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"saved": len(request.jobs), "cursor": cursor}
+
+@app.get("/users/{user_id}/saved-jobs")
+async def list_user_jobs(
+    user_id: str,
+    company: Optional[str] = None,
+    role: Optional[str] = None,
+    skill: Optional[str] = None,
+    q: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    A user's saved jobs, newest first, filtered by company, role (words of the title), skill,
+    text (q, words of the title, company or description) and saved date (ISO dates, since inclusive).
+    """
+    try:
+        since_time, until_time = parse_timestamp(since), parse_timestamp(until)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since and until must be ISO 8601 dates")
+    return await asyncio.to_thread(job_store.query, user_id, company=company, role=role, skill=skill, text=q,
+                                   since=since_time, until=until_time, limit=limit, offset=offset)
+
+@app.get("/users/{user_id}/saved-jobs/changes")
+async def sync_user_jobs(user_id: str, since: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=1000)):
+    """
+    The changes to a user's saved jobs after the cursor `since`: saved or updated jobs, the ids of
+    deleted jobs, and the cursor to pass next time. "more" is true when another page of changes remains.
+    """
+    return await asyncio.to_thread(job_store.changes, user_id, since, limit)
+
+@app.get("/users/{user_id}/skill-stats")
+async def user_skill_stats(
+    user_id: str,
+    top: int = Query(20, ge=1, le=200),
+    pairs: int = Query(20, ge=0, le=200),
+    months: int = Query(12, ge=0, le=120),
+    skill: Optional[str] = None,
+):
+    """
+    Skill frequency across a user's saved jobs for the dashboard: the most common skills, the skill pairs
+    that appear together most (or the skills paired with `skill`), and monthly counts of the top skills.
+    """
+    return await asyncio.to_thread(job_store.skill_stats, user_id, top=top, pairs=pairs, months=months, skill=skill)
+
+@app.delete("/users/{user_id}/saved-jobs/{job_id}")
+async def delete_user_job(user_id: str, job_id: str):
+    """Delete one of a user's saved jobs."""
+    cursor = await asyncio.to_thread(job_store.delete_job, user_id, job_id)
+    if cursor is None:
+        raise HTTPException(status_code=404, detail="Saved job not found")
+    return {"deleted": job_id, "cursor": cursor}
+
+def compute_project_recommendations(skill_gaps, current_skills):
+    """
+    Recommend projects with the JobSkillCrew, bypassing the cache.
+    """
+    return job_skill_crew.get().recommend_projects(skill_gaps, current_skills)
+
+def recommend_projects_cached(skill_gaps, current_skills):
+    """
+    Recommend projects for a skill gap set, serving identical or near-identical gap sets from cache.
+    """
+    return project_recommendation_cache.get_or_compute(skill_gaps, current_skills, compute_project_recommendations)
+
+async def warm_project_recommendations():
+    """
+    Warm the project recommendation cache from PROJECT_CACHE_WARM_FILE, then periodically
+    recompute the most requested gap sets whose entries have expired.
+    """
+    combinations = load_warm_combinations(os.getenv("PROJECT_CACHE_WARM_FILE", ""))
+    if combinations:
+        warmed = await asyncio.to_thread(project_recommendation_cache.warm, compute_project_recommendations, combinations)
+        logger.info(f"Warmed project recommendation cache with {warmed} gap sets")
+    
+    interval = float(os.getenv("PROJECT_CACHE_WARM_INTERVAL", "3600"))
+    top_n = int(os.getenv("PROJECT_CACHE_WARM_TOP_N", "20"))
+    while interval > 0:
+        await asyncio.sleep(interval)
+        warmed = await asyncio.to_thread(project_recommendation_cache.warm, compute_project_recommendations, None, top_n)
+        if warmed:
+            logger.info(f"Re-warmed {warmed} popular project recommendation gap sets")
+
 @app.post("/recommend-projects")
 async def recommend_projects(request: ProjectRecommendationRequest):
     """
     Recommend projects based on skill gaps.
     """
     try:
-        result = job_skill_crew.recommend_projects(
+        result = await asyncio.to_thread(
+            recommend_projects_cached,
             request.skill_gaps,
             request.current_skills
         )
@@ -800,8 +1142,7 @@ async def recommend_projects(request: ProjectRecommendationRequest):
                 pass
         return {"result": result}
     except Exception as e:
-        print("❌ Error in recommend_projects endpoint:")
-        print(traceback.format_exc())
+        logger.exception("Error in recommend_projects endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -810,22 +1151,70 @@ class LearningResourcesRequest(BaseModel):
     current_skills: List[str] = []
     limit: int = 5
 
+# Bump when the learning resources prompt changes so stale entries are not reused
+LEARNING_RESOURCES_PROMPT_VERSION = "1"
+
+# Learning resources cached per (skill, limit, prompt version)
+learning_resource_cache = create_cache(
+    "learning_resources",
+    maxsize=int(os.getenv("LEARNING_RESOURCES_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("LEARNING_RESOURCES_CACHE_TTL", "604800"))
+)
+
 @app.post("/recommend-learning-resources")
 async def recommend_learning_resources(request: LearningResourcesRequest):
     """
     Recommend learning resources (projects, websites, videos, books) for skill gaps using Gemini API.
     """
+    # The Gemini client is blocking, so run it off the event loop
+    return await asyncio.to_thread(get_learning_resources, request)
+
+def learning_resource_key(skill, limit):
+    """
+    Cache key for one skill's learning resources.
+    """
+    return make_key(LEARNING_RESOURCES_PROMPT_VERSION, canonical_skill(skill), limit)
+
+def get_learning_resources(request: LearningResourcesRequest):
+    """
+    Generate learning resources for skill gaps with Gemini, falling back to mock resources on errors.
+    Resources are cached per skill; only skills without cached resources are sent to Gemini,
+    in a single batched prompt.
+    """
     try:
+        # Compose the response from cached skills and collect the uncached ones, grouping
+        # spellings of the same skill ("JS", "JavaScript") so each is generated once
+        resources_by_skill = {}
+        uncached = {}
+        for skill in request.skill_gaps:
+            cached_resources = learning_resource_cache.get(learning_resource_key(skill, request.limit))
+            if cached_resources is not None:
+                resources_by_skill[skill] = dict(cached_resources, skill=skill)
+                continue
+            spellings = uncached.setdefault(canonical_skill(skill), [])
+            if skill not in spellings:
+                spellings.append(skill)
+        uncached_skills = [spellings[0] for spellings in uncached.values()]
+        
+        def compose(error=None):
+            resources = [resources_by_skill[skill] for skill in request.skill_gaps if skill in resources_by_skill]
+            return {"error": error, "resources": resources} if error else {"resources": resources}
+        
+        def fill_with_mocks(error):
+            skills = [skill for spellings in uncached.values() for skill in spellings]
+            for skill_resources in generate_mock_learning_resources(skills, len(skills)):
+                resources_by_skill[skill_resources["skill"]] = skill_resources
+            return compose(error)
+        
+        logger.info(f"Learning resources: {len(resources_by_skill)} skills cached, {len(uncached_skills)} to generate")
+        if not uncached_skills:
+            return compose()
+        
         if not GEMINI_API_KEY:
-            return {
-                "error": "Gemini API key not configured",
-                "resources": generate_mock_learning_resources(request.skill_gaps, request.limit)
-            }
+            return fill_with_mocks("Gemini API key not configured")
         
         prompt = f"""
-        I need recommendations for learning resources to help develop the following skills: {', '.join(request.skill_gaps)}.
-        
-        I already know these skills: {', '.join(request.current_skills)}.
+        I need recommendations for learning resources to help develop the following skills: {', '.join(uncached_skills)}.
         
         Please provide the top {request.limit} most effective learning resources for each skill gap. For each skill, include:
         1. Projects to build (with brief descriptions)
@@ -836,57 +1225,57 @@ async def recommend_learning_resources(request: LearningResourcesRequest):
         Format your response as a JSON object with the following structure:
         {{"resources": [{{"skill": "skill name", "projects": [...], "websites": [...], "videos": [...], "books": [...]}}]}}
         
-        Each resource should include a title and brief description.
+        Use each skill name exactly as given. Each resource should include a title and brief description.
         """
         
         try:
-            gemini_model = genai.GenerativeModel('gemini-pro')
+            gemini_model = get_gemini_model(GEMINI_JSON_MODEL)
             
-            generation_config = {
+            generation_config = gemini_json_config({
                 "temperature": 0.8,  
                 "top_p": 0.95,       
                 "top_k": 40,         
-                "max_output_tokens": 800,  
-            }
+                "max_output_tokens": max(800, 400 * len(uncached_skills)),
+            })
             
-            system_prompt = "You are an expert learning resource curator. Provide clear, concise, and accurate information. Format your response using markdown for better readability when appropriate."
+            system_prompt = "You are an expert learning resource curator. Provide clear, concise, and accurate information. Respond with JSON only."
             
-            enhanced_prompt = f"{system_prompt}\n\n{prompt}"
+            def call_gemini(prompt_text):
+                response = gemini_generate_content(
+                    gemini_model,
+                    f"{system_prompt}\n\n{prompt_text}",
+                    generation_config=generation_config
+                )
+                return response.text
             
-            response = gemini_model.generate_content(
-                enhanced_prompt,
-                generation_config=generation_config
-            )
+            try:
+                generated = to_jsonable(generate_structured(call_gemini, prompt, LearningResources))
+            except StructuredOutputError as parse_err:
+                logger.error(f"Error parsing Gemini response as JSON: {parse_err}")
+                log_payload(logger, "Gemini response text", parse_err.raw_text)
+                return fill_with_mocks(f"Failed to parse Gemini response: {str(parse_err)}")
             
-            response_text = response.text
+            # Match generated entries back to the requested skills, caching each skill once
+            # and filling every requested spelling of it
+            for skill_resources in generated["resources"]:
+                spellings = uncached.pop(canonical_skill(skill_resources["skill"]), None)
+                if spellings is None:
+                    continue
+                learning_resource_cache.set(learning_resource_key(spellings[0], request.limit), skill_resources)
+                for skill in spellings:
+                    resources_by_skill[skill] = dict(skill_resources, skill=skill)
             
-            try:
-                json_match = re.search(r'\{\s*"resources".*\}', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    resources = json.loads(json_str)
-                else:
-                    resources = json.loads(response_text)
-                
-                return resources
-            except json.JSONDecodeError as json_err:
-                print(f"Error parsing Gemini response as JSON: {json_err}")
-                print(f"Response text: {response_text}")
-                return {
-                    "error": f"Failed to parse Gemini response: {str(json_err)}",
-                    "resources": generate_mock_learning_resources(request.skill_gaps, request.limit)
-                }
+            # Skills the model skipped get mock resources, which are not cached
+            if uncached:
+                return fill_with_mocks(None)
+            return compose()
                 
         except Exception as gemini_err:
-            print(f"Error calling Gemini API: {gemini_err}")
-            return {
-                "error": f"Gemini API error: {str(gemini_err)}",
-                "resources": generate_mock_learning_resources(request.skill_gaps, request.limit)
-            }
+            logger.error(f"Error calling Gemini API: {gemini_err}")
+            return fill_with_mocks(f"Gemini API error: {str(gemini_err)}")
             
     except Exception as e:
-        print("❌ Error in recommend_learning_resources endpoint:")
-        print(traceback.format_exc())
+        logger.exception("Error in recommend_learning_resources endpoint")
         return {
             "error": str(e),
             "resources": generate_mock_learning_resources(request.skill_gaps, request.limit)
@@ -923,6 +1312,79 @@ def generate_mock_learning_resources(skill_gaps, limit=5):
     
     return resources
 
+class PipelineRequest(BaseModel):
+    job: JobDescription
+    resume_text: Optional[str] = ""
+    limit: int = 5
+
+def pipeline_event(stage, **fields):
+    """
+    Serialize one pipeline stage result as a line of newline-delimited JSON.
+    """
+    return json.dumps({"stage": stage, **fields}) + "\n"
+
+async def run_pipeline_stage(stage, func, *args):
+    """
+    Run a blocking pipeline stage in a worker thread, capturing any error.
+    """
+    try:
+        with start_span(f"pipeline.{stage}"):
+            return stage, await asyncio.to_thread(func, *args), None
+    except Exception as e:
+        logger.exception(f"Error in pipeline stage {stage}: {str(e)}")
+        return stage, None, str(e)
+
+@app.post("/pipeline")
+async def run_pipeline(request: PipelineRequest):
+    """
+    Run job extraction, skill gap analysis, and project and learning-resource recommendations
+    in a single request. Each stage's output is streamed as newline-delimited JSON as soon as it
+    finishes; the two recommendation stages run concurrently.
+    """
+    async def stages():
+        # Stage 1: job extraction (shares the extraction cache with /process-job)
+        job_description = await asyncio.to_thread(prepare_job_description, request.job)
+        stage, job_details, error = await run_pipeline_stage("extraction", extract_job_details, job_description)
+        if error:
+            yield pipeline_event(stage, error=error)
+            yield pipeline_event("done")
+            return
+        yield pipeline_event(stage, result=job_details)
+        
+        # Stage 2: skill gap analysis
+        job_skills = job_details.get("key_skills", []) if isinstance(job_details, dict) else []
+        if request.resume_text:
+            current_skills, missing_skills = await asyncio.to_thread(find_resume_skill_gaps, request.resume_text, job_skills)
+        else:
+            current_skills, missing_skills = [], list(job_skills)
+        yield pipeline_event("skill_gaps", result={"skills": current_skills, "missing_skills": missing_skills})
+        
+        # Stage 3: project and learning-resource recommendations, streamed in completion order
+        if missing_skills:
+            recommendation_stages = [
+                run_pipeline_stage(
+                    "projects",
+                    recommend_projects_cached,
+                    [{"name": skill} for skill in missing_skills],
+                    [{"name": skill} for skill in current_skills]
+                ),
+                run_pipeline_stage(
+                    "learning_resources",
+                    get_learning_resources,
+                    LearningResourcesRequest(skill_gaps=missing_skills, current_skills=current_skills, limit=request.limit)
+                ),
+            ]
+            for next_stage in asyncio.as_completed(recommendation_stages):
+                stage, result, error = await next_stage
+                if error:
+                    yield pipeline_event(stage, error=error)
+                else:
+                    yield pipeline_event(stage, result=result)
+        
+        yield pipeline_event("done")
+    
+    return StreamingResponse(stages(), media_type="application/x-ndjson")
+
 # Interview preparation models
 class InterviewRequest(BaseModel):
     resume_text: str
@@ -957,7 +1419,7 @@ async def conduct_interview(request: InterviewRequest):
         
         vectara_initialized = await initialize_vectara_corpus()
         if not vectara_initialized:
-            print("Using fallback interview method without Vectara")
+            logger.warning("Using fallback interview method without Vectara")
         
         using_vectara = vectara_initialized
         
@@ -977,10 +1439,10 @@ async def conduct_interview(request: InterviewRequest):
                 resume_index_result = await interview_helper.index_resume(resume_text=request.resume_text)
                 
                 if not job_index_result or not resume_index_result:
-                    print("Failed to index job description or resume in Vectara, using fallback mode")
+                    logger.warning("Failed to index job description or resume in Vectara, using fallback mode")
                     using_vectara = False
             except Exception as e:
-                print(f"Error during Vectara indexing: {str(e)}")
+                logger.error(f"Error during Vectara indexing: {str(e)}")
                 using_vectara = False
         
         context = f"""
@@ -1017,13 +1479,13 @@ async def conduct_interview(request: InterviewRequest):
                     if question_data and 'question' in question_data:
                         prompt = f"{context}\n\nYou are starting a new interview. Introduce yourself briefly as the interviewer and ask the following question: {question_data['question']}\n\nKeep your response concise."
                     else:
-                        print("No valid question generated from Vectara, falling back to direct prompt")
+                        logger.warning("No valid question generated from Vectara, falling back to direct prompt")
                         prompt = f"{context}\n\nYou are starting a new interview. Introduce yourself briefly as the interviewer and ask your first question related to the job description and candidate's resume. The question should be relevant to {request.focus} skills at a {request.difficulty} difficulty level. Keep your response concise."
                 else:
-                    print("Using direct prompt for first question (Vectara not available)")
+                    logger.warning("Using direct prompt for first question (Vectara not available)")
                     prompt = f"{context}\n\nYou are starting a new interview. Introduce yourself briefly as the interviewer and ask your first question related to the job description and candidate's resume. Keep your response concise."
             except Exception as e:
-                print(f"Error generating first question: {str(e)}")
+                logger.error(f"Error generating first question: {str(e)}")
                 prompt = f"{context}\n\nYou are starting a new interview. Introduce yourself briefly as the interviewer and ask your first question related to the job description and candidate's resume. Keep your response concise."
         elif len(request.previous_conversation) >= 10:
             is_final_message = True
@@ -1050,10 +1512,10 @@ async def conduct_interview(request: InterviewRequest):
                     if question_data and 'question' in question_data:
                         prompt = f"{context}\n\nConversation history:\n{conversation_history}\n\nThe candidate just said: \"{last_candidate_response}\"\n\nRespond to what they said in a conversational way, acknowledging specific points they made, and then naturally transition to asking this follow-up question: {question_data['question']}\n\nMake your response feel like a natural conversation rather than a scripted interview. Show that you're actively listening to their answers."
                     else:
-                        print("No valid follow-up question generated from Vectara, falling back to direct prompt")
+                        logger.warning("No valid follow-up question generated from Vectara, falling back to direct prompt")
                         prompt = f"{context}\n\nConversation history:\n{conversation_history}\n\nThe candidate just said: \"{last_candidate_response}\"\n\nRespond to what they said in a conversational way, acknowledging specific points they made. Then ask a natural follow-up question that builds on something specific they mentioned, probing deeper into their experience with {request.focus} at a {request.difficulty} difficulty level. Make your response feel like a natural conversation rather than a scripted interview. Show that you're actively listening to their answers."
                 else:
-                    print("Using direct prompt for follow-up question (Vectara not available)")
+                    logger.warning("Using direct prompt for follow-up question (Vectara not available)")
                     last_candidate_response = ""
                     for msg in reversed(request.previous_conversation):
                         if msg.get('role') == 'candidate':
@@ -1062,7 +1524,7 @@ async def conduct_interview(request: InterviewRequest):
                     
                     prompt = f"{context}\n\nConversation history:\n{conversation_history}\n\nThe candidate just said: \"{last_candidate_response}\"\n\nRespond to what they said in a conversational way, acknowledging specific points they made. Then ask a natural follow-up question that builds on something specific they mentioned, probing deeper into their experience with {request.focus} at a {request.difficulty} difficulty level. Make your response feel like a natural conversation rather than a scripted interview. Show that you're actively listening to their answers."
             except Exception as e:
-                print(f"Error generating follow-up question: {str(e)}")
+                logger.error(f"Error generating follow-up question: {str(e)}")
                 conversation_history = "\n".join([f"{msg.get('role').capitalize()}: {msg['content']}" for msg in request.previous_conversation])
                 
                 last_candidate_response = ""
@@ -1080,7 +1542,7 @@ async def conduct_interview(request: InterviewRequest):
             forced_question = "Thank you for sharing that. Now I'd like to know about your experience working in teams. Can you describe a project where you collaborated with others on data analysis or statistical work?"
             prompt = f"{context}\n\nConversation history:\n{conversation_history}\n\nThe candidate just said: \"{last_candidate_response}\"\n\nRespond with: {forced_question}"
         
-        gemini_model = genai.GenerativeModel('gemini-pro')
+        gemini_model = get_gemini_model('gemini-pro')
         
         generation_config = {
             "temperature": 0.8,  
@@ -1093,61 +1555,25 @@ async def conduct_interview(request: InterviewRequest):
         
         enhanced_prompt = f"{system_prompt}\n\n{prompt}"
         
-        response = gemini_model.generate_content(
-            enhanced_prompt,
-            generation_config=generation_config
+        # With LLM_HEDGING, a slow (or failed) Gemini call is raced against OpenAI
+        interview_messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}]
+        interview_response = await hedged_call(
+            "interview",
+            ("gemini", lambda: gemini_generate_content(gemini_model, enhanced_prompt,
+                                                       generation_config=generation_config).text),
+            ("openai", lambda: openai_chat_text(interview_messages, temperature=0.8)) if OPENAI_API_KEY else None,
         )
-        interview_response = response.text
         
         if is_final_message:
             try:
-                sections = re.split(r'\n\s*(?=\d+\.\s*[A-Z_]+:)', interview_response)
-                
-                conclusion = ""
-                overall_assessment = ""
-                strengths = []
-                weaknesses = []
-                technical_evaluation = ""
-                behavioral_evaluation = ""
-                final_recommendation = ""
-                
-                conclusion_match = re.search(r'CONCLUSION:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if conclusion_match:
-                    conclusion = conclusion_match.group(1).strip()
-                else:
-                    conclusion = sections[0] if sections else interview_response
-                
-                overall_match = re.search(r'OVERALL_ASSESSMENT:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if overall_match:
-                    overall_assessment = overall_match.group(1).strip()
-                
-                strengths_match = re.search(r'STRENGTHS:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if strengths_match:
-                    strengths_text = strengths_match.group(1).strip()
-                    strengths = re.findall(r'[-*•]\s*(.*?)(?=\n[-*•]|$)', strengths_text, re.DOTALL)
-                    if not strengths:
-                        strengths = re.findall(r'(?:\d+\.)\s*(.*?)(?=\n\d+\.|$)', strengths_text, re.DOTALL)
-                    strengths = [s.strip() for s in strengths if s.strip()]
-                
-                improvement_match = re.search(r'AREAS_FOR_IMPROVEMENT:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if improvement_match:
-                    weaknesses_text = improvement_match.group(1).strip()
-                    weaknesses = re.findall(r'[-*•]\s*(.*?)(?=\n[-*•]|$)', weaknesses_text, re.DOTALL)
-                    if not weaknesses:
-                        weaknesses = re.findall(r'(?:\d+\.)\s*(.*?)(?=\n\d+\.|$)', weaknesses_text, re.DOTALL)
-                    weaknesses = [w.strip() for w in weaknesses if w.strip()]
-                
-                tech_match = re.search(r'TECHNICAL_EVALUATION:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if tech_match:
-                    technical_evaluation = tech_match.group(1).strip()
-                
-                behavioral_match = re.search(r'BEHAVIORAL_EVALUATION:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if behavioral_match:
-                    behavioral_evaluation = behavioral_match.group(1).strip()
-                
-                recommendation_match = re.search(r'FINAL_RECOMMENDATION:\s*(.*?)(?=\n\s*\d+\.\s*[A-Z_]+:|$)', interview_response, re.DOTALL)
-                if recommendation_match:
-                    final_recommendation = recommendation_match.group(1).strip()
+                evaluation = parse_interview_evaluation(interview_response)
+                conclusion = evaluation["conclusion"]
+                overall_assessment = evaluation["overall_assessment"]
+                strengths = evaluation["strengths"]
+                weaknesses = evaluation["weaknesses"]
+                technical_evaluation = evaluation["technical_evaluation"]
+                behavioral_evaluation = evaluation["behavioral_evaluation"]
+                final_recommendation = evaluation["final_recommendation"]
                 
                 feedback_parts = []
                 if overall_assessment:
@@ -1164,7 +1590,7 @@ async def conduct_interview(request: InterviewRequest):
                 if not strengths or not weaknesses:
                     interview_response = conclusion
             except Exception as e:
-                print(f"Error extracting feedback: {str(e)}")
+                logger.error(f"Error extracting feedback: {str(e)}")
                 pass
         
         conversation = request.previous_conversation.copy()
@@ -1183,12 +1609,31 @@ async def conduct_interview(request: InterviewRequest):
         )
         
     except Exception as e:
-        print(f"Error in interview API: {str(e)}")
+        logger.error(f"Error in interview API: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={"detail": f"Error generating interview response: {str(e)}"}
         )
 
+# Expose hit/miss counters for every response cache on /metrics
+register_cache_metrics(lambda: [
+    job_extraction_cache.stats(),
+    project_recommendation_cache.stats(),
+    learning_resource_cache.stats(),
+])
+register_job_metrics(job_queue.counts)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics: request counts and latency per route, LLM calls, latency
+    and tokens by provider and model, LLM rate limit queueing and 429s, hedged
+    LLM calls and wins, Vectara calls, executor queue depth, background jobs by
+    status and cache hit rates. With several workers (METRICS_DIR), every
+    worker's metrics are merged.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
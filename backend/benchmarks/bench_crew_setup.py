@@ -0,0 +1,78 @@
+"""
+Microbenchmark of per-request CrewAI setup overhead (no LLM calls are made).
+
+"before" builds a fresh Agent, Task and Crew for every request, as JobSkillCrew
+used to. "after" checks a prebuilt crew out of a CrewPool and only renders the
+precompiled task prompt into it. Prompt rendering is also timed on its own.
+
+Usage (from the backend directory):
+    python benchmarks/bench_crew_setup.py [--iterations 200] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pipeline import SAMPLE_JOB_DESCRIPTION
+from agents.prompts import EXTRACTION_PROMPT
+
+
+def time_per_call(fn, iterations):
+    """Return the mean wall time of fn() in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    from crewai import Crew
+    from agents.crew import JobSkillCrew
+
+    startup_start = time.perf_counter()
+    job_skill_crew = JobSkillCrew(mode="crew")
+    startup_ms = (time.perf_counter() - startup_start) * 1000
+
+    def before():
+        agent = job_skill_crew.agents.create_extraction_agent()
+        task = job_skill_crew.tasks.extraction_task(agent, SAMPLE_JOB_DESCRIPTION)
+        Crew(agents=[agent], tasks=[task], verbose=True)
+
+    def after():
+        with job_skill_crew.pools["extraction"].checkout() as crew:
+            crew.tasks[0].description = EXTRACTION_PROMPT.render(job_description=SAMPLE_JOB_DESCRIPTION)
+
+    results = {
+        "iterations": args.iterations,
+        "pool_startup_ms": round(startup_ms, 1),
+        "setup_us_per_request": {
+            "before": round(time_per_call(before, args.iterations), 1),
+            "after": round(time_per_call(after, args.iterations), 1),
+        },
+        "prompt_render_us": {
+            "str_format": round(time_per_call(
+                lambda: EXTRACTION_PROMPT.template.format(job_description=SAMPLE_JOB_DESCRIPTION),
+                args.iterations * 50), 2),
+            "precompiled": round(time_per_call(
+                lambda: EXTRACTION_PROMPT.render(job_description=SAMPLE_JOB_DESCRIPTION),
+                args.iterations * 50), 2),
+        },
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark job search over a large corpus of postings.
+
+Generates a seeded synthetic corpus (or loads --corpus, a JSON lines file in
+the JOB_CORPUS_PATH format), indexes it and reports the indexing time and the
+median and p95 latency of search queries: resume skills with keywords, with
+location and experience level filters, and with skill goals.
+
+Usage (from the backend directory):
+    python benchmarks/bench_job_search.py [--postings 100000] [--corpus job_corpus.jsonl]
+        [--queries 200] [--limit 20] [--write-corpus job_corpus.jsonl] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from utils.job_search import JobIndex, load_job_corpus
+from utils.skill_taxonomy import all_skills
+
+ROLES = ["Software Engineer", "Data Scientist", "Backend Developer", "Frontend Developer", "DevOps Engineer",
+         "Machine Learning Engineer", "Data Engineer", "Full Stack Developer", "Product Designer", "QA Engineer"]
+LEVELS = ["Intern", "Junior", "", "", "Senior", "Lead"]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA", "London, UK",
+             "Berlin, Germany", "Toronto, Canada", "Chicago, IL", "Boston, MA"]
+FILLER = ("We are looking for a motivated teammate to build reliable products for our customers. "
+          "You will design, ship and maintain features, review code and mentor others. ")
+
+
+def generate_corpus(count, seed=7):
+    """Synthetic postings with taxonomy skills, titles, locations and levels."""
+    rng = random.Random(seed)
+    skills = all_skills()
+    corpus = []
+    for number in range(count):
+        posting_skills = rng.sample(skills, rng.randint(4, 12))
+        title = f"{rng.choice(LEVELS)} {rng.choice(ROLES)}".strip()
+        corpus.append({
+            "id": f"posting-{number}",
+            "title": title,
+            "company": f"Company {rng.randrange(5000)}",
+            "location": rng.choice(LOCATIONS),
+            "url": f"https://jobs.example.com/{number}",
+            "description": FILLER * rng.randint(1, 3) + "Requirements: experience with "
+                           + ", ".join(posting_skills) + ".",
+            "skills": posting_skills,
+        })
+    return corpus
+
+
+def make_queries(count, seed=11):
+    rng = random.Random(seed)
+    skills = all_skills()
+    queries = []
+    for number in range(count):
+        user_skills = rng.sample(skills, rng.randint(5, 15))
+        query = {"query": " ".join(user_skills + [rng.choice(ROLES)]), "skills": user_skills}
+        if number % 3 == 1:
+            query.update(location=rng.choice(LOCATIONS).split(",")[0], level=rng.choice(["entry", "senior"]))
+        if number % 3 == 2:
+            query["goals"] = rng.sample(skills, 3)
+        queries.append(query)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job search indexing time and query latency")
+    parser.add_argument("--postings", type=int, default=100000, help="Synthetic postings to generate")
+    parser.add_argument("--corpus", help="Index this JSON lines corpus instead of a synthetic one")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to time")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+    parser.add_argument("--write-corpus", metavar="PATH", help="Also save the synthetic corpus to this file")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.corpus:
+        index = load_job_corpus(args.corpus)
+    else:
+        corpus = generate_corpus(args.postings)
+        if args.write_corpus:
+            with open(args.write_corpus, "w") as f:
+                for posting in corpus:
+                    f.write(json.dumps(posting) + "\n")
+        index = JobIndex()
+        for posting in corpus:
+            index.add(posting)
+    index_seconds = time.perf_counter() - start
+
+    queries = make_queries(args.queries)
+    # The first query merges the indexed postings into the search arrays
+    start = time.perf_counter()
+    index.search(**queries[0], limit=args.limit)
+    first_query_ms = (time.perf_counter() - start) * 1000
+    timings = []
+    totals = []
+    for query in queries:
+        start = time.perf_counter()
+        totals.append(index.search(**query, limit=args.limit)["total"])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    results = {
+        "postings": len(index),
+        "index_seconds": round(index_seconds, 2),
+        "first_query_ms": round(first_query_ms, 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "median_matches": int(statistics.median(totals)),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
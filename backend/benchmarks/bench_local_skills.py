@@ -0,0 +1,159 @@
+"""
+Benchmark the local skill extractor against recorded LLM skill lists.
+
+Each line of the samples file is a job posting with the skills the LLM
+extracted from it: {"job_title": ..., "job_description": ..., "skills": [...]}.
+Skills are compared by canonical taxonomy name. For each confidence threshold
+the benchmark reports how many postings the local extractor would answer
+without the LLM, and its precision and recall on those postings against the
+LLM's skills. The rule-based fallback is reported alongside for comparison, as
+is the median and p95 latency of both extractors.
+
+--record URL fills in the skills of samples that have none by calling
+URL/extract-job-skills on an API server running without the local extractor,
+and writes them back to the samples file, so the LLM is called once per
+posting.
+
+Usage (from the backend directory):
+    python benchmarks/bench_local_skills.py [--samples benchmarks/skill_samples.jsonl]
+        [--record http://localhost:8000] [--processes 2] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from utils.skill_extraction import extract_skills_rule_based
+from utils.skill_tagger import tag_skills
+from utils.skill_taxonomy import canonical_skill_set
+
+DEFAULT_SAMPLES = os.path.join(BACKEND_DIR, "benchmarks", "skill_samples.jsonl")
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+
+def load_samples(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record_llm_skills(samples, path, url):
+    """Ask the API for the skills of samples without any and save them to the samples file."""
+    recorded = 0
+    for sample in samples:
+        if sample.get("skills"):
+            continue
+        response = httpx.post(f"{url.rstrip('/')}/extract-job-skills", timeout=120, json={
+            "job_description": sample["job_description"], "job_title": sample.get("job_title", ""),
+            "company": sample.get("company", "")})
+        result = response.json()
+        if result.get("source") == "local" or "skills" not in result:
+            raise SystemExit(f"Could not record LLM skills (is LOCAL_SKILL_EXTRACTOR off?): {result}")
+        sample["skills"] = result["skills"]
+        recorded += 1
+    with open(path, "w") as f:
+        for sample in samples:
+            f.write(json.dumps(sample) + "\n")
+    print(f"Recorded LLM skills for {recorded} samples")
+
+
+def score(predicted, expected):
+    """(true positives, predicted, expected) counts for canonical skill sets."""
+    predicted, expected = set(canonical_skill_set(predicted)), set(canonical_skill_set(expected))
+    return len(predicted & expected), len(predicted), len(expected)
+
+
+def accuracy(scores):
+    true_positives = sum(score[0] for score in scores)
+    predicted = sum(score[1] for score in scores)
+    expected = sum(score[2] for score in scores)
+    precision = true_positives / predicted if predicted else 0.0
+    recall = true_positives / expected if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 3), "recall": round(recall, 3), "f1": round(f1, 3)}
+
+
+def latency(func, samples, rounds):
+    """Median and p95 per-posting latency in microseconds."""
+    timings = []
+    for _ in range(rounds):
+        for sample in samples:
+            start = time.perf_counter()
+            func(sample["job_description"], sample.get("job_title", ""))
+            timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return {"median_us": round(statistics.median(timings), 1),
+            "p95_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1)}
+
+
+def pool_throughput(samples, processes, rounds):
+    """Postings per second tagged by a process pool of the given size."""
+    os.environ["LOCAL_SKILL_PROCESSES"] = str(processes)
+    from utils import skill_tagger
+
+    skill_tagger.LOCAL_SKILL_PROCESSES = processes
+
+    async def run():
+        # Start the workers before timing
+        await skill_tagger.tag_skills_async("warm up")
+        start = time.perf_counter()
+        await asyncio.gather(*(skill_tagger.tag_skills_async(sample["job_description"], sample.get("job_title", ""))
+                               for _ in range(rounds) for sample in samples))
+        return len(samples) * rounds / (time.perf_counter() - start)
+
+    try:
+        return round(asyncio.run(run()), 1)
+    finally:
+        skill_tagger.shutdown_tagger_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local skill extractor accuracy and latency")
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES, help="JSONL of postings with recorded LLM skills")
+    parser.add_argument("--record", metavar="URL", help="Record missing LLM skills from this API server first")
+    parser.add_argument("--rounds", type=int, default=50, help="Latency measurement passes over the samples")
+    parser.add_argument("--processes", type=int, default=0, help="Also measure throughput with this many processes")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if args.record:
+        record_llm_skills(samples, args.samples, args.record)
+    samples = [sample for sample in samples if sample.get("skills")]
+    if not samples:
+        raise SystemExit("No samples with recorded LLM skills; run with --record first")
+
+    tagged = [tag_skills(sample["job_description"], sample.get("job_title", "")) for sample in samples]
+    rule_based = [extract_skills_rule_based(sample["job_description"], sample.get("job_title", ""))
+                  for sample in samples]
+    results = {
+        "samples": len(samples),
+        "rule_based": dict(accuracy([score(skills, sample["skills"]) for skills, sample in zip(rule_based, samples)]),
+                           **latency(extract_skills_rule_based, samples, args.rounds)),
+        "local": dict(accuracy([score(result["skills"], sample["skills"]) for result, sample in zip(tagged, samples)]),
+                      **latency(tag_skills, samples, args.rounds)),
+        "thresholds": [],
+    }
+    for threshold in THRESHOLDS:
+        confident = [(result, sample) for result, sample in zip(tagged, samples) if result["confidence"] >= threshold]
+        results["thresholds"].append(dict(
+            {"threshold": threshold, "offloaded": round(len(confident) / len(samples), 3)},
+            **accuracy([score(result["skills"], sample["skills"]) for result, sample in confident])))
+    if args.processes:
+        results["pool_postings_per_second"] = pool_throughput(samples, args.processes, args.rounds)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark the direct pipeline against the single-agent CrewAI path.
+
+Always reports the prompt size each path sends per call. With --live (and an
+OPENAI_API_KEY in the environment) it also runs job extraction through both
+paths and reports latency and actual token usage.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pipeline.py [--live] [--runs 5] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.pipeline import EXTRACTION_STEP
+from agents.prompts import EXTRACTION_BACKSTORY, EXTRACTION_GOAL, EXTRACTION_ROLE
+
+SAMPLE_JOB_DESCRIPTION = """
+Software Engineer III, Infrastructure - Google
+Mountain View, CA. The US base salary range for this full-time position is $136,000-$200,000.
+
+Minimum qualifications:
+- Bachelor's degree or equivalent practical experience.
+- 2 years of experience with software development in Python, Java or C++.
+- Experience with distributed systems, Kubernetes and Docker.
+
+Preferred qualifications:
+- Master's degree in Computer Science.
+- Experience with Terraform, AWS or Google Cloud, CI/CD pipelines and monitoring (Prometheus, Grafana).
+- Excellent communication and collaboration skills.
+"""
+
+
+def approx_tokens(text):
+    """Rough token estimate (about four characters per token for English text)."""
+    return len(text) // 4
+
+
+def prompt_sizes(job_description):
+    """
+    Estimate the prompt tokens sent by each path for one extraction.
+
+    The CrewAI estimate only counts the agent profile and task text; CrewAI's own
+    scaffolding and any extra agent-loop iterations come on top of it.
+    """
+    task_prompt = EXTRACTION_STEP.render(job_description=job_description)
+    direct = approx_tokens(EXTRACTION_STEP.system_prompt) + approx_tokens(task_prompt)
+    crew = approx_tokens(f"{EXTRACTION_ROLE}\n{EXTRACTION_GOAL}\n{EXTRACTION_BACKSTORY}") + approx_tokens(task_prompt)
+    return {"direct": direct, "crew_minimum": crew}
+
+
+def run_live(mode, runs, job_description):
+    """Run job extraction through one path and collect latency and token usage."""
+    from agents.crew import JobSkillCrew
+
+    crew = JobSkillCrew(mode=mode)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        crew.process_job_description(job_description)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    usage = crew.usage.snapshot()
+    latencies.sort()
+    return {
+        "runs": runs,
+        "latency_ms_mean": round(statistics.mean(latencies), 1),
+        "latency_ms_p50": round(latencies[len(latencies) // 2], 1),
+        "latency_ms_max": round(latencies[-1], 1),
+        "llm_calls_per_run": round(usage["calls"] / runs, 2),
+        "prompt_tokens_per_run": round(usage["prompt_tokens"] / runs, 1),
+        "completion_tokens_per_run": round(usage["completion_tokens"] / runs, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--live", action="store_true", help="Call the LLM through both paths")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per path in live mode")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"estimated_prompt_tokens": prompt_sizes(SAMPLE_JOB_DESCRIPTION)}
+
+    if args.live:
+        if not os.getenv("OPENAI_API_KEY"):
+            parser.error("--live requires OPENAI_API_KEY")
+        results["direct"] = run_live("direct", args.runs, SAMPLE_JOB_DESCRIPTION)
+        results["crew"] = run_live("crew", args.runs, SAMPLE_JOB_DESCRIPTION)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Startup-time benchmark of the API process.
+
+Measures, in fresh interpreters, how long `import api.main` takes and how long
+a uvicorn worker takes from launch until it answers its first request. All
+external service URLs point at a closed local port, so a startup that touches
+the network shows up as slow or failing rather than depending on the internet.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py [--runs 5] [--importtime 15] [--output results.json]
+        [--baseline previous.json --max-regression 0.2]
+
+--importtime lists the slowest top-level imports of api.main (python -X importtime).
+With --baseline the run exits with status 1 if the median import or ready time
+rises by more than --max-regression (a fraction).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from benchmarks.load_test import free_port, git_revision
+
+IMPORT_SCRIPT = ("import time; start = time.perf_counter(); import api.main; "
+                 "print((time.perf_counter() - start) * 1000)")
+
+
+def offline_env():
+    """Environment with placeholder keys and every external endpoint on a closed local port."""
+    closed_url = f"http://127.0.0.1:{free_port()}"
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "sk-placeholder",
+        "OPENAI_BASE_URL": f"{closed_url}/v1",
+        "GEMINI_API_KEY": "placeholder",
+        "GEMINI_API_ENDPOINT": closed_url,
+        "FIRECRAWL_API_KEY": "placeholder",
+        "FIRECRAWL_API_URL": closed_url,
+        "VECTARA_API_KEY": "placeholder",
+        "VECTARA_API_URL": closed_url,
+        "LOG_LEVEL": "WARNING",
+        "TRACE_EXPORTER": "",
+    })
+    return env
+
+
+def measure_import(env):
+    """Return the time in ms to import api.main in a fresh interpreter."""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT], cwd=BACKEND_DIR, env=env, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_ready(env, timeout):
+    """Return the time in ms from launching a uvicorn worker until it answers a request."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/openapi.json"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"API exited with status {process.returncode} during startup")
+            try:
+                if httpx.get(url, timeout=1.0).status_code == 200:
+                    return (time.perf_counter() - start) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        raise SystemExit(f"Timed out waiting for {url}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def slowest_imports(env, count):
+    """Return [(module, cumulative ms)] for the slowest top-level imports of api.main."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import api.main"],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # Modules imported directly by api.main are nested one level (two spaces) below it
+        if module.startswith("   ") and not module.startswith("    ") and cumulative.strip().isdigit():
+            imports.append((module.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:count]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(samples[0], 1),
+        "max_ms": round(samples[-1], 1),
+    }
+
+
+def compare(results, baseline, max_regression):
+    regressions = []
+    for name in ("import", "ready"):
+        before = baseline.get(name, {}).get("median_ms")
+        after = results[name]["median_ms"]
+        if before and after > before * (1 + max_regression):
+            regressions.append(f"{name}: median {after} ms > baseline {before} ms +{max_regression:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API process startup-time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--importtime", type=int, default=0, help="List this many slowest top-level imports")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    env = offline_env()
+    # The first run also warms the bytecode cache, so it is not counted
+    measure_import(env)
+    results = {
+        "benchmark": "startup",
+        "revision": git_revision(),
+        "import": summarize([measure_import(env) for _ in range(args.runs)]),
+        "ready": summarize([measure_ready(env, args.startup_timeout) for _ in range(args.runs)]),
+    }
+    if args.importtime:
+        results["slowest_imports"] = [{"module": module, "cumulative_ms": round(ms, 1)}
+                                      for module, ms in slowest_imports(env, args.importtime)]
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Local stand-ins for the external services the API calls, for load testing.
+
+One FastAPI app serves the subset of the OpenAI, Gemini (REST), Firecrawl and
+Vectara APIs used by the backend. Responses are canned but shaped like the real
+ones (including token usage), and every call waits for a configurable latency
+plus jitter and fails with a configurable probability. With --rpm, OpenAI and
+Gemini calls over that many per minute (per provider) get an HTTP 429 with the
+provider's Retry-After hint, like a real quota. With --slow-rate, that fraction
+of Gemini calls takes --slow-ms longer, to give the latency a long tail.
+
+Usage (from the backend directory):
+    python benchmarks/fake_services.py [--port 8790] [--latency-ms 300] [--jitter-ms 100] [--error-rate 0.0]
+        [--rpm 0] [--slow-rate 0.0 --slow-ms 5000]
+
+Point the API at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8790/v1
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8790
+    FIRECRAWL_API_URL=http://127.0.0.1:8790
+    VECTARA_API_URL=http://127.0.0.1:8790
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+SKILLS = ["Python", "Kubernetes", "Docker", "AWS", "SQL", "Communication", "CI/CD", "Terraform"]
+
+JOB_EXTRACTION = {
+    "company": "Example Corp",
+    "role": "Software Engineer",
+    "key_skills": SKILLS,
+    "requirements": ["Bachelor's degree", "2+ years of Python experience", "Distributed systems experience"],
+    "salary": "$136,000-$200,000",
+}
+
+RESUME_ANALYSIS = {
+    "present_skills": [{"name": "Python", "type": "technical", "level": "advanced"},
+                       {"name": "SQL", "type": "technical", "level": "intermediate"}],
+    "missing_skills": [{"name": "Kubernetes", "type": "technical", "importance": "high"},
+                       {"name": "Terraform", "type": "technical", "importance": "medium"}],
+    "strengths": ["Strong backend experience"],
+    "improvement_areas": ["Cloud infrastructure"],
+}
+
+PROJECT_RECOMMENDATIONS = [
+    {"title": "Deploy a microservice on Kubernetes", "description": "Containerize a Flask API and deploy it.",
+     "skills_targeted": ["Kubernetes", "Docker"], "time_estimate": "2 weeks", "difficulty": "intermediate",
+     "resources": ["https://kubernetes.io/docs/tutorials/"]},
+    {"title": "Provision infrastructure with Terraform", "description": "Describe a small AWS stack as code.",
+     "skills_targeted": ["Terraform", "AWS"], "time_estimate": "1 week", "difficulty": "beginner",
+     "resources": ["https://developer.hashicorp.com/terraform/tutorials"]},
+]
+
+CHAT_REPLY = ("That's a great question. Start with the fundamentals, build a small project that uses them, "
+              "and then iterate on it while reading the official documentation.")
+
+INTERVIEW_QUESTION = "Can you walk me through a project where you designed a service that had to scale?"
+
+INTERVIEW_EVALUATION = """1. CONCLUSION: Thank you for your time today, it was great speaking with you.
+2. OVERALL_ASSESSMENT: The candidate communicated clearly and showed solid backend experience.
+3. STRENGTHS:
+- Clear communication
+- Strong Python experience
+4. AREAS_FOR_IMPROVEMENT:
+- Limited Kubernetes experience
+5. TECHNICAL_EVALUATION: Good understanding of APIs and databases.
+6. BEHAVIORAL_EVALUATION: Collaborative and reflective.
+7. FINAL_RECOMMENDATION: Proceed to the next round.
+"""
+
+JOB_MARKDOWN = """# Software Engineer, Infrastructure - Example Corp
+
+We are looking for a Software Engineer with Python, Kubernetes, Docker, AWS and Terraform experience
+to build and operate distributed systems. Strong communication skills are required.
+
+## Requirements
+- 2+ years of software development in Python
+- Experience with CI/CD pipelines and SQL databases
+"""
+
+
+def approx_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def learning_resources(prompt):
+    """Build a learning resources response for every skill listed in the prompt."""
+    match = re.search(r"develop the following skills: (.*?)\.\s*$", prompt, re.MULTILINE)
+    skills = [skill.strip() for skill in match.group(1).split(",")] if match else ["Python"]
+    item = {"title": "Official documentation", "description": "Start with the official guide."}
+    return {"resources": [{"skill": skill, "projects": [item], "websites": [item], "videos": [item],
+                           "books": [item]} for skill in skills]}
+
+
+def openai_content(messages):
+    """Pick a canned completion based on which backend prompt is being answered."""
+    text = "\n".join(str(message.get("content", "")) for message in messages)
+    if '"skills" array' in text or '{"skills":' in text:
+        return json.dumps({"skills": SKILLS})
+    if "extracting structured data" in text:
+        return json.dumps(JOB_EXTRACTION)
+    if "compare it with the extracted job skills" in text:
+        return json.dumps(RESUME_ANALYSIS)
+    if "recommend 3-5 projects" in text:
+        return json.dumps(PROJECT_RECOMMENDATIONS)
+    return CHAT_REPLY
+
+
+def gemini_content(prompt):
+    if "develop the following skills" in prompt:
+        return json.dumps(learning_resources(prompt))
+    if "CONCLUSION" in prompt:
+        return INTERVIEW_EVALUATION
+    if "interview" in prompt.lower():
+        return INTERVIEW_QUESTION
+    return CHAT_REPLY
+
+
+def create_app(latency_ms=300.0, jitter_ms=100.0, error_rate=0.0, seed=None, rpm=0, slow_rate=0.0, slow_ms=5000.0):
+    """
+    Build the fake services app.
+
+    Args:
+        latency_ms: Mean added latency per call
+        jitter_ms: Latency is drawn uniformly from latency_ms +/- jitter_ms
+        error_rate: Probability that a call fails with HTTP 500
+        seed: Random seed for reproducible latency and error sequences
+        rpm: Requests per minute allowed per LLM provider before HTTP 429s (0 for no limit)
+        slow_rate: Probability that a Gemini call takes slow_ms longer
+        slow_ms: Extra latency of slow Gemini calls
+    """
+    app = FastAPI(title="Fake external services")
+    rng = random.Random(seed)
+    stats = {"calls": 0, "errors": 0, "rate_limited": 0, "slow": 0}
+    # Start times of the calls in the current one-minute window, per provider
+    windows = {"openai": [], "gemini": []}
+
+    def rate_limit(provider):
+        """Return a 429 response if the provider's per-minute quota is used up."""
+        if rpm <= 0:
+            return None
+        now = time.monotonic()
+        window = windows[provider] = [start for start in windows[provider] if now - start < 60]
+        if len(window) < rpm:
+            window.append(now)
+            return None
+        stats["rate_limited"] += 1
+        retry_after = max(1, int(60 - (now - window[0])) + 1)
+        if provider == "openai":
+            return JSONResponse(status_code=429, headers={"retry-after": str(retry_after)},
+                                content={"error": {"message": "Rate limit reached", "type": "requests"}})
+        return JSONResponse(status_code=429, content={"error": {
+            "code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED",
+            "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{retry_after}s"}]}})
+
+    async def simulate(slow=False):
+        """Wait for the simulated latency; return an error response for injected failures."""
+        stats["calls"] += 1
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        if slow and rng.random() < slow_rate:
+            stats["slow"] += 1
+            delay += slow_ms / 1000
+        await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "injected failure"}})
+        return None
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    # OpenAI
+    @app.get("/v1/models")
+    async def openai_models():
+        return {"object": "list", "data": [{"id": "gpt-3.5-turbo", "object": "model", "created": 0,
+                                            "owned_by": "fake"}]}
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        error = rate_limit("openai") or await simulate()
+        if error:
+            return error
+        body = await request.json()
+        messages = body.get("messages", [])
+        content = openai_content(messages)
+        prompt_tokens = sum(approx_tokens(str(message.get("content", ""))) for message in messages)
+        return {
+            "id": f"chatcmpl-{stats['calls']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": approx_tokens(content),
+                      "total_tokens": prompt_tokens + approx_tokens(content)},
+        }
+
+    @app.post("/v1/embeddings")
+    async def openai_embeddings(request: Request):
+        error = rate_limit("openai") or await simulate()
+        if error:
+            return error
+        body = await request.json()
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        # Deterministic pseudo-random vectors, so the same text always gets the same embedding
+        data = [{"object": "embedding", "index": index,
+                 "embedding": random.Random(text.lower()).sample(range(-100, 100), 64)}
+                for index, text in enumerate(inputs)]
+        prompt_tokens = sum(approx_tokens(text) for text in inputs)
+        return {"object": "list", "data": data, "model": body.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens}}
+
+    # Gemini (REST transport)
+    @app.get("/v1beta/models")
+    async def gemini_models():
+        return {"models": [{"name": "models/gemini-1.5-flash", "displayName": "Gemini 1.5 Flash",
+                            "supportedGenerationMethods": ["generateContent"]},
+                           {"name": "models/gemini-pro", "displayName": "Gemini Pro",
+                            "supportedGenerationMethods": ["generateContent"]}]}
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def gemini_generate(model: str, request: Request):
+        error = rate_limit("gemini") or await simulate(slow=True)
+        if error:
+            return error
+        body = await request.json()
+        prompt = "\n".join(part.get("text", "") for content in body.get("contents", [])
+                           for part in content.get("parts", []))
+        text = gemini_content(prompt)
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                            "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": approx_tokens(prompt),
+                              "candidatesTokenCount": approx_tokens(text),
+                              "totalTokenCount": approx_tokens(prompt) + approx_tokens(text)},
+        }
+
+    # Firecrawl (v0 and v1 scrape)
+    @app.post("/v0/scrape")
+    @app.post("/v1/scrape")
+    async def firecrawl_scrape(request: Request):
+        error = await simulate()
+        if error:
+            return error
+        return {"success": True, "data": {"markdown": JOB_MARKDOWN, "metadata": {"title": "Software Engineer"}}}
+
+    # Vectara
+    @app.post("/v1/index")
+    async def vectara_index(request: Request):
+        error = await simulate()
+        if error:
+            return error
+        return {"status": {"code": "OK"}, "document_id": f"doc-{stats['calls']}"}
+
+    @app.post("/v1/query")
+    async def vectara_query(request: Request):
+        error = await simulate()
+        if error:
+            return error
+        text = f"Question: {INTERVIEW_QUESTION} Sample Answer: I designed a queue-based ingestion service."
+        metadata = json.dumps({"category": "technical", "difficulty": "medium"})
+        return {"responseSet": [{"response": [{"text": text, "score": 0.9, "metadata": metadata}]}]}
+
+    return app
+
+
+# App used when served with `uvicorn benchmarks.fake_services:app`, configured from the environment
+app = create_app(
+    latency_ms=float(os.getenv("FAKE_LATENCY_MS", "300")),
+    jitter_ms=float(os.getenv("FAKE_JITTER_MS", "100")),
+    error_rate=float(os.getenv("FAKE_ERROR_RATE", "0")),
+    seed=int(os.getenv("FAKE_SEED", "0")),
+    rpm=int(os.getenv("FAKE_RPM", "0")),
+    slow_rate=float(os.getenv("FAKE_SLOW_RATE", "0")),
+    slow_ms=float(os.getenv("FAKE_SLOW_MS", "5000")),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake OpenAI, Gemini, Firecrawl and Vectara APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rpm", type=int, default=0, help="Per-provider LLM requests per minute before HTTP 429s")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of Gemini calls that are slow")
+    parser.add_argument("--slow-ms", type=float, default=5000.0, help="Extra latency of slow Gemini calls")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed, args.rpm,
+                           args.slow_rate, args.slow_ms),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+End-to-end load test of the API against local stand-ins for external services.
+
+Starts benchmarks/fake_services.py and the API (uvicorn, pointed at the fakes)
+as subprocesses, drives a weighted mix of /process-job, /analyze-resume, /chat,
+/interview and resume upload requests at a fixed concurrency, and reports
+throughput and p50/p95/p99 latency per endpoint as JSON. Request payloads and
+the fake services' latency/error sequences are seeded, so runs are comparable.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py [--requests 200] [--concurrency 16] \\
+        [--mix process-job=4,analyze-resume=3,chat=2,interview=2,upload=1] \\
+        [--latency-ms 300] [--jitter-ms 100] [--error-rate 0.0] [--fake-rpm 0] \\
+        [--fake-slow-rate 0.0 --fake-slow-ms 5000] \\
+        [--workers 1] [--output results.json] [--baseline previous.json --max-regression 0.1]
+
+With --baseline the run exits with status 1 if overall throughput drops, or any
+endpoint's p95 latency rises, by more than --max-regression (a fraction).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from benchmarks.bench_pipeline import SAMPLE_JOB_DESCRIPTION
+
+SAMPLE_RESUME = """
+Jane Doe - Software Engineer
+
+Summary
+Backend engineer with four years of experience building Python and SQL services.
+
+Experience
+Software Engineer, Acme Inc (2021-present)
+- Built REST APIs with Python, Flask and PostgreSQL serving 2M requests per day
+- Migrated batch jobs to Docker containers and GitHub Actions CI
+
+Education
+B.S. Computer Science, State University
+
+Skills
+Python, SQL, Flask, Docker, Git, JavaScript, Communication
+"""
+
+DEFAULT_MIX = "process-job=4,analyze-resume=3,chat=2,interview=2,upload=1"
+
+JOB_TITLES = ["Software Engineer", "Backend Engineer", "Data Engineer", "Platform Engineer", "ML Engineer"]
+CHAT_MESSAGES = [
+    "How should I start learning Kubernetes?",
+    "Summarize the key ideas of the transformer architecture.",
+    "Create a roadmap for becoming a data engineer.",
+    "What are good projects to practice Terraform?",
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(REQUEST_BUILDERS)
+    if unknown:
+        raise SystemExit(f"Unknown request types in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def job_variant(rng, variants):
+    """Pick one of a fixed set of job postings, so repeated postings can hit caches."""
+    index = rng.randrange(variants)
+    title = JOB_TITLES[index % len(JOB_TITLES)]
+    return index, title, f"{title} (posting {index})\n{SAMPLE_JOB_DESCRIPTION}"
+
+
+def build_process_job(rng, variants):
+    index, title, description = job_variant(rng, variants)
+    return "POST", "/process-job", {"json": {
+        "url": f"https://jobs.example.com/{index}", "title": title, "company": "Example Corp",
+        "description": description, "useFirecrawl": True,
+    }}
+
+
+def build_analyze_resume(rng, variants):
+    return "POST", "/analyze-resume", {"json": {
+        "resume_text": SAMPLE_RESUME,
+        "extracted_job_skills": {"technical_skills": ["Python", "Kubernetes", "Docker", "AWS", "Terraform"],
+                                 "soft_skills": ["Communication"]},
+    }}
+
+
+def build_chat(rng, variants):
+    return "POST", "/chat", {"json": {"message": rng.choice(CHAT_MESSAGES), "chat_history": [], "mode": "general"}}
+
+
+def build_interview(rng, variants):
+    _, _, description = job_variant(rng, variants)
+    turns = rng.choice([0, 2, 4])
+    conversation = []
+    for turn in range(turns):
+        role = "interviewer" if turn % 2 == 0 else "candidate"
+        conversation.append({"role": role, "content": f"Turn {turn}: I worked on scaling a Python service."})
+    return "POST", "/interview", {"json": {
+        "resume_text": SAMPLE_RESUME, "job_description": description, "previous_conversation": conversation,
+    }}
+
+
+def build_upload(rng, variants):
+    if rng.random() < 0.5:
+        return "POST", "/extract-resume-text", {"files": {"file": ("resume.txt", SAMPLE_RESUME.encode(), "text/plain")}}
+    return "POST", "/extract-resume-text", {"files": {"file": ("resume.docx", DOCX_RESUME, DOCX_TYPE)}}
+
+
+REQUEST_BUILDERS = {
+    "process-job": build_process_job,
+    "analyze-resume": build_analyze_resume,
+    "chat": build_chat,
+    "interview": build_interview,
+    "upload": build_upload,
+}
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def make_docx(text):
+    import docx
+    document = docx.Document()
+    for line in text.strip().splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+DOCX_RESUME = make_docx(SAMPLE_RESUME)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 3) if elapsed else None,
+        "mean_ms": round(sum(values) / len(values), 2) if values else None,
+        "p50_ms": round(percentile(values, 0.50), 2) if values else None,
+        "p95_ms": round(percentile(values, 0.95), 2) if values else None,
+        "p99_ms": round(percentile(values, 0.99), 2) if values else None,
+        "max_ms": round(values[-1], 2) if values else None,
+    }
+
+
+def wait_until_ready(url, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Process serving {url} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+def start_services(args):
+    """Start the fake services and the API; return (api_url, processes)."""
+    fake_port, api_port = free_port(), free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    fake = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "fake_services.py"), "--port", str(fake_port),
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+         "--error-rate", str(args.error_rate), "--seed", str(args.seed), "--rpm", str(args.fake_rpm),
+         "--slow-rate", str(args.fake_slow_rate), "--slow-ms", str(args.fake_slow_ms)],
+        cwd=BACKEND_DIR,
+    )
+    wait_until_ready(f"{fake_url}/stats", fake, args.startup_timeout)
+
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_BASE_URL": f"{fake_url}/v1",
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_API_ENDPOINT": fake_url,
+        "FIRECRAWL_API_KEY": "fake",
+        "FIRECRAWL_API_URL": fake_url,
+        "VECTARA_API_KEY": "fake",
+        "VECTARA_API_URL": fake_url,
+        "LOG_LEVEL": args.log_level,
+        "TRACE_EXPORTER": "",
+    })
+    if args.disable_caches:
+        for name in ("JOB_EXTRACTION_CACHE_SIZE", "PROJECT_CACHE_SIZE", "LEARNING_RESOURCES_CACHE_SIZE"):
+            env[name] = "0"
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(api_port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    api_url = f"http://127.0.0.1:{api_port}"
+    wait_until_ready(f"{api_url}/openapi.json", api, args.startup_timeout)
+    return api_url, [api, fake]
+
+
+def response_error(response):
+    """Some endpoints report failures as a 200 response with an "error" field."""
+    if not response.headers.get("content-type", "").startswith("application/json"):
+        return False
+    body = response.json()
+    return isinstance(body, dict) and bool(body.get("error"))
+
+
+async def drive(api_url, args, mix):
+    """Send args.requests requests at args.concurrency; return per-endpoint results."""
+    rng = random.Random(args.seed)
+    names, weights = list(mix), list(mix.values())
+    plan = [rng.choices(names, weights)[0] for _ in range(args.requests)]
+    requests = [(name,) + REQUEST_BUILDERS[name](rng, args.payload_variants) for name in plan]
+
+    latencies = {name: [] for name in mix}
+    errors = {name: 0 for name in mix}
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def worker(client):
+        while True:
+            try:
+                name, method, path, kwargs = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                failed = response.status_code >= 400 or response_error(response)
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            if failed:
+                errors[name] += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=args.request_timeout, limits=limits) as client:
+        # Warm up each endpoint once so one-time initialization is not measured
+        for name in mix:
+            _, method, path, kwargs = (name,) + REQUEST_BUILDERS[name](random.Random(0), args.payload_variants)
+            await client.request(method, path, **kwargs)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in mix if latencies[name]},
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Return a list of regressions of results relative to baseline."""
+    regressions = []
+    old, new = baseline["overall"]["throughput_rps"], results["overall"]["throughput_rps"]
+    if old and new < old * (1 - max_regression):
+        regressions.append(f"throughput {new} rps < baseline {old} rps")
+    for name, stats in results["endpoints"].items():
+        old_p95 = baseline.get("endpoints", {}).get(name, {}).get("p95_ms")
+        if old_p95 and stats["p95_ms"] > old_p95 * (1 + max_regression):
+            regressions.append(f"{name} p95 {stats['p95_ms']} ms > baseline {old_p95} ms")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against local fake external services")
+    parser.add_argument("--requests", type=int, default=200, help="Number of measured requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted request mix, e.g. 'chat=2,upload=1'")
+    parser.add_argument("--payload-variants", type=int, default=20,
+                        help="Number of distinct job postings used in requests")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake service latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Fake service latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake service error probability")
+    parser.add_argument("--fake-rpm", type=int, default=0,
+                        help="Per-provider LLM requests per minute the fake services allow before HTTP 429s")
+    parser.add_argument("--fake-slow-rate", type=float, default=0.0,
+                        help="Fraction of fake Gemini calls that take --fake-slow-ms longer")
+    parser.add_argument("--fake-slow-ms", type=float, default=5000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--disable-caches", action="store_true", help="Set all response cache sizes to 0")
+    parser.add_argument("--log-level", default="WARNING", help="LOG_LEVEL of the API under test")
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    api_url, processes = start_services(args)
+    try:
+        results = asyncio.run(drive(api_url, args, mix))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    results = {
+        "benchmark": "load_test",
+        "revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        **results,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
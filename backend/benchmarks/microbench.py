@@ -0,0 +1,286 @@
+"""
+Microbenchmarks for the CPU-bound hot paths of the API.
+
+Times rule-based skill extraction, the resume skill scan (exact and semantic), interview evaluation
+parsing, PDF and DOCX text extraction over a corpus of documents, and JSON
+output recovery from LLM responses. Each benchmark is calibrated to run for
+about --min-time seconds per round; the median per-call time over --rounds
+rounds is compared against a baseline saved on this machine, and the run fails
+if any benchmark is slower than its baseline by more than --tolerance.
+
+Usage (from the backend directory):
+    python benchmarks/microbench.py [--only pdf_text_extraction] [--corpus DIR]
+        [--baseline benchmarks/microbench_baseline.json] [--tolerance 0.25]
+        [--save-baseline] [--history microbench_history.jsonl] [--output results.json]
+
+The corpus is generated in memory; --corpus adds the .pdf and .docx files of a
+directory to it. Baselines are machine specific, so none is committed: save one
+with --save-baseline first. A baseline records the machine it was saved on, and
+on another machine the comparison only warns.
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from benchmarks.bench_pipeline import SAMPLE_JOB_DESCRIPTION
+from benchmarks.fake_services import INTERVIEW_EVALUATION
+from benchmarks.load_test import SAMPLE_RESUME, make_docx
+from utils.document_text import extract_docx_text, extract_pdf_text
+from utils.interview_feedback import parse_interview_evaluation
+from utils.skill_extraction import extract_skills_rule_based, find_skill_gaps, is_valid_resume
+from utils.skill_matching import SkillMatcher
+from utils.structured_output import JobExtraction, parse_structured
+
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "microbench_baseline.json")
+
+JOB_SKILLS = ["Python", "Kubernetes", "Docker", "AWS", "Terraform", "SQL", "Communication", "Go", "React"]
+
+LONG_EVALUATION = INTERVIEW_EVALUATION.replace(
+    "- Strong Python experience",
+    "\n".join(f"- Strength {i}: gave a detailed example with measurable results" for i in range(10)))
+
+PAPER_TEXT = """
+Attention Is All You Need
+
+Abstract
+The dominant sequence transduction models are based on complex recurrent or convolutional neural networks
+that include an encoder and a decoder. We propose a new simple network architecture, the Transformer,
+based solely on attention mechanisms, dispensing with recurrence and convolutions entirely.
+""" * 4
+
+# LLM outputs the JSON recovery path has to handle
+LLM_OUTPUTS = {
+    "clean": json.dumps({"company": "Google", "role": "Software Engineer III", "key_skills": JOB_SKILLS,
+                         "requirements": ["Bachelor's degree", "2 years of experience"], "salary": "$136,000"}),
+    "fenced_with_prose": "Here is the extracted data:\n```json\n" + json.dumps(
+        {"company": "Google", "role": "Software Engineer III", "key_skills": JOB_SKILLS}) + "\n```\nLet me know!",
+    "truncated": json.dumps({"company": "Google", "role": "Software Engineer III", "key_skills": JOB_SKILLS,
+                             "requirements": ["Bachelor's degree", "2 years of experience"]})[:-30],
+}
+
+
+def make_pdf(pages):
+    """Build a minimal PDF with one Helvetica text block per page (a list of line lists)."""
+    def escape(text):
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 750 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode())
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return output.getvalue()
+
+
+def build_corpus(directory=None):
+    """Return {"pdf": [bytes...], "docx": [bytes...]} of sample resumes and papers."""
+    resume_lines = SAMPLE_RESUME.strip().splitlines()
+    paper_lines = [line for line in PAPER_TEXT.strip().splitlines() if line]
+    corpus = {
+        "pdf": [make_pdf([resume_lines]), make_pdf([resume_lines] * 2), make_pdf([paper_lines] * 8)],
+        "docx": [make_docx(SAMPLE_RESUME), make_docx(PAPER_TEXT * 4)],
+    }
+    if directory:
+        for name in sorted(os.listdir(directory)):
+            extension = name.rsplit(".", 1)[-1].lower()
+            if extension in corpus:
+                with open(os.path.join(directory, name), "rb") as f:
+                    corpus[extension].append(f.read())
+    return corpus
+
+
+def build_benchmarks(corpus):
+    """Return {name: zero-argument callable} of the benchmarked operations."""
+    def pdf_corpus():
+        for content in corpus["pdf"]:
+            extract_pdf_text(content)
+
+    def docx_corpus():
+        for content in corpus["docx"]:
+            extract_docx_text(content)
+
+    def json_recovery():
+        for text in LLM_OUTPUTS.values():
+            parse_structured(text, JobExtraction)
+
+    skill_matcher = SkillMatcher(backend="hashing", path=tempfile.mkdtemp())
+
+    return {
+        "rule_based_skill_extraction": lambda: extract_skills_rule_based(SAMPLE_JOB_DESCRIPTION, "Software Engineer"),
+        "resume_skill_scan": lambda: (is_valid_resume(SAMPLE_RESUME), find_skill_gaps(SAMPLE_RESUME, JOB_SKILLS)),
+        "semantic_skill_gaps": lambda: skill_matcher.find_skill_gaps(SAMPLE_RESUME, JOB_SKILLS),
+        "interview_evaluation_parse": lambda: parse_interview_evaluation(LONG_EVALUATION),
+        "pdf_text_extraction": pdf_corpus,
+        "docx_text_extraction": docx_corpus,
+        "json_output_recovery": json_recovery,
+    }
+
+
+def measure(func, rounds, min_time):
+    """Return per-call timings in microseconds over several calibrated rounds."""
+    func()
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or iterations >= 1_000_000:
+            break
+        iterations *= 10
+    iterations = max(1, int(iterations * (min_time / max(elapsed, 1e-9))))
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "min_us": round(min(samples), 3),
+        "median_us": round(statistics.median(samples), 3),
+        "mean_us": round(statistics.mean(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+    }
+
+
+def host_fingerprint():
+    """What the timings depend on: CPU model and count, architecture and Python build."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return {
+        "cpu": cpu,
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for CPU-bound hot paths")
+    parser.add_argument("--only", action="append", help="Run only this benchmark (repeatable)")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Target seconds per round")
+    parser.add_argument("--corpus", help="Directory of extra .pdf/.docx files for the extraction benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline medians to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown of the median relative to the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's medians as the baseline")
+    parser.add_argument("--history", help="Append this run to a JSONL history file")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    args = parser.parse_args()
+
+    # Keep per-page extraction logs out of the timings
+    logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "WARNING"))
+
+    benchmarks = build_benchmarks(build_corpus(args.corpus))
+    if args.only:
+        unknown = set(args.only) - set(benchmarks)
+        if unknown:
+            raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        benchmarks = {name: benchmarks[name] for name in args.only}
+
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = measure(func, args.rounds, args.min_time)
+        print(f"{name:30s} median {results[name]['median_us']:>12.2f} us  "
+              f"min {results[name]['min_us']:>12.2f} us  (x{results[name]['iterations']})")
+
+    run = {
+        "benchmark": "microbench",
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "host": host_fingerprint(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(run) + "\n")
+
+    if args.save_baseline:
+        baseline = {"host": run["host"], "medians": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            # Medians saved on another machine are not kept alongside this one's
+            if previous.get("host") == run["host"]:
+                baseline["medians"] = previous.get("medians", {})
+        baseline["medians"].update({name: stats["median_us"] for name, stats in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; save one with --save-baseline to compare runs", file=sys.stderr)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    # Timings from another machine are not comparable, so a mismatch only warns
+    same_host = baseline.get("host") == run["host"]
+    regressions = []
+    for name, stats in results.items():
+        limit = baseline.get("medians", {}).get(name)
+        if limit and stats["median_us"] > limit * (1 + args.tolerance):
+            regressions.append(f"{name}: median {stats['median_us']} us > baseline {limit} us "
+                               f"+{args.tolerance:.0%}")
+    for regression in regressions:
+        print(f"{'REGRESSION' if same_host else 'WARNING'}: {regression}", file=sys.stderr)
+    if regressions and not same_host:
+        print(f"WARNING: {args.baseline} was saved on another machine ({baseline.get('host')}); "
+              f"not failing the run", file=sys.stderr)
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,63 @@
+"""
+Run the JobSkillTracker API.
+
+By default a single development server reloads on code changes. With
+--production, uvicorn's process manager runs one worker per CPU core
+(WEB_CONCURRENCY overrides). Send SIGHUP for a rolling restart: each worker
+is replaced once its successor is ready (uvicorn 0.51 or later). With more than one worker the caches
+default to the shared SQLite backend, so every worker sees the same entries,
+and /metrics merges every worker's metrics through a shared directory.
+
+Usage (from the backend directory):
+    python run_api.py [--production] [--workers N] [--host 0.0.0.0] [--port 8005]
+"""
+
+import argparse
+import glob
+import os
+
 import uvicorn
 
+from utils.paths import data_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the JobSkillTracker API")
+    parser.add_argument("--production", action="store_true",
+                        help="Run several worker processes without auto-reload")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1,
+                        help="Worker processes in production mode (default: WEB_CONCURRENCY or CPU cores)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8005")))
+    args = parser.parse_args()
+
+    if not args.production:
+        uvicorn.run("api.main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    if args.workers > 1:
+        # Workers are separate processes, so per-process memory caches would diverge
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+        # Each worker only counts its own requests, so they share their metrics through files
+        metrics_dir = os.environ.setdefault("METRICS_DIR", data_path("metrics"))
+        # Metrics of a previous server would otherwise be added to this one's
+        for path in glob.glob(os.path.join(metrics_dir, "metrics-*.json")):
+            os.remove(path)
+    uvicorn.run(
+        "api.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # Let in-flight requests (LLM calls can take tens of seconds) finish on shutdown and restarts
+        timeout_graceful_shutdown=float(os.getenv("GRACEFUL_TIMEOUT", "60")),
+        # Recycle workers after this many requests (0 disables), with jitter so they do not restart together
+        limit_max_requests=int(os.getenv("MAX_REQUESTS", "0")) or None,
+        limit_max_requests_jitter=int(os.getenv("MAX_REQUESTS_JITTER", "0")),
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("api.main:app", host="0.0.0.0", port=8005, reload=True)
+    main()
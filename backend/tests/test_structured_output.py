@@ -0,0 +1,75 @@
+"""
+Tests for the structured output layer: mis-keyed and prose-wrapped replies
+must fail validation (and so reach the repair call) rather than parse to
+empty results.
+
+Usage (from the backend directory):
+    python -m pytest tests
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from utils.structured_output import (
+    JobExtraction,
+    LearningResources,
+    SkillList,
+    StructuredOutputError,
+    generate_structured,
+    parse_structured,
+)
+
+JOB = {"company": "Acme", "role": "Data Engineer", "key_skills": ["Python", "SQL"]}
+
+
+def test_clean_job_extraction():
+    job = parse_structured(json.dumps(JOB), JobExtraction)
+    assert job.company == "Acme"
+    assert job.key_skills == ["Python", "SQL"]
+
+
+@pytest.mark.parametrize("text, schema", [
+    (json.dumps({"job": JOB}), JobExtraction),
+    (json.dumps({"result": []}), LearningResources),
+    (json.dumps({"skill_names": ["Python"]}), SkillList),
+    (json.dumps({"key_skills": ["Python"]}), JobExtraction),
+])
+def test_mis_keyed_output_fails(text, schema):
+    with pytest.raises(StructuredOutputError):
+        parse_structured(text, schema)
+
+
+def test_prose_prefixed_output_skips_other_objects():
+    text = 'Sure! {"note": "skills below"} Here they are:\n```json\n{"skills": ["Python", "Docker"]}\n```'
+    assert parse_structured(text, SkillList).skills == ["Python", "Docker"]
+
+
+def test_prose_with_only_a_stray_object_fails():
+    with pytest.raises(StructuredOutputError):
+        parse_structured('I found these: {"note": "Python, Docker"}', SkillList)
+
+
+def test_bare_list_is_coerced():
+    assert parse_structured('["Python", "Go"]', SkillList).skills == ["Python", "Go"]
+
+
+def test_mis_keyed_output_is_repaired_once():
+    prompts = []
+    replies = iter([json.dumps({"job": JOB}), json.dumps(JOB)])
+
+    def call(prompt):
+        prompts.append(prompt)
+        return next(replies)
+
+    assert generate_structured(call, "extract", JobExtraction).role == "Data Engineer"
+    assert len(prompts) == 2
+
+
+def test_unrepairable_output_raises():
+    with pytest.raises(StructuredOutputError):
+        generate_structured(lambda prompt: '{"result": []}', "recommend", LearningResources)
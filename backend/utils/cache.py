@@ -0,0 +1,369 @@
+"""
+Caching utilities for JobSkillTracker.
+This module provides LRU caches with per-entry TTL and a helper for building
+stable cache keys from request data. TTLCache lives in one process; SQLiteCache
+and RedisCache are shared by every worker process, so a result computed by one
+worker is a hit in the others. create_cache() picks the configured backend.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from .log import get_logger
+from .paths import data_path, ensure_parent
+
+logger = get_logger(__name__)
+
+# "memory" (per process), "sqlite" (a WAL-mode file shared by workers on one host) or "redis"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH") or data_path("cache.sqlite3")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+_MISSING = object()
+
+_sqlite_local = threading.local()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from JSON-serializable parts.
+
+    Dict keys are sorted so that equal payloads always produce the same key.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def sqlite_connection(path: str, schema: str) -> sqlite3.Connection:
+    """
+    Return this thread's autocommit connection to a WAL-mode SQLite database.
+
+    schema is run (as a script) the first time the thread opens the file, so it
+    should only contain CREATE ... IF NOT EXISTS statements.
+    """
+    connections = getattr(_sqlite_local, "connections", None)
+    if connections is None:
+        connections = _sqlite_local.connections = {}
+    connection = connections.get(path)
+    if connection is None:
+        ensure_parent(path)
+        connection = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connections[path] = connection
+    schemas = getattr(_sqlite_local, "schemas", None)
+    if schemas is None:
+        schemas = _sqlite_local.schemas = set()
+    if (path, schema) not in schemas:
+        connection.executescript(schema)
+        schemas.add((path, schema))
+    return connection
+
+
+class _CacheBase:
+    """Hit/miss accounting and get_or_compute shared by the cache backends."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _record(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       should_cache: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            if should_cache(value):
+                self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {"name": self.name, "size": len(self), "hits": self.hits, "misses": self.misses}
+
+
+class TTLCache(_CacheBase):
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Args:
+        name: Cache name, used when reporting statistics
+        maxsize: Maximum number of entries before the least recently used is evicted
+        ttl: Default time-to-live in seconds
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600):
+        super().__init__(name, maxsize, ttl)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Return an unexpired value without updating recency or hit statistics."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+        if entry is not _MISSING and entry[0] > time.monotonic():
+            return entry[1]
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over a snapshot of the unexpired entries."""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now]
+        return iter(snapshot)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (cache TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+    expires_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (cache, key));
+CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (cache, accessed_at);
+"""
+
+
+class SQLiteCache(_CacheBase):
+    """
+    LRU cache with per-entry TTL stored in a SQLite database in WAL mode.
+
+    Every process that opens the same file shares the entries; caches with
+    different names share the file and its table. Values are stored as JSON. Database errors are logged and treated
+    as misses, so a locked or unwritable file never fails a request.
+
+    Args:
+        name: Cache name, used to namespace entries and when reporting statistics
+        maxsize: Maximum number of entries before the least recently used is evicted
+        ttl: Default time-to-live in seconds
+        path: Database file
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600, path: str = CACHE_SQLITE_PATH):
+        super().__init__(name, maxsize, ttl)
+        self.path = path
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite_connection(self.path, _CACHE_SCHEMA)
+
+    def _read(self, key: str, touch: bool) -> Any:
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute("SELECT value, expires_at FROM cache_entries WHERE cache = ? AND key = ?",
+                                     (self.name, key)).fetchone()
+            if row is None:
+                return _MISSING
+            if row[1] <= now:
+                connection.execute("DELETE FROM cache_entries WHERE cache = ? AND key = ?", (self.name, key))
+                return _MISSING
+            if touch:
+                connection.execute("UPDATE cache_entries SET accessed_at = ? WHERE cache = ? AND key = ?",
+                                   (now, self.name, key))
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading {self.name} cache: {str(e)}")
+            return _MISSING
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._read(key, touch=True)
+        self._record(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Return an unexpired value without updating recency or hit statistics."""
+        value = self._read(key, touch=False)
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            connection = self._connection()
+            connection.execute("INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                               (self.name, key, json.dumps(value, default=str), expires_at, now))
+            # Drop expired entries and everything past maxsize in recency order
+            connection.execute(
+                "DELETE FROM cache_entries WHERE cache = ? AND (expires_at <= ? OR key IN ("
+                "SELECT key FROM cache_entries WHERE cache = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?))",
+                (self.name, now, self.name, self.maxsize))
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing {self.name} cache: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE cache = ? AND key = ?", (self.name, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Error deleting from {self.name} cache: {str(e)}")
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE cache = ?", (self.name,))
+        except sqlite3.Error as e:
+            logger.warning(f"Error clearing {self.name} cache: {str(e)}")
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over a snapshot of the unexpired entries."""
+        try:
+            rows = self._connection().execute(
+                "SELECT key, value FROM cache_entries WHERE cache = ? AND expires_at > ?",
+                (self.name, time.time())).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading {self.name} cache: {str(e)}")
+            rows = []
+        return iter([(key, json.loads(value)) for key, value in rows])
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM cache_entries WHERE cache = ?",
+                                              (self.name,)).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+class RedisCache(_CacheBase):
+    """
+    Cache stored in Redis or a Redis-compatible server (Valkey, KeyDB, Dragonfly).
+
+    Every process using the same server shares the entries. Entries expire
+    through Redis TTLs. maxsize is not enforced here; bound memory with the
+    server's maxmemory and an LRU maxmemory-policy. Values are stored as JSON.
+    Connection errors are logged and treated as misses.
+
+    Requires the optional redis package.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600, url: str = CACHE_REDIS_URL):
+        super().__init__(name, maxsize, ttl)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package (pip install redis)")
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self._prefix = f"jobskilltracker:{name}:"
+
+    def _scan(self) -> Iterator[bytes]:
+        return self._client.scan_iter(match=f"{self._prefix}*", count=500)
+
+    def _read(self, key: str) -> Any:
+        try:
+            value = self._client.get(self._prefix + key)
+        except self._errors as e:
+            logger.warning(f"Error reading {self.name} cache: {str(e)}")
+            return _MISSING
+        return _MISSING if value is None else json.loads(value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._read(key)
+        self._record(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Return an unexpired value without updating hit statistics."""
+        value = self._read(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl_ms = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        try:
+            self._client.set(self._prefix + key, json.dumps(value, default=str), px=ttl_ms)
+        except self._errors as e:
+            logger.warning(f"Error writing {self.name} cache: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self._prefix + key)
+        except self._errors as e:
+            logger.warning(f"Error deleting from {self.name} cache: {str(e)}")
+
+    def clear(self) -> None:
+        try:
+            for redis_key in self._scan():
+                self._client.delete(redis_key)
+        except self._errors as e:
+            logger.warning(f"Error clearing {self.name} cache: {str(e)}")
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over a snapshot of the unexpired entries."""
+        snapshot = []
+        try:
+            for redis_key in self._scan():
+                value = self._client.get(redis_key)
+                if value is not None:
+                    snapshot.append((redis_key.decode()[len(self._prefix):], json.loads(value)))
+        except self._errors as e:
+            logger.warning(f"Error reading {self.name} cache: {str(e)}")
+        return iter(snapshot)
+
+    def __len__(self) -> int:
+        try:
+            return sum(1 for _ in self._scan())
+        except self._errors:
+            return 0
+
+
+def create_cache(name: str, maxsize: int = 1024, ttl: float = 3600, backend: Optional[str] = None):
+    """
+    Create a cache on the configured backend (CACHE_BACKEND unless backend is given).
+
+    "memory" is a per-process TTLCache; "sqlite" and "redis" are shared by all
+    worker processes, which keeps result caches coherent when running several workers.
+    """
+    backend = (backend or CACHE_BACKEND).lower()
+    if backend == "memory":
+        return TTLCache(name, maxsize=maxsize, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteCache(name, maxsize=maxsize, ttl=ttl)
+    if backend == "redis":
+        return RedisCache(name, maxsize=maxsize, ttl=ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND {backend!r}; expected memory, sqlite or redis")
@@ -0,0 +1,262 @@
+"""
+Request cancellation and deadlines for JobSkillTracker.
+Each HTTP request gets a CancellationToken, cancelled when the client
+disconnects or when the request's deadline passes. The deadline comes from the
+X-Request-Timeout header (seconds), capped by REQUEST_TIMEOUT. The handler's
+task is cancelled at the same moment, so the endpoint stops at once. A request
+whose deadline passes before its response has started gets a 504.
+
+Blocking work started with asyncio.to_thread cannot be interrupted, so it
+stops cooperatively. The token is carried in a ContextVar that such threads
+inherit. LLM calls check it before they are sent and while they wait for rate
+limit budget, and CrewAI checks it after every agent step. An LLM request
+already in flight is given the remaining time as its HTTP timeout.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from .log import get_logger
+from .tracing import current_span
+
+logger = get_logger(__name__)
+
+# Longest any request may run, in seconds (0 for no limit); also caps X-Request-Timeout
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "0"))
+TIMEOUT_HEADER = b"x-request-timeout"
+# Seconds a handler may take to read its request body before disconnects are watched for regardless
+BODY_WATCH_DELAY = 1.0
+
+CLIENT_DISCONNECTED = "client disconnected"
+DEADLINE_EXCEEDED = "deadline exceeded"
+
+
+class OperationCancelled(RuntimeError):
+    """Raised instead of starting work whose request was cancelled or ran out of time."""
+
+
+class CancellationToken:
+    """
+    Cancellation state shared by everything done for one request.
+
+    Args:
+        deadline: time.monotonic() after which the token counts as cancelled
+        parent: Token whose cancellation and deadline this one inherits
+    """
+
+    def __init__(self, deadline: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        self.parent = parent
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE_EXCEEDED)
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason)
+            return True
+        return False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None without one)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        """Raise OperationCancelled if the token is cancelled."""
+        if self.cancelled:
+            raise OperationCancelled(self.reason)
+
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("cancellation_token", default=None)
+
+
+def current_token() -> Optional[CancellationToken]:
+    return _current_token.get()
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken):
+    """Make token the current token within the block (and tasks and threads started from it)."""
+    reset_token = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset_token)
+
+
+def check_cancelled() -> None:
+    """Raise OperationCancelled if the current request has been cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline (None without one)."""
+    token = _current_token.get()
+    return token.remaining() if token is not None else None
+
+
+def _request_timeout(headers: Dict[bytes, bytes]) -> Optional[float]:
+    timeout = None
+    value = headers.get(TIMEOUT_HEADER)
+    if value:
+        try:
+            timeout = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid X-Request-Timeout header: {value!r}")
+    if timeout is None or timeout <= 0:
+        return REQUEST_TIMEOUT or None
+    return min(timeout, REQUEST_TIMEOUT) if REQUEST_TIMEOUT else timeout
+
+
+class RequestCancellationMiddleware:
+    """
+    ASGI middleware that cancels a request's work when its client disconnects
+    or its deadline passes.
+
+    Once the request body has been read by the app, the request's receive
+    channel is read by a watcher task, which notices the client's disconnect
+    while the handler is still running. The body itself is passed to the app
+    as it reads it, so uploads are never buffered ahead of the app. A handler
+    that does not read its body is watched from its first response message,
+    or after BODY_WATCH_DELAY. The watcher then holds at most one unread body
+    message for it, so until the response starts a larger unread body delays
+    noticing the disconnect rather than being buffered.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        timeout = _request_timeout(headers)
+        token = CancellationToken(deadline=time.monotonic() + timeout if timeout else None)
+        # Messages read by the watcher; at most one is held until the app reads it
+        messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+        disconnected = asyncio.Event()
+        # Set once the app has read the whole body (at once for requests without one) or sent a response
+        body_read = asyncio.Event()
+        if not headers.get(b"transfer-encoding") and headers.get(b"content-length", b"0") in (b"", b"0"):
+            body_read.set()
+        # Clear while the app is reading from the server itself
+        app_idle = asyncio.Event()
+        app_idle.set()
+        response = {"started": False, "complete": False, "disconnect": False, "watching": False}
+
+        def on_disconnect(message: Dict[str, Any]) -> None:
+            response["disconnect"] = True
+            if not response["complete"]:
+                disconnected.set()
+            if messages.empty():
+                messages.put_nowait(message)
+
+        async def watch_receive() -> None:
+            try:
+                await asyncio.wait_for(body_read.wait(), BODY_WATCH_DELAY)
+            except asyncio.TimeoutError:
+                pass
+            # From here the app's receive() reads what the watcher passes on, so the
+            # server is never read twice at once
+            response["watching"] = True
+            await app_idle.wait()
+            # The app may have read the disconnect itself while reading the body
+            while not response["disconnect"]:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    on_disconnect(message)
+                    return
+                if response["started"] and messages.full():
+                    # The app answered without reading its body; drop the rest, as Starlette does
+                    continue
+                await messages.put(message)
+
+        async def receive_wrapper() -> Dict[str, Any]:
+            if not response["watching"]:
+                # The app reads the body straight from the server, so it is not buffered here
+                app_idle.clear()
+                try:
+                    message = await receive()
+                finally:
+                    app_idle.set()
+                if message["type"] == "http.disconnect":
+                    on_disconnect(message)
+                    body_read.set()
+                elif not message.get("more_body", False):
+                    body_read.set()
+                return message
+            if response["disconnect"] and messages.empty():
+                # The disconnect arrived while the queue still held a body message
+                return {"type": "http.disconnect"}
+            message = await messages.get()
+            if message["type"] == "http.disconnect":
+                # Every later receive() sees the disconnect too, as with the server's own channel
+                messages.put_nowait(message)
+            return message
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                response["started"] = True
+                # A handler answering without reading its body is watched from now on
+                body_read.set()
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response["complete"] = True
+            await send(message)
+
+        with cancellation_scope(token):
+            app_task = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+        watcher = asyncio.create_task(watch_receive())
+        disconnect_waiter = asyncio.create_task(disconnected.wait())
+        try:
+            done, _ = await asyncio.wait({app_task, disconnect_waiter}, timeout=token.remaining(),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if app_task in done:
+                app_task.result()
+                return
+            token.cancel(CLIENT_DISCONNECTED if disconnected.is_set() else DEADLINE_EXCEEDED)
+            app_task.cancel()
+            try:
+                await app_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            logger.info(f"Stopped {scope.get('method', '')} {scope.get('path', '')}: {token.reason}")
+            span = current_span()
+            if span is not None:
+                span.set_attribute("http.cancelled", token.reason)
+            if token.reason == DEADLINE_EXCEEDED and not response["started"]:
+                await send_wrapper({"type": "http.response.start", "status": 504,
+                                    "headers": [(b"content-type", b"application/json")]})
+                await send_wrapper({"type": "http.response.body", "body": b'{"detail": "Request deadline exceeded"}'})
+            elif span is not None and not response["started"]:
+                # Client closed request (the status nginx logs for it), so metrics can tell it apart
+                span.set_attribute("http.status_code", 499)
+        except asyncio.CancelledError:
+            token.cancel(CLIENT_DISCONNECTED)
+            app_task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+            disconnect_waiter.cancel()
@@ -0,0 +1,45 @@
+"""
+Document text extraction for JobSkillTracker.
+This module extracts plain text from uploaded PDF and DOCX files (resumes and
+research papers). PyPDF2 and python-docx are imported on first use to keep
+them out of API startup.
+"""
+
+import io
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+def extract_pdf_text(content: bytes) -> str:
+    """
+    Extract the text of every page of a PDF, one page per line block.
+
+    Pages that fail to extract or contain no text are logged and skipped; an
+    unreadable PDF raises the PyPDF2 error.
+    """
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+    logger.info(f"PDF has {len(pdf_reader.pages)} pages")
+
+    pages = []
+    for page_num, page in enumerate(pdf_reader.pages):
+        try:
+            page_text = page.extract_text()
+        except Exception as e:
+            logger.error(f"Error extracting text from page {page_num+1}: {str(e)}")
+            continue
+        if page_text:
+            logger.debug(f"Extracted {len(page_text)} characters from page {page_num+1}")
+            pages.append(page_text + "\n")
+        else:
+            logger.warning(f"No text extracted from page {page_num+1}")
+    return "".join(pages)
+
+
+def extract_docx_text(content: bytes) -> str:
+    """Extract the paragraph text of a DOCX document, one paragraph per line."""
+    import docx
+    document = docx.Document(io.BytesIO(content))
+    return "\n".join(paragraph.text for paragraph in document.paragraphs)
@@ -0,0 +1,212 @@
+"""
+Hedged LLM calls for JobSkillTracker.
+A hedged call sends a request to its primary provider and, if no response has
+arrived within that provider's recent latency percentile for the operation,
+sends the same request to a secondary provider. The first successful response
+is used and the other call is cancelled. The primary failing outright starts
+the secondary at once.
+
+The LLM calls are not streamed, so the hedge delay is measured against the
+time to a complete response rather than to the first token. A cancelled call
+that is still waiting for its rate limit budget leaves the queue (see
+cancellation.py); one already sent cannot be aborted by the synchronous SDKs,
+so its response is discarded.
+Hedged calls run on their own thread pool, so abandoned calls still waiting
+for a response do not hold up the default executor used by asyncio.to_thread.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .cancellation import CancellationToken, cancellation_scope, current_token
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+LLM_HEDGING = os.getenv("LLM_HEDGING", "0") == "1"
+# Latency percentile of the primary provider after which the secondary is started
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Hedge delay bounds in seconds; the maximum is also used until enough latencies are known
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1"))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "10"))
+# Largest fraction of recent calls that may be hedged, so a slow provider cannot double the load
+LLM_HEDGE_MAX_RATE = float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1"))
+# Threads running hedged calls, including abandoned ones until their responses arrive
+LLM_HEDGE_THREADS = int(os.getenv("LLM_HEDGE_THREADS", "32"))
+
+# Latencies kept per operation and provider, and the number needed before the percentile is used
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+# An attempt: (provider name, function run in a worker thread that returns the result)
+Attempt = Tuple[str, Callable[[], Any]]
+
+
+class HedgingPolicy:
+    """
+    Hedge delays from recent latencies, plus hedging counters, per operation and provider.
+
+    Args:
+        percentile: Latency percentile (0-100) of the primary after which to hedge
+        min_delay: Shortest hedge delay in seconds
+        max_delay: Longest hedge delay in seconds, used until MIN_LATENCY_SAMPLES are known
+        max_rate: Largest fraction of the last LATENCY_WINDOW calls of an operation that may be hedged
+    """
+
+    def __init__(self, percentile: float = LLM_HEDGE_PERCENTILE, min_delay: float = LLM_HEDGE_MIN_DELAY,
+                 max_delay: float = LLM_HEDGE_MAX_DELAY, max_rate: float = LLM_HEDGE_MAX_RATE):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_rate = max_rate
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        # operation -> one [hedged] entry per recent call, shared with the call that made it
+        self._recent_hedges: Dict[str, Deque[List[bool]]] = {}
+        # (operation, provider) -> {"calls", "hedges", "wins"}
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, operation: str, provider: str, seconds: float) -> None:
+        """Record how long a successful call took."""
+        with self._lock:
+            latencies = self._latencies.get((operation, provider))
+            if latencies is None:
+                latencies = self._latencies[(operation, provider)] = deque(maxlen=LATENCY_WINDOW)
+            latencies.append(seconds)
+
+    def delay(self, operation: str, provider: str) -> float:
+        """Seconds to wait for the primary provider before hedging."""
+        with self._lock:
+            latencies = sorted(self._latencies.get((operation, provider), ()))
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return self.max_delay
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        return min(self.max_delay, max(self.min_delay, latencies[index]))
+
+    def _count(self, operation: str, provider: str, field: str) -> None:
+        counts = self._counts.setdefault((operation, provider), {"calls": 0, "hedges": 0, "wins": 0})
+        counts[field] += 1
+
+    def start(self, operation: str, provider: str) -> List[bool]:
+        """Count a call of operation with provider as primary; returns the call's entry for try_hedge."""
+        call = [False]
+        with self._lock:
+            self._count(operation, provider, "calls")
+            self._recent_hedges.setdefault(operation, deque(maxlen=LATENCY_WINDOW)).append(call)
+        return call
+
+    def try_hedge(self, operation: str, provider: str, call: List[bool], force: bool = False) -> bool:
+        """
+        Count a hedge of call (the entry start returned) to provider, unless
+        (without force) the operation is at its hedging rate limit.
+        """
+        with self._lock:
+            recent = self._recent_hedges.setdefault(operation, deque(maxlen=LATENCY_WINDOW))
+            if not force and sum(entry[0] for entry in recent) >= max(1.0, self.max_rate * len(recent)):
+                return False
+            # Calls finish out of order, so the flag goes on this call's own entry, not the newest one
+            call[0] = True
+            self._count(operation, provider, "hedges")
+            return True
+
+    def win(self, operation: str, provider: str) -> None:
+        """Count a hedged call won by provider."""
+        with self._lock:
+            self._count(operation, provider, "wins")
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            keys = set(self._counts) | set(self._latencies)
+            counts = {key: dict(self._counts.get(key, {"calls": 0, "hedges": 0, "wins": 0})) for key in keys}
+        return [dict(counts[(operation, provider)], operation=operation, provider=provider,
+                     delay=self.delay(operation, provider))
+                for operation, provider in sorted(keys)]
+
+
+hedging_policy = HedgingPolicy()
+_executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_THREADS, thread_name_prefix="llm-hedge")
+
+
+def hedging_stats() -> List[dict]:
+    return hedging_policy.stats()
+
+
+async def hedged_call(operation: str, primary: Attempt, secondary: Optional[Attempt] = None,
+                      policy: HedgingPolicy = hedging_policy) -> Any:
+    """
+    Run primary's function in a worker thread, hedging with secondary when it is slow.
+
+    Without LLM_HEDGING or a secondary this is asyncio.to_thread(primary function).
+    If both attempts fail, the primary's error is raised.
+
+    Args:
+        operation: Name of the call site (e.g. "chat"), which keys the latency history
+        primary: (provider, function) tried first
+        secondary: (provider, function) started after the hedge delay or when primary fails
+    """
+    if not LLM_HEDGING or secondary is None:
+        return await asyncio.to_thread(primary[1])
+
+    primary_provider = primary[0]
+    call = policy.start(operation, primary_provider)
+    providers: Dict[asyncio.Task, str] = {}
+    # Each attempt has its own token, so the loser can be cancelled without cancelling the request
+    tokens: Dict[asyncio.Task, CancellationToken] = {}
+
+    def timed(provider: str, function: Callable[[], Any]) -> Any:
+        # Timed in the worker thread, so a cancelled attempt's latency is still recorded when it returns
+        start = time.monotonic()
+        result = function()
+        policy.observe(operation, provider, time.monotonic() - start)
+        return result
+
+    async def attempt(provider: str, function: Callable[[], Any], token: CancellationToken) -> Any:
+        with cancellation_scope(token):
+            context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(_executor, context.run, timed, provider, function)
+
+    def launch(provider: str, function: Callable[[], Any]) -> asyncio.Task:
+        token = CancellationToken(parent=current_token())
+        task = asyncio.create_task(attempt(provider, function, token))
+        providers[task] = provider
+        tokens[task] = token
+        return task
+
+    def cancel(task: asyncio.Task) -> None:
+        tokens[task].cancel("lost hedged race")
+        task.cancel()
+
+    pending = {launch(*primary)}
+    hedged = False
+    errors: Dict[str, BaseException] = {}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=policy.delay(operation, primary_provider))
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    if hedged:
+                        policy.win(operation, providers[task])
+                    for other in pending:
+                        cancel(other)
+                    return task.result()
+                errors[providers[task]] = task.exception()
+                logger.warning(f"Hedged {operation} call to {providers[task]} failed: {str(task.exception())}")
+            # A failed primary is replaced regardless of the hedging rate limit
+            if not hedged and policy.try_hedge(operation, secondary[0], call, force=bool(errors)):
+                hedged = True
+                logger.info(f"Hedging {operation} call to {secondary[0]}",
+                            extra={"operation": operation, "primary": primary_provider})
+                pending.add(launch(*secondary))
+            if not pending:
+                raise errors.get(primary_provider) or next(iter(errors.values()))
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        for task in pending:
+            cancel(task)
+        raise
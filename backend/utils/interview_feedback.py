@@ -0,0 +1,92 @@
+"""
+Interview feedback parsing for JobSkillTracker.
+This module splits the final interview evaluation generated by the LLM into
+its sections and bullet lists in a single pass over the text.
+"""
+
+import re
+from typing import Dict, List
+
+# Section headings requested in the final evaluation prompt, in order
+EVALUATION_SECTIONS = (
+    "CONCLUSION",
+    "OVERALL_ASSESSMENT",
+    "STRENGTHS",
+    "AREAS_FOR_IMPROVEMENT",
+    "TECHNICAL_EVALUATION",
+    "BEHAVIORAL_EVALUATION",
+    "FINAL_RECOMMENDATION",
+)
+
+# A section heading such as "2. OVERALL_ASSESSMENT:", "**STRENGTHS:**" or "## STRENGTHS:"
+_SECTION_HEADING_RE = re.compile(
+    r"^[ \t]*(?:#+[ \t]*)?(?:\d+\.[ \t]*)?(?:\*\*)?(" + "|".join(EVALUATION_SECTIONS) + r")(?:\*\*)?:(?:\*\*)?[ \t]*",
+    re.MULTILINE
+)
+
+# The start of a bullet ("- ", "* ", "• ") or numbered ("1. ") list item
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[-*•]|\d+\.)\s*")
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Split an evaluation into its sections.
+
+    Returns a dict mapping each section heading found to its stripped body text.
+    Any text before the first heading is returned under the key "PREAMBLE".
+    """
+    sections = {}
+    matches = list(_SECTION_HEADING_RE.finditer(text))
+    first_start = matches[0].start() if matches else len(text)
+    sections["PREAMBLE"] = text[:first_start].strip()
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        name = match.group(1)
+        if name not in sections:
+            sections[name] = text[match.end():end].strip()
+    return sections
+
+
+def parse_list_items(text: str) -> List[str]:
+    """
+    Parse a bulleted or numbered list into its items.
+
+    Lines that do not start a new item are treated as a continuation of the
+    previous one.
+    """
+    items = []
+    current = None
+    for line in text.split("\n"):
+        marker = _LIST_ITEM_RE.match(line)
+        if marker:
+            if current is not None:
+                items.append(current)
+            current = line[marker.end():]
+        elif current is not None:
+            current += "\n" + line
+    if current is not None:
+        items.append(current)
+    return [item.strip() for item in items if item.strip()]
+
+
+def parse_interview_evaluation(text: str) -> Dict[str, object]:
+    """
+    Parse a final interview evaluation into its fields.
+
+    Args:
+        text: The evaluation text generated by the LLM
+
+    Returns:
+        A dict with conclusion, overall_assessment, strengths, weaknesses,
+        technical_evaluation, behavioral_evaluation and final_recommendation
+    """
+    sections = split_sections(text)
+    return {
+        "conclusion": sections.get("CONCLUSION") or sections["PREAMBLE"] or text,
+        "overall_assessment": sections.get("OVERALL_ASSESSMENT", ""),
+        "strengths": parse_list_items(sections.get("STRENGTHS", "")),
+        "weaknesses": parse_list_items(sections.get("AREAS_FOR_IMPROVEMENT", "")),
+        "technical_evaluation": sections.get("TECHNICAL_EVALUATION", ""),
+        "behavioral_evaluation": sections.get("BEHAVIORAL_EVALUATION", ""),
+        "final_recommendation": sections.get("FINAL_RECOMMENDATION", ""),
+    }
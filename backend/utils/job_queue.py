@@ -0,0 +1,437 @@
+"""
+Durable background jobs for JobSkillTracker.
+Jobs are stored in a SQLite database (JOB_QUEUE_PATH) shared by every worker
+process, and run by job workers started with the API. A job is claimed with a
+lease, so one left behind by a crashed or stopped process is picked up again
+once the lease expires. A worker renews the lease of the job it runs, and a
+worker that lost the lease (its job was taken over) stops the job and cannot
+overwrite the newer attempt's outcome. A submission with an idempotency key that was already
+used returns the existing job instead of creating another.
+"""
+
+import asyncio
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from .cache import sqlite_connection
+from .log import get_logger
+from .paths import data_path
+from .rate_limit import llm_request_context
+from .tracing import start_span
+
+logger = get_logger(__name__)
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH") or data_path("jobs.sqlite3")
+# Jobs run concurrently by each API process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds a claimed job may run before another worker may take it over
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+# Times a job is started before it is marked failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Seconds finished jobs (and their idempotency keys) are kept
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "604800"))
+# How often idle workers and waiting clients check the database for changes
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# Seconds between deletions of expired jobs
+PURGE_INTERVAL = 3600.0
+
+# Comma-separated hosts callback URLs may point to; when unset, any public host is allowed
+WEBHOOK_ALLOWED_HOSTS = {host.strip().lower() for host in os.getenv("WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()}
+
+# Webhook delivery attempts and the pause before the first retry (doubled for each retry)
+WEBHOOK_ATTEMPTS = 3
+WEBHOOK_BACKOFF = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    idempotency_key TEXT,
+    user_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    callback_url TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_until REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_idempotency ON jobs (kind, user_id, idempotency_key);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, created_at);
+"""
+
+# A job handler: takes the job payload and returns its JSON-serializable result
+JobHandler = Callable[[dict], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    Job records in a SQLite database.
+
+    A job moves from queued to running when a worker claims it, then to
+    succeeded (with a result) or failed (with an error). Each call uses the
+    calling thread's connection, so the blocking methods can be run with
+    asyncio.to_thread.
+
+    Args:
+        path: Database file
+        lease_seconds: How long a claim lasts
+        max_attempts: Claims of a job before it is failed
+        retention: Seconds finished jobs are kept
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, retention: float = JOB_RETENTION):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention = retention
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite_connection(self.path, _SCHEMA)
+
+    def submit(self, kind: str, payload: dict, user_id: str = "anonymous", idempotency_key: Optional[str] = None,
+               callback_url: Optional[str] = None) -> Tuple[dict, bool]:
+        """
+        Queue a job; returns (job, created).
+
+        If the user already submitted a job of this kind with the same
+        idempotency key, that job is returned with created False.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        connection = self._connection()
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO jobs (id, kind, idempotency_key, user_id, payload, status, callback_url, "
+            "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, idempotency_key, user_id, json.dumps(payload), QUEUED, callback_url, now, now))
+        if cursor.rowcount:
+            return self.get(job_id), True
+        row = connection.execute("SELECT id FROM jobs WHERE kind = ? AND user_id = ? AND idempotency_key = ?",
+                                 (kind, user_id, idempotency_key)).fetchone()
+        return self.get(row[0]), False
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job as a dict, or None if it does not exist (or has expired)."""
+        connection = self._connection()
+        connection.row_factory = sqlite3.Row
+        try:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            connection.row_factory = None
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def claim(self) -> Optional[dict]:
+        """
+        Take the oldest queued job, or a running job whose lease has expired,
+        and mark it running; returns None when there is nothing to do.
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1", (QUEUED, RUNNING, now)).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            job_id, attempts = row
+            if attempts >= self.max_attempts:
+                # Every earlier attempt was lost with its worker (e.g. a crash while running it)
+                connection.execute("UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? "
+                                   "WHERE id = ?", (FAILED, f"Gave up after {attempts} attempts", now, job_id))
+                connection.execute("COMMIT")
+                return self.get(job_id)
+            connection.execute("UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                               "WHERE id = ?", (RUNNING, now + self.lease_seconds, now, job_id))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return self.get(job_id)
+
+    def renew(self, job_id: str, attempt: int) -> bool:
+        """Extend the lease of a running job's attempt; False if the attempt no longer holds it."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND attempts = ?",
+            (time.time() + self.lease_seconds, job_id, RUNNING, attempt))
+        return cursor.rowcount > 0
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None,
+               attempt: Optional[int] = None) -> Optional[dict]:
+        """
+        Mark a job succeeded with result, or failed with error; returns the
+        updated job. With attempt, only that attempt of a running job is
+        finished, and None is returned if it lost its lease.
+        """
+        status = FAILED if error is not None else SUCCEEDED
+        sql = "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?"
+        encoded = json.dumps(result, default=str) if error is None else None
+        parameters: tuple = (status, encoded, error, time.time(), job_id)
+        if attempt is not None:
+            sql += " AND status = ? AND attempts = ?"
+            parameters += (RUNNING, attempt)
+        cursor = self._connection().execute(sql, parameters)
+        if not cursor.rowcount:
+            return None
+        return self.get(job_id)
+
+    def release(self, job_id: str, attempt: int) -> bool:
+        """
+        Put a running job back in the queue without counting the attempt (e.g.
+        on shutdown); False if the attempt no longer holds the job.
+        """
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), lease_until = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND attempts = ?", (QUEUED, time.time(), job_id, RUNNING, attempt))
+        return cursor.rowcount > 0
+
+    def purge(self) -> int:
+        """Delete finished jobs older than the retention period; returns how many."""
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (*FINISHED, time.time() - self.retention))
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs by status."""
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+def job_view(job: dict) -> dict:
+    """The client-facing fields of a job."""
+    view = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+    if job["status"] == SUCCEEDED:
+        view["result"] = job["result"]
+    elif job["status"] == FAILED:
+        view["error"] = job["error"]
+    return view
+
+
+async def wait_for_job(queue: JobQueue, job_id: str, timeout: float,
+                       changed_since: Optional[float] = None) -> Optional[dict]:
+    """
+    Wait up to timeout seconds for a job to finish (or, with changed_since, to
+    be updated after that time) and return it; None if the job does not exist.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await asyncio.to_thread(queue.get, job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        if changed_since is not None and job["updated_at"] > changed_since:
+            return job
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return job
+        await asyncio.sleep(min(JOB_POLL_INTERVAL, remaining))
+
+
+def validate_callback_url(url: str) -> Optional[str]:
+    """
+    Raise ValueError unless url is an http(s) URL the server may POST to: a
+    host in WEBHOOK_ALLOWED_HOSTS when that is set, otherwise a host that
+    resolves only to public addresses (not loopback, private or link-local).
+    Resolves the host, so call it off the event loop.
+
+    Returns a checked address of the host to connect to (None for an allowed host).
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise ValueError("callback_url must be an http or https URL")
+    if WEBHOOK_ALLOWED_HOSTS:
+        if host not in WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError(f"callback_url host {host} is not allowed")
+        return None
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or None, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"callback_url host {host} cannot be resolved") from e
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"callback_url host {host} is not a public address")
+    return sorted(addresses)[0].split("%")[0]
+
+
+def _pinned_request(url: str, address: Optional[str]) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+    """
+    (url, headers, extensions) that send a request for url to address, with
+    the original host in the Host header and as the TLS server name (so the
+    certificate is still checked against it).
+    """
+    if address is None:
+        return url, {}, {}
+    parts = urlsplit(url)
+    literal = f"[{address}]" if ":" in address else address
+    netloc = f"{literal}:{parts.port}" if parts.port else literal
+    host = parts.netloc.rsplit("@", 1)[-1]
+    return urlunsplit(parts._replace(netloc=netloc)), {"Host": host}, {"sni_hostname": parts.hostname}
+
+
+async def deliver_webhook(job: dict) -> None:
+    """POST the finished job to its callback URL, retrying failed deliveries with backoff."""
+    url = job.get("callback_url")
+    if not url:
+        return
+    try:
+        # Resolved and checked again at delivery, and the request goes to the checked address,
+        # so the host cannot be rebound to an internal address in between
+        address = await asyncio.to_thread(validate_callback_url, url)
+    except ValueError as e:
+        logger.error(f"Not delivering job {job['id']} webhook: {str(e)}")
+        return
+    target, headers, extensions = _pinned_request(url, address)
+    body = job_view(job)
+    delay = WEBHOOK_BACKOFF
+    for attempt in range(1, WEBHOOK_ATTEMPTS + 1):
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.post(target, json=body, headers=headers, extensions=extensions)
+            if response.status_code < 400:
+                logger.debug(f"Delivered job {job['id']} webhook", extra={"status_code": response.status_code})
+                return
+            logger.warning(f"Job {job['id']} webhook returned HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Error delivering job {job['id']} webhook: {str(e)}")
+        if attempt < WEBHOOK_ATTEMPTS:
+            await asyncio.sleep(delay)
+            delay *= 2
+    logger.error(f"Gave up delivering job {job['id']} webhook to {url}")
+
+
+async def _keep_lease(queue: JobQueue, job: dict) -> None:
+    """Renew a running job's lease until cancelled; returns once the lease is lost."""
+    while True:
+        await asyncio.sleep(queue.lease_seconds / 3)
+        try:
+            if not await asyncio.to_thread(queue.renew, job["id"], job["attempts"]):
+                return
+        except sqlite3.Error as e:
+            logger.error(f"Error renewing the lease of job {job['id']}: {str(e)}")
+
+
+async def _run_job(queue: JobQueue, handlers: Dict[str, JobHandler], job: dict) -> Optional[dict]:
+    """Run a claimed job and record its outcome; returns the finished job, or None if the lease was lost."""
+    handler = handlers.get(job["kind"])
+    attempt = job["attempts"]
+    with start_span("job.run", attributes={"job.id": job["id"], "job.kind": job["kind"],
+                                           "job.attempt": attempt}) as span:
+        if handler is None:
+            error = f"No handler for job kind {job['kind']}"
+            span.set_attribute("job.status", FAILED)
+            return await asyncio.to_thread(queue.finish, job["id"], None, error, attempt)
+        # LLM calls made by the job count against the submitting user's share
+        with llm_request_context(job["user_id"]):
+            work = asyncio.create_task(handler(job["payload"]))
+        lease = asyncio.create_task(_keep_lease(queue, job))
+        try:
+            await asyncio.wait({work, lease}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            work.cancel()
+            lease.cancel()
+            await asyncio.gather(work, lease, return_exceptions=True)
+            await asyncio.to_thread(queue.release, job["id"], attempt)
+            raise
+        lease.cancel()
+        if not work.done():
+            # Another worker took the job over; its attempt decides the outcome
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            logger.warning(f"Lost the lease of job {job['id']} ({job['kind']}); stopped this attempt")
+            span.set_attribute("job.status", "lost")
+            return None
+        error = None
+        if work.cancelled():
+            error = "Job was cancelled"
+        elif work.exception() is not None:
+            e = work.exception()
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {str(e)}", exc_info=e)
+            span.set_error(e)
+            error = str(e)
+        result = None if error else work.result()
+        finished = await asyncio.to_thread(queue.finish, job["id"], result, error, attempt)
+        if finished is None:
+            logger.warning(f"Job {job['id']} ({job['kind']}) finished after losing its lease; result discarded")
+            span.set_attribute("job.status", "lost")
+        else:
+            span.set_attribute("job.status", finished["status"])
+        return finished
+
+
+async def run_job_workers(queue: JobQueue, handlers: Dict[str, JobHandler], concurrency: int = JOB_WORKERS) -> None:
+    """
+    Run jobs from the queue with `concurrency` workers until cancelled.
+
+    A job interrupted by cancellation (server shutdown) is put back in the
+    queue, to be run again by this or another process.
+    """
+    webhooks = set()
+
+    async def worker() -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(queue.claim)
+            except sqlite3.Error as e:
+                logger.error(f"Error claiming a job: {str(e)}")
+                job = None
+            if job is None:
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+                continue
+            if job["status"] == RUNNING:
+                job = await _run_job(queue, handlers, job)
+            if job and job["status"] in FINISHED and job.get("callback_url"):
+                task = asyncio.create_task(deliver_webhook(job))
+                webhooks.add(task)
+                task.add_done_callback(webhooks.discard)
+
+    async def purger() -> None:
+        while True:
+            try:
+                purged = await asyncio.to_thread(queue.purge)
+                if purged:
+                    logger.info(f"Purged {purged} expired jobs")
+            except sqlite3.Error as e:
+                logger.error(f"Error purging expired jobs: {str(e)}")
+            await asyncio.sleep(PURGE_INTERVAL)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    workers.append(asyncio.create_task(purger()))
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers + list(webhooks):
+            task.cancel()
+        await asyncio.gather(*workers, *webhooks, return_exceptions=True)
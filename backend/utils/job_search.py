@@ -0,0 +1,299 @@
+"""
+Job search over a local corpus of postings for JobSkillTracker.
+Postings are loaded from a JSON lines file (JOB_CORPUS_PATH) into two
+inverted indexes: words of the title and description, ranked with BM25, and
+taxonomy skills, mapping each skill to the postings that ask for it. A query
+scores every posting at once with NumPy: the BM25 score of its words, the
+share of the posting's skills the user has, and a boost for skills the user
+wants to learn. Location and experience level filters are masks over the
+postings, so a top-k query over 100k postings takes milliseconds.
+
+Each line of the corpus is a posting:
+    {"id": ..., "title": ..., "company": ..., "location": ..., "url": ...,
+     "experience_level": ..., "description": ..., "skills": [...]}
+Only the title is required. Postings without skills are tagged with the
+local skill tagger while loading, which is slow for large corpora.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .log import get_logger
+from .skill_matching import skill_key
+from .skill_tagger import tag_skills
+from .skill_taxonomy import skill_name
+
+logger = get_logger(__name__)
+
+JOB_CORPUS_PATH = os.getenv("JOB_CORPUS_PATH", "job_corpus.jsonl")
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title words count this many times, so a posting titled with a query word outranks one mentioning it
+TITLE_WEIGHT = 3
+# Weights of the normalized BM25 score, the user's share of the posting's skills and the skill goal boost
+TEXT_WEIGHT = 0.4
+SKILL_WEIGHT = 0.6
+GOAL_WEIGHT = 0.5
+
+# Experience levels from least to most senior, with the words that identify them
+EXPERIENCE_LEVELS = {
+    "internship": ("intern", "internship", "co-op", "apprentice"),
+    "entry": ("entry", "junior", "jr", "graduate", "grad", "associate", "trainee"),
+    "mid": ("mid", "intermediate", "ii"),
+    "senior": ("senior", "sr", "iii"),
+    "lead": ("lead", "staff", "principal", "director", "head"),
+}
+_LEVEL_NAMES = list(EXPERIENCE_LEVELS)
+_LEVEL_WORDS = {word: index for index, words in enumerate(EXPERIENCE_LEVELS.values()) for word in words}
+UNKNOWN_LEVEL = -1
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "of", "on",
+    "or", "our", "that", "the", "this", "to", "we", "will", "with", "you", "your",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of text, without stop words."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def experience_level(text: str) -> Optional[str]:
+    """
+    The experience level named in a level or job title ("Senior", "Jr. Developer"),
+    or None if it names none. The most senior level named wins.
+    """
+    levels = [_LEVEL_WORDS[word] for word in _TOKEN_RE.findall((text or "").lower()) if word in _LEVEL_WORDS]
+    return _LEVEL_NAMES[max(levels)] if levels else None
+
+
+class _InvertedIndex:
+    """
+    Maps terms to the postings containing them, as arrays of posting rows and
+    term counts. New entries are kept in lists and merged into a term's
+    arrays the next time the term is looked up.
+    """
+
+    def __init__(self):
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._pending: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, row: int, counts: Dict[str, int]) -> None:
+        with self._lock:
+            for term, count in counts.items():
+                rows, values = self._pending.setdefault(term, ([], []))
+                rows.append(row)
+                values.append(count)
+
+    def get(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(posting rows, term counts) of a term."""
+        with self._lock:
+            pending = self._pending.pop(term, None)
+            arrays = self._arrays.get(term)
+            if pending is not None:
+                rows, values = np.asarray(pending[0], dtype=np.int32), np.asarray(pending[1], dtype=np.float32)
+                if arrays is not None:
+                    rows, values = np.concatenate([arrays[0], rows]), np.concatenate([arrays[1], values])
+                arrays = self._arrays[term] = (rows, values)
+        if arrays is None:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        return arrays
+
+
+class JobIndex:
+    """
+    Searchable postings. A posting added with the id of an existing one
+    replaces it. Methods may be called from several threads.
+    """
+
+    def __init__(self):
+        self.postings: List[dict] = []
+        self._rows: Dict[str, int] = {}
+        self._text = _InvertedIndex()
+        self._skills = _InvertedIndex()
+        self._skill_keys: List[frozenset] = []
+        self._lengths: List[int] = []
+        self._levels: List[int] = []
+        self._location_ids: List[int] = []
+        self._locations: Dict[str, int] = {}
+        self._removed: List[int] = []
+        self._columns: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, posting: Dict[str, Any]) -> None:
+        """Index a posting (see the module docstring for its fields)."""
+        title = posting.get("title") or ""
+        description = posting.get("description") or ""
+        skills = posting.get("skills")
+        if skills is None:
+            skills = tag_skills(description, title)["skills"]
+        skills = [name for name in (skill_name(skill).strip() for skill in skills) if name]
+        keys = frozenset(skill_key(skill) for skill in skills)
+        tokens = tokenize(title) * TITLE_WEIGHT + tokenize(description)
+        level = experience_level(posting.get("experience_level") or "") or experience_level(title)
+        location = (posting.get("location") or "").strip()
+        with self._lock:
+            row = len(self.postings)
+            posting_id = str(posting.get("id") or posting.get("url") or row)
+            previous = self._rows.get(posting_id)
+            if previous is not None:
+                self._removed.append(previous)
+            self._rows[posting_id] = row
+            self.postings.append({
+                "id": posting_id,
+                "title": title,
+                "company": posting.get("company") or "",
+                "location": location,
+                "experience_level": level,
+                "url": posting.get("url") or "",
+                "skills": skills,
+            })
+            self._skill_keys.append(keys)
+            self._lengths.append(len(tokens))
+            self._levels.append(_LEVEL_NAMES.index(level) if level else UNKNOWN_LEVEL)
+            self._location_ids.append(self._locations.setdefault(location.lower(), len(self._locations)))
+            self._columns = None
+            self._text.add(row, Counter(tokens))
+            self._skills.add(row, dict.fromkeys(keys, 1))
+
+    def _arrays(self) -> dict:
+        """Per-posting arrays, rebuilt after postings are added."""
+        with self._lock:
+            columns = self._columns
+            if columns is None:
+                lengths = np.asarray(self._lengths, dtype=np.float32)
+                active = np.ones(len(self.postings), dtype=bool)
+                active[self._removed] = False
+                average = float(lengths[active].mean()) if active.any() else 1.0
+                columns = self._columns = {
+                    "count": len(self.postings),
+                    "norms": BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(average, 1.0)),
+                    "skill_counts": np.asarray([len(keys) for keys in self._skill_keys], dtype=np.float32),
+                    "levels": np.asarray(self._levels, dtype=np.int8),
+                    "location_ids": np.asarray(self._location_ids, dtype=np.int32),
+                    "locations": list(self._locations),
+                    "active": active,
+                }
+            return columns
+
+    def _bm25(self, terms: Iterable[str], columns: dict) -> np.ndarray:
+        count = columns["count"]
+        scores = np.zeros(count, dtype=np.float32)
+        for term in set(terms):
+            rows, frequencies = self._text.get(term)
+            rows, frequencies = rows[rows < count], frequencies[rows < count]
+            if not len(rows):
+                continue
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            # Each posting appears once in a term's rows, so the scores can be added in place
+            scores[rows] += idf * frequencies * (BM25_K1 + 1) / (frequencies + columns["norms"][rows])
+        return scores
+
+    def _skill_counts(self, keys: Iterable[str], count: int) -> np.ndarray:
+        """How many of the skills each posting asks for."""
+        counts = np.zeros(count, dtype=np.float32)
+        for key in keys:
+            rows = self._skills.get(key)[0]
+            counts[rows[rows < count]] += 1
+        return counts
+
+    def _filter(self, columns: dict, location: str, level: Optional[str]) -> np.ndarray:
+        mask = columns["active"].copy()
+        location = location.strip().lower()
+        if location:
+            # Matched against each distinct location once, then by id
+            matching = [index for index, name in enumerate(columns["locations"]) if location in name]
+            mask &= np.isin(columns["location_ids"], matching)
+        if level:
+            mask &= columns["levels"] == _LEVEL_NAMES.index(level)
+        return mask
+
+    def search(self, query: str = "", skills: Sequence[Any] = (), goals: Sequence[Any] = (), location: str = "",
+               level: Optional[str] = None, limit: int = 20, exclude: Sequence[str] = ()) -> dict:
+        """
+        Rank postings for a user.
+
+        Args:
+            query: Words to match in titles and descriptions (BM25)
+            skills: The user's skills; a posting scores by the share of its skills among them
+            goals: Skills the user wants to learn; postings asking for them are boosted
+            location: Only postings whose location contains this text
+            level: Only postings of this experience level (see EXPERIENCE_LEVELS)
+            limit: Number of postings to return
+            exclude: Ids of postings to leave out
+
+        Returns:
+            {"total": matching postings, "results": the top postings with their score,
+             matched skills, missing skills and matched goals}
+        """
+        columns = self._arrays()
+        count = columns["count"]
+        skill_keys = {skill_key(name) for name in (skill_name(skill).strip() for skill in skills) if name}
+        goal_keys = {skill_key(name) for name in (skill_name(goal).strip() for goal in goals) if name}
+
+        text_scores = self._bm25(tokenize(query), columns)
+        skill_matches = self._skill_counts(skill_keys, count)
+        goal_matches = self._skill_counts(goal_keys, count)
+        top_text = float(text_scores.max()) if count else 0.0
+        scores = SKILL_WEIGHT * skill_matches / np.maximum(columns["skill_counts"], 1)
+        if top_text > 0:
+            scores += TEXT_WEIGHT * text_scores / top_text
+        if goal_keys:
+            scores += GOAL_WEIGHT * goal_matches / len(goal_keys)
+
+        mask = self._filter(columns, location, level) & ((text_scores > 0) | (skill_matches > 0) | (goal_matches > 0))
+        for posting_id in exclude:
+            row = self._rows.get(posting_id)
+            if row is not None and row < count:
+                mask[row] = False
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]] if limit > 0 else candidates[:0]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for row in candidates.tolist():
+            posting = self.postings[row]
+            keys = [skill_key(skill) for skill in posting["skills"]]
+            results.append(dict(
+                posting,
+                score=round(float(scores[row]), 4),
+                matched_skills=[skill for skill, key in zip(posting["skills"], keys) if key in skill_keys],
+                missing_skills=[skill for skill, key in zip(posting["skills"], keys) if key not in skill_keys],
+                matched_goals=[skill for skill, key in zip(posting["skills"], keys) if key in goal_keys],
+            ))
+        return {"total": int(mask.sum()), "results": results}
+
+
+def load_job_corpus(path: str = JOB_CORPUS_PATH) -> JobIndex:
+    """Index the postings in a JSON lines file; an empty index if the file does not exist."""
+    index = JobIndex()
+    if not os.path.exists(path):
+        logger.warning(f"No job corpus at {path}; job search will find nothing")
+        return index
+    start = time.perf_counter()
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                index.add(json.loads(line))
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"Skipping job corpus line {number}: {str(e)}")
+    logger.info(f"Indexed {len(index)} postings from {path} in {time.perf_counter() - start:.1f}s")
+    return index
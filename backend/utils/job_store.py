@@ -0,0 +1,448 @@
+"""
+Server-side store of saved jobs for JobSkillTracker.
+Each user's saved jobs, with their extracted skills, extraction details and
+analyses, are kept in a SQLite database (JOB_STORE_PATH) shared by every
+worker process. Jobs are indexed by company, date and skill, and their title,
+company and description are full-text indexed with FTS5, so dashboard
+queries are index lookups instead of scans of every saved job.
+
+Every change to a user's jobs gets the next version number of that user.
+The extension syncs by asking for the changes after the last version it has
+seen (its cursor); deleted jobs are kept as tombstones so their deletion
+reaches every client.
+
+Skill statistics for the dashboard (how many jobs ask for each skill, for
+each pair of skills, and for each skill per month) are kept in their own
+tables and updated in the transaction that saves or deletes jobs, so reading
+them costs a lookup per skill rather than a pass over every saved job.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .cache import sqlite_connection
+from .paths import data_path
+from .skill_taxonomy import canonical_skill, skill_name
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH") or data_path("job_store.sqlite3")
+
+# Fields stored in their own columns; the rest of a job is kept as its details
+_COLUMNS = ("id", "title", "company", "url", "description", "skills", "analysis", "saved_at", "dateAdded")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS saved_jobs (
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    skills TEXT NOT NULL DEFAULT '[]',
+    details TEXT NOT NULL DEFAULT '{}',
+    analysis TEXT,
+    saved_at REAL NOT NULL,
+    version INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS saved_jobs_version ON saved_jobs (user_id, version);
+CREATE INDEX IF NOT EXISTS saved_jobs_saved_at ON saved_jobs (user_id, saved_at);
+CREATE INDEX IF NOT EXISTS saved_jobs_company ON saved_jobs (user_id, company COLLATE NOCASE, saved_at);
+CREATE TABLE IF NOT EXISTS saved_job_skills (
+    user_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (user_id, job_id, skill)
+);
+CREATE INDEX IF NOT EXISTS saved_job_skills_skill ON saved_job_skills (user_id, skill, saved_at);
+CREATE TABLE IF NOT EXISTS job_stats (
+    user_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (user_id, period)
+);
+CREATE TABLE IF NOT EXISTS skill_stats (
+    user_id TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    name TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (user_id, skill)
+);
+CREATE TABLE IF NOT EXISTS skill_pair_stats (
+    user_id TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    other TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (user_id, skill, other)
+);
+CREATE INDEX IF NOT EXISTS skill_pair_stats_jobs ON skill_pair_stats (user_id, jobs);
+CREATE INDEX IF NOT EXISTS skill_pair_stats_other ON skill_pair_stats (user_id, other);
+CREATE TABLE IF NOT EXISTS skill_trend_stats (
+    user_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (user_id, period, skill)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS saved_jobs_fts USING fts5(
+    title, company, description, content='saved_jobs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS saved_jobs_fts_insert AFTER INSERT ON saved_jobs BEGIN
+    INSERT INTO saved_jobs_fts (rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS saved_jobs_fts_update AFTER UPDATE ON saved_jobs BEGIN
+    INSERT INTO saved_jobs_fts (saved_jobs_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+    INSERT INTO saved_jobs_fts (rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS saved_jobs_fts_delete AFTER DELETE ON saved_jobs BEGIN
+    INSERT INTO saved_jobs_fts (saved_jobs_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+END;
+"""
+
+_WORD_RE = re.compile(r"\w+")
+
+# The skills of one job, by canonical name with the job's spelling, and when it was saved
+_JobSkills = Tuple[Dict[str, str], float]
+
+
+def parse_timestamp(value: Union[str, float, int, None], default: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds since the epoch of an ISO 8601 date or time ("2024-05-01",
+    "2024-05-01T12:00:00.000Z") or a number; default when value is empty.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _period(saved_at: float) -> str:
+    """The month ("2024-05") a job saved at this time counts toward in skill trends."""
+    return datetime.fromtimestamp(saved_at, timezone.utc).strftime("%Y-%m")
+
+
+def _match_expression(text: str, column: Optional[str] = None) -> Optional[str]:
+    """An FTS5 query matching every word of text, optionally in one column only."""
+    words = " ".join(f'"{word}"' for word in _WORD_RE.findall(text))
+    if not words:
+        return None
+    return f"{column} : ({words})" if column else words
+
+
+class JobStore:
+    """
+    Saved jobs in a SQLite database, keyed by user and job id.
+
+    Each call uses the calling thread's connection, so the methods can be
+    run with asyncio.to_thread.
+
+    Args:
+        path: Database file
+    """
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.path = path
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite_connection(self.path, _SCHEMA)
+
+    def save_jobs(self, user_id: str, jobs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace a user's jobs in one transaction; returns the user's
+        new cursor.
+
+        A job is a dict with "id" (defaulting to its "url"), "title",
+        "company", "url", "description", "skills" (names, or dicts with a
+        name), "analysis", and "saved_at" or "dateAdded" (an ISO date or epoch
+        seconds, default now). Any other fields are kept as its details.
+        """
+        now = time.time()
+        # A job given twice is saved as its last copy
+        latest: Dict[str, Tuple[tuple, Dict[str, str]]] = {}
+        for job in jobs:
+            job_id = str(job.get("id") or job.get("url") or "")
+            if not job_id:
+                raise ValueError("Every job needs an id or a url")
+            saved_at = parse_timestamp(job.get("saved_at") or job.get("dateAdded"), now)
+            skills = [name for name in (skill_name(skill).strip() for skill in job.get("skills") or []) if name]
+            details = {key: value for key, value in job.items() if key not in _COLUMNS}
+            analysis = job.get("analysis")
+            latest.pop(job_id, None)
+            latest[job_id] = ((user_id, job_id, job.get("title") or "", job.get("company") or "", job.get("url") or "",
+                               job.get("description") or "", json.dumps(skills), json.dumps(details, default=str),
+                               json.dumps(analysis, default=str) if analysis is not None else None, saved_at),
+                              {canonical_skill(name): name for name in reversed(skills)})
+        rows = [row for row, _ in latest.values()]
+        skill_rows = [(user_id, row[1], skill, row[9]) for row, skills in latest.values() for skill in skills]
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._version(connection, user_id)
+            replaced = self._job_skills(connection, user_id, list(latest))
+            connection.executemany(
+                "INSERT INTO saved_jobs (user_id, id, title, company, url, description, skills, details, analysis, "
+                "saved_at, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, id) DO UPDATE SET title = excluded.title, company = excluded.company, "
+                "url = excluded.url, description = excluded.description, skills = excluded.skills, "
+                "details = excluded.details, analysis = excluded.analysis, saved_at = excluded.saved_at, "
+                "version = excluded.version, deleted = 0",
+                [row + (version + number,) for number, row in enumerate(rows, 1)])
+            connection.executemany("DELETE FROM saved_job_skills WHERE user_id = ? AND job_id = ?",
+                                   [(user_id, row[1]) for row in rows])
+            connection.executemany("INSERT OR IGNORE INTO saved_job_skills (user_id, job_id, skill, saved_at) "
+                                   "VALUES (?, ?, ?, ?)", skill_rows)
+            self._update_stats(connection, user_id, replaced, [(skills, row[9]) for row, skills in latest.values()])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return version + len(rows)
+
+    def delete_job(self, user_id: str, job_id: str) -> Optional[int]:
+        """
+        Delete a user's job, leaving a tombstone for sync; returns the user's
+        new cursor, or None if the job does not exist.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._version(connection, user_id) + 1
+            removed = self._job_skills(connection, user_id, [job_id])
+            cursor = connection.execute(
+                "UPDATE saved_jobs SET deleted = 1, description = '', skills = '[]', details = '{}', analysis = NULL, "
+                "version = ? WHERE user_id = ? AND id = ? AND deleted = 0", (version, user_id, job_id))
+            connection.execute("DELETE FROM saved_job_skills WHERE user_id = ? AND job_id = ?", (user_id, job_id))
+            self._update_stats(connection, user_id, removed, [])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return version if cursor.rowcount else None
+
+    @staticmethod
+    def _version(connection: sqlite3.Connection, user_id: str) -> int:
+        row = connection.execute("SELECT MAX(version) FROM saved_jobs WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] or 0
+
+    @staticmethod
+    def _job_skills(connection: sqlite3.Connection, user_id: str, job_ids: List[str]) -> List[_JobSkills]:
+        """The stored skills of those of the jobs that are saved (not deleted)."""
+        jobs: Dict[str, _JobSkills] = {}
+        rows = connection.execute(
+            "SELECT j.id, j.saved_at, s.skill FROM saved_jobs j "
+            "LEFT JOIN saved_job_skills s ON s.user_id = j.user_id AND s.job_id = j.id WHERE j.user_id = ? AND j.deleted = 0 AND j.id IN (SELECT value FROM json_each(?))",
+            (user_id, json.dumps(job_ids)))
+        for job_id, saved_at, skill in rows:
+            skills, _ = jobs.setdefault(job_id, ({}, saved_at))
+            if skill is not None:
+                skills[skill] = skill
+        return list(jobs.values())
+
+    @staticmethod
+    def _update_stats(connection: sqlite3.Connection, user_id: str, removed: List[_JobSkills],
+                      added: List[_JobSkills]) -> None:
+        """Apply the removal and addition of jobs to the user's skill statistics."""
+        jobs: Counter = Counter()
+        skills: Counter = Counter()
+        pairs: Counter = Counter()
+        trends: Counter = Counter()
+        names: Dict[str, str] = {}
+        for job_skills, sign in [(job, -1) for job in removed] + [(job, 1) for job in added]:
+            job_names, saved_at = job_skills
+            period = _period(saved_at)
+            jobs[period] += sign
+            for skill in job_names:
+                skills[skill] += sign
+                trends[period, skill] += sign
+            for pair in combinations(sorted(job_names), 2):
+                pairs[pair] += sign
+            if sign > 0:
+                names.update(job_names)
+
+        updates = [
+            ("INSERT INTO job_stats (user_id, period, jobs) VALUES (?, ?, ?) ON CONFLICT (user_id, period) "
+             "DO UPDATE SET jobs = jobs + excluded.jobs", "DELETE FROM job_stats WHERE user_id = ? AND period = ? "
+             "AND jobs <= 0", {(period,): delta for period, delta in jobs.items()}),
+            ("INSERT INTO skill_pair_stats (user_id, skill, other, jobs) VALUES (?, ?, ?, ?) "
+             "ON CONFLICT (user_id, skill, other) DO UPDATE SET jobs = jobs + excluded.jobs",
+             "DELETE FROM skill_pair_stats WHERE user_id = ? AND skill = ? AND other = ? AND jobs <= 0", pairs),
+            ("INSERT INTO skill_trend_stats (user_id, period, skill, jobs) VALUES (?, ?, ?, ?) "
+             "ON CONFLICT (user_id, period, skill) DO UPDATE SET jobs = jobs + excluded.jobs",
+             "DELETE FROM skill_trend_stats WHERE user_id = ? AND period = ? AND skill = ? AND jobs <= 0", trends),
+        ]
+        for upsert, cleanup, deltas in updates:
+            connection.executemany(upsert, [(user_id, *key, delta) for key, delta in deltas.items() if delta])
+            connection.executemany(cleanup, [(user_id, *key) for key, delta in deltas.items() if delta < 0])
+        # The name shown for a skill is its spelling in the most recently saved job
+        connection.executemany(
+            "INSERT INTO skill_stats (user_id, skill, name, jobs) VALUES (?, ?, ?, ?) ON CONFLICT (user_id, skill) "
+            "DO UPDATE SET jobs = jobs + excluded.jobs, name = excluded.name",
+            [(user_id, skill, names.get(skill) or skill, delta) for skill, delta in skills.items()
+             if delta or skill in names])
+        connection.executemany("DELETE FROM skill_stats WHERE user_id = ? AND skill = ? AND jobs <= 0",
+                               [(user_id, skill) for skill, delta in skills.items() if delta < 0])
+
+    def skill_stats(self, user_id: str, top: int = 20, pairs: int = 20, months: int = 12,
+                    skill: Optional[str] = None) -> dict:
+        """
+        A user's skill statistics over their saved jobs.
+
+        Args:
+            top: Number of most frequent skills to return, and to show trends for
+            pairs: Number of most frequent skill pairs to return
+            months: Number of most recent months of trends to return
+            skill: Return the pairs of this skill only
+
+        Returns:
+            {"jobs": saved jobs, "skills": [{"skill", "jobs", "share"}],
+             "pairs": [{"skills": [a, b], "jobs"}],
+             "trends": [{"period": "2024-05", "jobs", "skills": {skill: jobs}}], oldest first}
+        """
+        connection = self._connection()
+        periods = connection.execute("SELECT period, jobs FROM job_stats WHERE user_id = ? ORDER BY period DESC",
+                                     (user_id,)).fetchall()
+        total = sum(jobs for _, jobs in periods)
+        top_skills = connection.execute(
+            "SELECT skill, name, jobs FROM skill_stats WHERE user_id = ? ORDER BY jobs DESC, name LIMIT ?",
+            (user_id, top)).fetchall()
+        if skill:
+            key = canonical_skill(skill)
+            pair_rows = connection.execute(
+                "SELECT skill, other, jobs FROM skill_pair_stats WHERE user_id = ? AND (skill = ? OR other = ?) "
+                "ORDER BY jobs DESC LIMIT ?", (user_id, key, key, pairs)).fetchall()
+        else:
+            pair_rows = connection.execute(
+                "SELECT skill, other, jobs FROM skill_pair_stats WHERE user_id = ? ORDER BY jobs DESC LIMIT ?",
+                (user_id, pairs)).fetchall()
+        recent = [period for period, _ in periods[:months]]
+        trend_rows = connection.execute(
+            "SELECT period, skill, jobs FROM skill_trend_stats WHERE user_id = ? AND period >= ? "
+            "AND skill IN (SELECT value FROM json_each(?))",
+            (user_id, min(recent, default=""), json.dumps([row[0] for row in top_skills]))).fetchall()
+
+        names = {key: name for key, name, _ in top_skills}
+        unnamed = {key for row in pair_rows for key in row[:2] if key not in names}
+        if unnamed:
+            names.update(connection.execute(
+                "SELECT skill, name FROM skill_stats WHERE user_id = ? AND skill IN (SELECT value FROM json_each(?))",
+                (user_id, json.dumps(sorted(unnamed)))).fetchall())
+        trends = {period: {"period": period, "jobs": jobs, "skills": {}} for period, jobs in reversed(periods[:months])}
+        for period, key, jobs in trend_rows:
+            if period in trends:
+                trends[period]["skills"][names.get(key, key)] = jobs
+        return {
+            "jobs": total,
+            "skills": [{"skill": name, "jobs": jobs, "share": round(jobs / total, 3) if total else 0.0}
+                       for _, name, jobs in top_skills],
+            "pairs": [{"skills": [names.get(a, a), names.get(b, b)], "jobs": jobs} for a, b, jobs in pair_rows],
+            "trends": list(trends.values()),
+        }
+
+    def _select(self, sql: str, parameters: Tuple) -> List[dict]:
+        connection = self._connection()
+        connection.row_factory = sqlite3.Row
+        try:
+            rows = connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.row_factory = None
+        return [_job(row) for row in rows]
+
+    def changes(self, user_id: str, since: int = 0, limit: int = 500) -> dict:
+        """
+        A user's jobs changed after the cursor `since`, oldest change first.
+
+        Returns:
+            {"jobs": changed jobs, "deleted": ids of deleted jobs, "cursor": the cursor to sync
+             from next, "more": whether changes were left out by the limit}
+        """
+        rows = self._select("SELECT * FROM saved_jobs WHERE user_id = ? AND version > ? ORDER BY version LIMIT ?",
+                            (user_id, since, limit + 1))
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "jobs": [job for job in rows if not job["deleted"]],
+            "deleted": [job["id"] for job in rows if job["deleted"]],
+            "cursor": rows[-1]["version"] if rows else since,
+            "more": more,
+        }
+
+    def query(self, user_id: str, company: Optional[str] = None, role: Optional[str] = None,
+              skill: Optional[str] = None, text: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: int = 50, offset: int = 0) -> dict:
+        """
+        A user's jobs, newest first.
+
+        Args:
+            company: Only jobs at this company (case-insensitive)
+            role: Only jobs with all of these words in their title
+            skill: Only jobs asking for this skill (any spelling of it)
+            text: Only jobs with all of these words in their title, company or description
+            since, until: Only jobs saved in this time range (epoch seconds)
+
+        Returns:
+            {"total": matching jobs, "jobs": the jobs from offset on, at most limit}
+        """
+        source = "saved_jobs j"
+        conditions = ["j.user_id = ?", "j.deleted = 0"]
+        parameters: List[Any] = [user_id]
+        # Dates are filtered and sorted on the table whose index the query is driven by
+        saved_at = "j.saved_at"
+        if skill:
+            source = "saved_job_skills s JOIN saved_jobs j ON j.user_id = s.user_id AND j.id = s.job_id"
+            conditions = ["s.user_id = ?", "s.skill = ?", "j.deleted = 0"]
+            parameters.append(canonical_skill(skill))
+            saved_at = "s.saved_at"
+        if company:
+            conditions.append("j.company = ? COLLATE NOCASE")
+            parameters.append(company.strip())
+        for expression in (_match_expression(role or "", "title"), _match_expression(text or "")):
+            if expression:
+                conditions.append("j.rowid IN (SELECT rowid FROM saved_jobs_fts WHERE saved_jobs_fts MATCH ?)")
+                parameters.append(expression)
+        if since is not None:
+            conditions.append(f"{saved_at} >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append(f"{saved_at} < ?")
+            parameters.append(until)
+        where = " AND ".join(conditions)
+        total = self._connection().execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", parameters).fetchone()[0]
+        jobs = self._select(f"SELECT j.* FROM {source} WHERE {where} ORDER BY {saved_at} DESC LIMIT ? OFFSET ?",
+                            tuple(parameters) + (limit, offset))
+        return {"total": total, "jobs": jobs}
+
+
+def _job(row: sqlite3.Row) -> dict:
+    """A stored job as the client sees it: its details merged with its columns."""
+    job = json.loads(row["details"])
+    job.update(
+        id=row["id"],
+        title=row["title"],
+        company=row["company"],
+        url=row["url"],
+        description=row["description"],
+        skills=json.loads(row["skills"]),
+        analysis=json.loads(row["analysis"]) if row["analysis"] is not None else None,
+        saved_at=row["saved_at"],
+        version=row["version"],
+        deleted=bool(row["deleted"]),
+    )
+    return job
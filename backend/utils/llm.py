@@ -0,0 +1,95 @@
+"""
+Instrumented LLM calls for JobSkillTracker.
+These wrappers call the OpenAI and Gemini SDKs unchanged, after the provider's
+rate limit scheduler admits the call (see rate_limit.py), and record a tracing
+span per call with the provider, model, token counts and time spent queued.
+A call made for a request with a deadline (see cancellation.py) gets the time
+remaining as its HTTP timeout.
+"""
+
+from typing import Any
+
+from .cancellation import remaining_time
+from .rate_limit import DEFAULT_COMPLETION_TOKENS, current_priority, estimate_tokens, scheduled_call
+from .tracing import start_span
+
+
+def openai_chat_completion(client: Any, **kwargs: Any) -> Any:
+    """
+    Call client.chat.completions.create(**kwargs) inside an "llm.openai" span.
+    """
+    model = kwargs.get("model", "")
+    estimated_tokens = (sum(estimate_tokens(message.get("content", "")) for message in kwargs.get("messages", []))
+                        + (kwargs.get("max_tokens") or DEFAULT_COMPLETION_TOKENS))
+
+    def call(queue_wait_ms):
+        with start_span("llm.openai", kind="CLIENT",
+                        attributes={"llm.provider": "openai", "llm.model": model, "llm.priority": current_priority(),
+                                    "llm.queue_wait_ms": round(queue_wait_ms, 3)}) as span:
+            timeout = remaining_time()
+            request_kwargs = kwargs if timeout is None or "timeout" in kwargs else dict(kwargs, timeout=timeout)
+            response = client.chat.completions.create(**request_kwargs)
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            span.set_attributes({
+                "llm.prompt_tokens": prompt_tokens,
+                "llm.completion_tokens": completion_tokens,
+            })
+            return response, prompt_tokens + completion_tokens
+
+    return scheduled_call("openai", estimated_tokens, call)
+
+
+def openai_embeddings(client: Any, **kwargs: Any) -> Any:
+    """
+    Call client.embeddings.create(**kwargs) inside an "llm.openai" span.
+    """
+    model = kwargs.get("model", "")
+    inputs = kwargs.get("input", [])
+    estimated_tokens = sum(estimate_tokens(text) for text in ([inputs] if isinstance(inputs, str) else inputs))
+
+    def call(queue_wait_ms):
+        with start_span("llm.openai", kind="CLIENT",
+                        attributes={"llm.provider": "openai", "llm.model": model, "llm.priority": current_priority(),
+                                    "llm.queue_wait_ms": round(queue_wait_ms, 3)}) as span:
+            timeout = remaining_time()
+            request_kwargs = kwargs if timeout is None or "timeout" in kwargs else dict(kwargs, timeout=timeout)
+            response = client.embeddings.create(**request_kwargs)
+            prompt_tokens = getattr(getattr(response, "usage", None), "prompt_tokens", 0) or 0
+            span.set_attributes({"llm.prompt_tokens": prompt_tokens, "llm.completion_tokens": 0})
+            return response, prompt_tokens
+
+    return scheduled_call("openai", estimated_tokens, call)
+
+
+def gemini_generate_content(model: Any, contents: Any, **kwargs: Any) -> Any:
+    """
+    Call model.generate_content(contents, **kwargs) inside an "llm.gemini" span.
+    """
+    model_name = getattr(model, "model_name", "")
+    if model_name.startswith("models/"):
+        model_name = model_name[len("models/"):]
+    generation_config = kwargs.get("generation_config")
+    max_output_tokens = generation_config.get("max_output_tokens") if isinstance(generation_config, dict) else None
+    estimated_tokens = estimate_tokens(contents) + (max_output_tokens or DEFAULT_COMPLETION_TOKENS)
+
+    def call(queue_wait_ms):
+        with start_span("llm.gemini", kind="CLIENT",
+                        attributes={"llm.provider": "gemini", "llm.model": model_name,
+                                    "llm.priority": current_priority(),
+                                    "llm.queue_wait_ms": round(queue_wait_ms, 3)}) as span:
+            timeout = remaining_time()
+            request_kwargs = (kwargs if timeout is None or "request_options" in kwargs
+                              else dict(kwargs, request_options={"timeout": timeout}))
+            response = model.generate_content(contents, **request_kwargs)
+            usage = getattr(response, "usage_metadata", None)
+            prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            completion_tokens = getattr(usage, "candidates_token_count", 0) or 0
+            span.set_attributes({
+                "llm.prompt_tokens": prompt_tokens,
+                "llm.completion_tokens": completion_tokens,
+            })
+            return response, prompt_tokens + completion_tokens
+
+    return scheduled_call("gemini", estimated_tokens, call)
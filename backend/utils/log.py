@@ -0,0 +1,138 @@
+"""
+Logging configuration for JobSkillTracker.
+Log records are formatted as one JSON object per line and written by a
+background thread: request handlers only put records on a queue, so slow
+stdout never blocks them. Large debug payloads (scrape results, LLM outputs,
+request bodies) are sampled and truncated.
+
+Configuration:
+    LOG_LEVEL: Minimum level to emit (default "INFO")
+    LOG_FORMAT: "json" (default) or "text"
+    LOG_PAYLOAD_SAMPLE_RATE: Fraction of payload debug logs that are emitted (default 0.01)
+    LOG_PAYLOAD_MAX_CHARS: Payloads are truncated to this many characters (default 2000)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any
+
+from .tracing import current_span
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format a record as a JSON object with its extra fields and trace id."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _TraceContextFilter(logging.Filter):
+    """Attach the active trace and span ids so logs can be joined with traces."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = current_span()
+        if span is not None and not hasattr(record, "trace_id"):
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the writer thread.
+
+    The message arguments and traceback are rendered to strings here so that
+    the record no longer references mutable request objects, but the record
+    is not pre-formatted, so the JSON formatter still sees its fields.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def configure_logging() -> None:
+    """
+    Route the root logger through a queue to a background stdout writer.
+
+    Safe to call more than once; only the first call configures logging.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        stream_handler.setFormatter(JSONFormatter())
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    # Trace ids must be read in the logging thread, before the record is queued
+    queue_handler.addFilter(_TraceContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger, configuring logging on first use."""
+    configure_logging()
+    return logging.getLogger(name)
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any) -> None:
+    """
+    Log a large payload at DEBUG level for a sample of calls.
+
+    The payload is only serialized when the record will be emitted, and is
+    truncated to LOG_PAYLOAD_MAX_CHARS.
+    """
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str, ensure_ascii=False)
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        text = text[:LOG_PAYLOAD_MAX_CHARS] + f"... ({len(text)} chars)"
+    logger.debug(message, extra={"payload": text})
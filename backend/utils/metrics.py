@@ -0,0 +1,419 @@
+"""
+Prometheus metrics for JobSkillTracker.
+This module keeps in-process counters and histograms, fed from finished tracing
+spans, and renders them in the Prometheus text exposition format for the
+/metrics endpoint. No metrics server or client library is required.
+
+With several worker processes, each worker writes its metrics to a shared
+directory (METRICS_DIR) and /metrics on any worker merges them: counters and
+histograms are summed over every worker that has run, and gauges are reported
+per live worker with a "worker" label.
+"""
+
+import asyncio
+import glob
+import json
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .hedging import hedging_stats
+from .log import get_logger
+from .rate_limit import scheduler_stats
+from .tracing import Span, add_span_processor
+
+logger = get_logger(__name__)
+
+# Request, LLM and Vectara metrics are derived from tracing spans, so they also need TRACING_ENABLED
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Directory shared by the worker processes (run_api.py sets it with more than one worker); empty for one process
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+# How often each worker writes its metrics to METRICS_DIR
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Latency buckets in seconds, spanning fast cache hits to slow multi-call LLM requests
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A collected sample: (metric name suffix, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base class of a labelled metric family.
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Names of the labels, in the order values are passed
+    """
+
+    type = "untyped"
+    # How worker processes' samples are merged: "sum" adds them, "worker" labels each
+    # live worker's, "local" reports this process's (for values every worker shares)
+    multiprocess = "sum"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A monotonically increasing value per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [("", self._labels(key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    """Bucketed observations (with sum and count) per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class GaugeCollector(Metric):
+    """A gauge whose samples are read from a callback at scrape time."""
+
+    type = "gauge"
+    multiprocess = "worker"
+
+    def __init__(self, name: str, documentation: str,
+                 collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]], multiprocess: str = ""):
+        super().__init__(name, documentation)
+        self.collect = collect
+        if multiprocess:
+            self.multiprocess = multiprocess
+
+    def samples(self) -> List[Sample]:
+        return [("", labels, value) for labels, value in self.collect()]
+
+
+class CounterCollector(GaugeCollector):
+    """A counter whose samples are read from a callback at scrape time."""
+
+    type = "counter"
+    multiprocess = "sum"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsRegistry:
+    """The set of metrics rendered by the /metrics endpoint."""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def collect(self) -> Dict[str, List[Sample]]:
+        """This process's samples of every metric."""
+        collected = {}
+        for metric in self.metrics:
+            try:
+                collected[metric.name] = metric.samples()
+            except Exception as e:
+                logger.error(f"Error collecting metric {metric.name}: {str(e)}")
+        return collected
+
+    def write_snapshot(self, collected: Optional[Dict[str, List[Sample]]] = None) -> None:
+        """Write this process's samples to METRICS_DIR for the other workers to merge."""
+        if collected is None:
+            collected = self.collect()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"metrics-{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"pid": os.getpid(), "metrics": collected}, f)
+        os.replace(path + ".tmp", path)
+
+    def _merge(self, local: Dict[str, List[Sample]]) -> Dict[str, List[Sample]]:
+        """Every worker's samples, merged per metric as its multiprocess mode says."""
+        self.write_snapshot(local)
+        snapshots = []
+        for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping metrics snapshot {path}: {str(e)}")
+        live = [snapshot for snapshot in snapshots if _pid_alive(snapshot["pid"])]
+        merged = {}
+        for metric in self.metrics:
+            if metric.multiprocess == "local":
+                merged[metric.name] = local.get(metric.name, [])
+            elif metric.multiprocess == "worker":
+                merged[metric.name] = [(suffix, dict(labels, worker=str(snapshot["pid"])), value)
+                                       for snapshot in live
+                                       for suffix, labels, value in snapshot["metrics"].get(metric.name, [])]
+            else:
+                # Workers that have exited still count, so totals do not drop when a worker is replaced
+                totals: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], list] = {}
+                for snapshot in snapshots:
+                    for suffix, labels, value in snapshot["metrics"].get(metric.name, []):
+                        key = (suffix, tuple(sorted(labels.items())))
+                        if key in totals:
+                            totals[key][2] += value
+                        else:
+                            totals[key] = [suffix, labels, value]
+                merged[metric.name] = [tuple(sample) for sample in totals.values()]
+        return merged
+
+    def render(self) -> str:
+        collected = self.collect()
+        if METRICS_DIR:
+            collected = self._merge(collected)
+        lines = []
+        for metric in self.metrics:
+            samples = collected.get(metric.name)
+            if samples is None:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "llm_requests_total", "LLM API calls by provider, model and outcome", ("provider", "model", "status")))
+LLM_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds", "LLM API call latency by provider and model", ("provider", "model")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "LLM tokens by provider, model and type (prompt or completion)",
+    ("provider", "model", "type")))
+LLM_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "llm_queue_wait_seconds", "Time LLM calls waited for their provider's rate limit budget",
+    ("provider", "priority")))
+CREW_KICKOFF_DURATION = REGISTRY.register(Histogram(
+    "crew_kickoff_duration_seconds", "CrewAI crew.kickoff() latency by agent", ("agent",)))
+VECTARA_REQUESTS = REGISTRY.register(Counter(
+    "vectara_requests_total", "Vectara HTTP calls by operation and outcome", ("operation", "status")))
+VECTARA_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "vectara_request_duration_seconds", "Vectara HTTP call latency by operation", ("operation",)))
+LOCAL_SKILL_EXTRACTIONS = REGISTRY.register(Counter(
+    "local_skill_extractions_total", "Job postings tagged by the local skill extractor, by outcome",
+    ("outcome",)))
+LOCAL_SKILL_DURATION = REGISTRY.register(Histogram(
+    "local_skill_extraction_duration_seconds", "Local skill extractor latency", (),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)))
+
+
+def record_span(span: Span) -> None:
+    """Update the request, LLM, CrewAI, Vectara and local skill extraction metrics from a finished span."""
+    seconds = span.duration_ms / 1000
+    attributes = span.attributes
+    if span.kind == "SERVER":
+        method = attributes.get("http.method", "")
+        # Unmatched paths are grouped so that arbitrary URLs do not create new series
+        route = attributes.get("http.route", "unmatched")
+        status = str(attributes.get("http.status_code", 500 if span.status == "ERROR" else 200))
+        HTTP_REQUESTS.inc(method, route, status)
+        HTTP_REQUEST_DURATION.observe(seconds, method, route)
+    elif span.name.startswith("llm."):
+        provider = attributes.get("llm.provider", span.name[len("llm."):])
+        model = attributes.get("llm.model", "")
+        LLM_REQUESTS.inc(provider, model, "error" if span.status == "ERROR" else "ok")
+        LLM_REQUEST_DURATION.observe(seconds, provider, model)
+        LLM_TOKENS.inc(provider, model, "prompt", amount=attributes.get("llm.prompt_tokens", 0))
+        LLM_TOKENS.inc(provider, model, "completion", amount=attributes.get("llm.completion_tokens", 0))
+        LLM_QUEUE_WAIT.observe(attributes.get("llm.queue_wait_ms", 0) / 1000, provider,
+                               attributes.get("llm.priority", ""))
+    elif span.name == "crew.kickoff":
+        CREW_KICKOFF_DURATION.observe(seconds, attributes.get("crew.agent", ""))
+    elif span.name.startswith("vectara."):
+        operation = span.name[len("vectara."):]
+        VECTARA_REQUESTS.inc(operation, "error" if span.status == "ERROR" else "ok")
+        VECTARA_REQUEST_DURATION.observe(seconds, operation)
+    elif span.name == "skills.local":
+        LOCAL_SKILL_EXTRACTIONS.inc("escalated" if attributes.get("skills.escalated") else "local")
+        LOCAL_SKILL_DURATION.observe(seconds)
+
+
+def register_cache_metrics(caches: Callable[[], Iterable[dict]]) -> None:
+    """
+    Expose hit, miss and size metrics for caches.
+
+    Args:
+        caches: Returns the stats() dicts of the caches, each with a "name" key
+    """
+    def collect(field: str) -> Callable[[], List[Tuple[Dict[str, str], float]]]:
+        return lambda: [({"cache": stats["name"]}, stats.get(field, 0)) for stats in caches()]
+
+    REGISTRY.register(CounterCollector("cache_hits_total", "Cache hits by cache", collect("hits")))
+    REGISTRY.register(CounterCollector("cache_misses_total", "Cache misses by cache", collect("misses")))
+    REGISTRY.register(GaugeCollector("cache_entries", "Number of entries by cache", collect("size")))
+    REGISTRY.register(CounterCollector(
+        "cache_near_hits_total", "Exact-key misses served from a similar cached entry",
+        lambda: [({"cache": stats["name"]}, stats["near_hits"]) for stats in caches() if "near_hits" in stats]))
+
+
+def register_job_metrics(counts: Callable[[], Dict[str, int]]) -> None:
+    """
+    Expose the number of background jobs by status.
+
+    Args:
+        counts: Returns {status: number of jobs}
+    """
+    # Every worker reads the same job queue, so the counts are not merged
+    REGISTRY.register(GaugeCollector(
+        "jobs", "Background jobs by status",
+        lambda: [({"status": status}, count) for status, count in counts().items()], multiprocess="local"))
+
+
+def _executor_stats() -> List[Tuple[Dict[str, str], float]]:
+    """Queue depth and thread count of the event loop's default executor (used by asyncio.to_thread)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return []
+    executor = getattr(loop, "_default_executor", None)
+    if executor is None:
+        return [({"stat": "queued"}, 0), ({"stat": "threads"}, 0)]
+    return [
+        ({"stat": "queued"}, executor._work_queue.qsize()),
+        ({"stat": "threads"}, len(executor._threads)),
+    ]
+
+
+REGISTRY.register(GaugeCollector(
+    "executor_tasks", "Default thread pool executor queue depth (queued) and worker threads (threads)",
+    _executor_stats))
+
+
+REGISTRY.register(GaugeCollector(
+    "llm_queue_depth", "LLM calls waiting for their provider's rate limit budget, by priority",
+    lambda: [({"provider": stats["provider"], "priority": priority}, count)
+             for stats in scheduler_stats() for priority, count in stats["queued"].items()]))
+REGISTRY.register(GaugeCollector(
+    "llm_rate_factor", "Fraction of the configured LLM budget currently admitted (lowered after 429s)",
+    lambda: [({"provider": stats["provider"]}, stats["rate_factor"]) for stats in scheduler_stats()]))
+REGISTRY.register(CounterCollector(
+    "llm_rate_limited_total", "LLM calls rejected by the provider with HTTP 429",
+    lambda: [({"provider": stats["provider"]}, stats["rate_limited"]) for stats in scheduler_stats()]))
+
+REGISTRY.register(CounterCollector(
+    "llm_hedge_eligible_total", "LLM calls that could be hedged, by operation and primary provider",
+    lambda: [({"operation": stats["operation"], "provider": stats["provider"]}, stats["calls"])
+             for stats in hedging_stats()]))
+REGISTRY.register(CounterCollector(
+    "llm_hedges_total", "Hedge requests sent to a secondary provider, by operation and that provider",
+    lambda: [({"operation": stats["operation"], "provider": stats["provider"]}, stats["hedges"])
+             for stats in hedging_stats()]))
+REGISTRY.register(CounterCollector(
+    "llm_hedge_wins_total", "Hedged LLM calls answered first by the provider, by operation",
+    lambda: [({"operation": stats["operation"], "provider": stats["provider"]}, stats["wins"])
+             for stats in hedging_stats()]))
+REGISTRY.register(GaugeCollector(
+    "llm_hedge_delay_seconds", "Current wait for a provider's response before hedging, by operation",
+    lambda: [({"operation": stats["operation"], "provider": stats["provider"]}, stats["delay"])
+             for stats in hedging_stats() if stats["calls"]]))
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+async def flush_metrics() -> None:
+    """
+    Write this worker's metrics to METRICS_DIR every METRICS_FLUSH_SECONDS
+    (and once more when cancelled), so workers that are not scraped are still counted.
+    Runs on the event loop, where the executor gauges can be read.
+    """
+    try:
+        while True:
+            try:
+                await asyncio.to_thread(REGISTRY.write_snapshot, REGISTRY.collect())
+            except OSError as e:
+                logger.error(f"Error writing metrics to {METRICS_DIR}: {str(e)}")
+            await asyncio.sleep(METRICS_FLUSH_SECONDS)
+    finally:
+        REGISTRY.write_snapshot(REGISTRY.collect())
+
+
+if METRICS_ENABLED:
+    add_span_processor(record_span)
@@ -0,0 +1,22 @@
+"""
+Locations of the files JobSkillTracker writes at runtime.
+SQLite databases, saved embeddings and trace files live in one data
+directory (DATA_DIR), which defaults to backend/data so it does not depend on
+the directory the server is started from.
+"""
+
+import os
+
+DATA_DIR = os.getenv("DATA_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def data_path(name: str) -> str:
+    """The path of a file or directory in the data directory."""
+    return os.path.join(DATA_DIR, name)
+
+
+def ensure_parent(path: str) -> None:
+    """Create the directory a file will be written to, if it does not exist."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
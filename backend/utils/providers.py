@@ -0,0 +1,140 @@
+"""
+Lazily-initialized external service clients for JobSkillTracker.
+The OpenAI, Gemini and Firecrawl SDKs are slow to import, so each client is
+created (and its SDK imported) on first use instead of when the API process
+starts. Clients are created once per process and shared by all requests.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("Gemini_API_KEY")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY", "")
+FIRECRAWL_API_URL = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev")
+
+# Gemini model used by /chat when model discovery finds no Gemini model
+DEFAULT_GEMINI_CHAT_MODEL = "models/gemini-1.5-flash"
+
+_MISSING = object()
+
+
+class LazyProvider:
+    """
+    A value built by factory() on first get() and reused afterwards.
+
+    Creation is serialized with a lock so concurrent first requests build the
+    value once. If the factory raises, nothing is stored and the next get()
+    tries again.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._value = _MISSING
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        value = self._value
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            if self._value is _MISSING:
+                self._value = self._factory()
+                logger.debug(f"Initialized {self.name} provider")
+            return self._value
+
+    @property
+    def initialized(self) -> bool:
+        return self._value is not _MISSING
+
+    def reset(self) -> None:
+        """Drop the cached value so the next get() builds a new one."""
+        with self._lock:
+            self._value = _MISSING
+
+
+def _create_openai_client():
+    if not OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not found in environment variables")
+        return None
+    import openai
+    logger.info("OpenAI client configured")
+    return openai.OpenAI(api_key=OPENAI_API_KEY)
+
+
+def _configure_gemini():
+    if not GEMINI_API_KEY:
+        logger.warning("Gemini API key not found in environment variables")
+        return None
+    import google.generativeai as genai
+    if GEMINI_API_ENDPOINT:
+        # A custom endpoint (e.g. the benchmark stand-in) is reached over REST rather than gRPC
+        genai.configure(api_key=GEMINI_API_KEY, transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=GEMINI_API_KEY)
+    logger.info("Google Generative AI (Gemini) API key configured")
+    return genai
+
+
+def _discover_gemini_chat_model():
+    """Pick a Gemini Flash model, then any Gemini model, from the models the key can use."""
+    genai = gemini.get()
+    model_names = [model.name for model in genai.list_models()]
+    logger.debug("Available Gemini models", extra={"models": model_names})
+    for model_name in model_names:
+        if "flash" in model_name.lower() and "gemini" in model_name.lower():
+            return model_name
+    for model_name in model_names:
+        if "gemini" in model_name.lower():
+            return model_name
+    logger.warning("No Gemini model found, falling back to default")
+    return DEFAULT_GEMINI_CHAT_MODEL
+
+
+def _create_firecrawl_app():
+    if not FIRECRAWL_API_KEY:
+        logger.warning("Firecrawl API key not found in environment variables")
+        return None
+    from firecrawl import FirecrawlApp
+    logger.debug("Firecrawl initialized with API key")
+    return FirecrawlApp(api_key=FIRECRAWL_API_KEY, api_url=FIRECRAWL_API_URL)
+
+
+openai_client = LazyProvider("openai", _create_openai_client)
+gemini = LazyProvider("gemini", _configure_gemini)
+gemini_chat_model_name = LazyProvider("gemini_chat_model", _discover_gemini_chat_model)
+firecrawl_app = LazyProvider("firecrawl", _create_firecrawl_app)
+
+
+def get_openai_client() -> Optional[Any]:
+    """Return the shared OpenAI client, or None without OPENAI_API_KEY."""
+    return openai_client.get()
+
+
+def get_gemini_model(model_name: str) -> Any:
+    """Return a Gemini GenerativeModel; raises RuntimeError without a Gemini API key."""
+    genai = gemini.get()
+    if genai is None:
+        raise RuntimeError("Gemini API key not configured")
+    return genai.GenerativeModel(model_name)
+
+
+def get_firecrawl_app() -> Optional[Any]:
+    """Return the shared Firecrawl client, or None without FIRECRAWL_API_KEY."""
+    return firecrawl_app.get()
+
+
+def preload_providers() -> None:
+    """Create every configured client now rather than on the first request that needs it."""
+    for provider in (openai_client, gemini, firecrawl_app):
+        try:
+            provider.get()
+        except Exception as e:
+            logger.error(f"Error initializing {provider.name} provider: {str(e)}")
@@ -0,0 +1,474 @@
+"""
+Client-side rate limiting of LLM API calls for JobSkillTracker.
+Each provider (OpenAI, Gemini) has a scheduler with token buckets for its
+requests-per-minute and tokens-per-minute budgets. Calls over budget wait in a
+queue that serves interactive requests (/chat, /interview) before batch ones,
+and shares capacity fairly between users within a priority class. A 429 from
+the provider pauses the provider for its Retry-After period, lowers the
+admitted rate until calls succeed again, and is retried through the queue.
+
+With a shared CACHE_BACKEND (sqlite or redis) the buckets are shared by every
+worker process, so the budgets apply to the whole deployment.
+"""
+
+import heapq
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import CACHE_BACKEND, CACHE_REDIS_URL, CACHE_SQLITE_PATH, sqlite_connection
+from .cancellation import check_cancelled, current_token
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Budgets per provider; 0 leaves that dimension unlimited
+PROVIDER_LIMITS = {
+    "openai": (int(os.getenv("OPENAI_RPM", "0")), int(os.getenv("OPENAI_TPM", "0"))),
+    "gemini": (int(os.getenv("GEMINI_RPM", "0")), int(os.getenv("GEMINI_TPM", "0"))),
+}
+# Longest a call may wait in the queue before failing with RateLimitTimeout
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "60"))
+# Times a call rejected with a 429 is queued again
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))
+# Pause used when a 429 carries no Retry-After
+DEFAULT_RETRY_AFTER = 5.0
+# Routes whose LLM calls are served before everything else
+INTERACTIVE_PATHS = {path.strip() for path in os.getenv("LLM_INTERACTIVE_PATHS", "/chat,/interview").split(",")
+                     if path.strip()}
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+_PRIORITY_RANK = {INTERACTIVE: 0, BATCH: 1}
+
+# Completion size assumed when a call does not set a maximum
+DEFAULT_COMPLETION_TOKENS = 512
+# How often a queued call checks whether its request was cancelled
+CANCEL_POLL_INTERVAL = 0.05
+
+_current_user: ContextVar[str] = ContextVar("llm_user", default="anonymous")
+_current_priority: ContextVar[str] = ContextVar("llm_priority", default=BATCH)
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when an LLM call waited longer than LLM_QUEUE_TIMEOUT for its provider's budget."""
+
+
+def estimate_tokens(text: Any) -> int:
+    """Rough token count of a prompt (about four characters per token)."""
+    return len(str(text)) // 4 + 1
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors from the OpenAI (status_code) or Google (code) SDKs."""
+    return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429
+
+
+# RetryInfo as printed by the gRPC ("retry_delay { seconds: 30 }") and REST ("'retryDelay': '30s'") transports
+_RETRY_DELAY_RE = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)|retryDelay['\"]?:\s*['\"](\d+(?:\.\d+)?)s")
+
+
+def retry_after(error: Exception) -> float:
+    """
+    Seconds to back off after a 429: the Retry-After(-ms) response header for
+    OpenAI, the RetryInfo retry_delay for Gemini, DEFAULT_RETRY_AFTER otherwise.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    match = _RETRY_DELAY_RE.search(str(error))
+    if match:
+        return float(match.group(1) or match.group(2))
+    return DEFAULT_RETRY_AFTER
+
+
+class _Bucket:
+    """
+    Token bucket of capacity tokens refilled at rate tokens per second.
+
+    Backends implement _apply(), which atomically refills the bucket and then
+    either takes amount if available (returning 0) or returns the seconds to
+    wait. With force the amount is applied even if that leaves the bucket
+    negative. block_until pauses every take until that time.
+    """
+
+    def __init__(self, name: str, capacity: float, rate: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+
+    def _apply(self, amount: float, rate: float, force: bool, block_until: float) -> float:
+        raise NotImplementedError
+
+    def take(self, amount: float, rate_factor: float = 1.0) -> float:
+        """Take amount tokens; returns 0 on success or the seconds until they are available."""
+        return self._apply(min(amount, self.capacity), self.rate * rate_factor, False, 0.0)
+
+    def adjust(self, amount: float) -> None:
+        """Take (positive) or return (negative) tokens unconditionally, e.g. to settle an estimate."""
+        self._apply(amount, self.rate, True, 0.0)
+
+    def pause(self, until: float) -> None:
+        """Refuse every take until the given time.time()."""
+        self._apply(0, self.rate, True, until)
+
+
+def _refill(state: Tuple[float, float, float], capacity: float, amount: float, rate: float,
+            force: bool, block_until: float, now: float) -> Tuple[Tuple[float, float, float], float]:
+    """Return the new (tokens, updated_at, blocked_until) state and the wait time."""
+    tokens, updated_at, blocked_until = state
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    blocked_until = max(blocked_until, block_until)
+    if force:
+        return (min(capacity, tokens - amount), now, blocked_until), 0.0
+    if blocked_until > now:
+        return (tokens, now, blocked_until), blocked_until - now
+    if tokens >= amount:
+        return (tokens - amount, now, blocked_until), 0.0
+    return (tokens, now, blocked_until), (amount - tokens) / rate if rate > 0 else DEFAULT_RETRY_AFTER
+
+
+class MemoryBucket(_Bucket):
+    """Token bucket in this process."""
+
+    def __init__(self, name: str, capacity: float, rate: float):
+        super().__init__(name, capacity, rate)
+        self._state = (capacity, time.time(), 0.0)
+        self._lock = threading.Lock()
+
+    def _apply(self, amount, rate, force, block_until):
+        with self._lock:
+            self._state, wait = _refill(self._state, self.capacity, amount, rate, force, block_until, time.time())
+        return wait
+
+
+_BUCKET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL,
+    updated_at REAL NOT NULL, blocked_until REAL NOT NULL);
+"""
+
+
+class SQLiteBucket(_Bucket):
+    """
+    Token bucket stored in the CACHE_SQLITE_PATH database, shared by every worker process.
+    Database errors are logged and the call is admitted, so limiting never blocks requests indefinitely.
+    """
+
+    def __init__(self, name: str, capacity: float, rate: float, path: str = CACHE_SQLITE_PATH):
+        super().__init__(name, capacity, rate)
+        self.path = path
+
+    def _apply(self, amount, rate, force, block_until):
+        now = time.time()
+        try:
+            connection = sqlite_connection(self.path, _BUCKET_SCHEMA)
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute("SELECT tokens, updated_at, blocked_until FROM rate_limit_buckets "
+                                         "WHERE name = ?", (self.name,)).fetchone()
+                state, wait = _refill(row or (self.capacity, now, 0.0), self.capacity, amount, rate, force,
+                                      block_until, now)
+                connection.execute("INSERT OR REPLACE INTO rate_limit_buckets VALUES (?, ?, ?, ?)",
+                                   (self.name, *state))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            return wait
+        except sqlite3.Error as e:
+            logger.warning(f"Error updating rate limit bucket {self.name}: {str(e)}")
+            return 0.0
+
+
+# Same arithmetic as _refill, run atomically on the server
+_REDIS_APPLY = """
+local capacity, amount, rate = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local force, block_until, now = ARGV[4] == '1', tonumber(ARGV[5]), tonumber(ARGV[6])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+local blocked_until = math.max(tonumber(state[3]) or 0, block_until)
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if force then
+  tokens = math.min(capacity, tokens - amount)
+elseif blocked_until > now then
+  wait = blocked_until - now
+elseif tokens >= amount then
+  tokens = tokens - amount
+elseif rate > 0 then
+  wait = (amount - tokens) / rate
+else
+  wait = 5
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now, 'blocked_until', blocked_until)
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(wait)
+"""
+
+
+class RedisBucket(_Bucket):
+    """
+    Token bucket stored in Redis, shared by every process using the server.
+    Connection errors are logged and the call is admitted.
+    """
+
+    def __init__(self, name: str, capacity: float, rate: float, url: str = CACHE_REDIS_URL):
+        super().__init__(name, capacity, rate)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package (pip install redis)")
+        self._errors = redis.RedisError
+        self._script = redis.Redis.from_url(url).register_script(_REDIS_APPLY)
+        self._key = f"jobskilltracker:rate_limit:{name}"
+
+    def _apply(self, amount, rate, force, block_until):
+        try:
+            return float(self._script(keys=[self._key], args=[self.capacity, amount, rate, int(force),
+                                                               block_until, time.time()]))
+        except self._errors as e:
+            logger.warning(f"Error updating rate limit bucket {self.name}: {str(e)}")
+            return 0.0
+
+
+def create_bucket(name: str, capacity: float, rate: float, backend: Optional[str] = None) -> _Bucket:
+    """Create a token bucket on the configured backend (CACHE_BACKEND unless backend is given)."""
+    backend = (backend or CACHE_BACKEND).lower()
+    if backend == "sqlite":
+        return SQLiteBucket(name, capacity, rate)
+    if backend == "redis":
+        return RedisBucket(name, capacity, rate)
+    return MemoryBucket(name, capacity, rate)
+
+
+class _Ticket:
+    __slots__ = ("user", "priority", "tokens", "tag")
+
+    def __init__(self, user: str, priority: str, tokens: int, tag: float):
+        self.user = user
+        self.priority = priority
+        self.tokens = tokens
+        self.tag = tag
+
+
+class LLMScheduler:
+    """
+    Admits calls to one provider within its request and token budgets.
+
+    Waiting calls are ordered by priority class, then by start-time fair
+    queueing tags: each user's tag advances by the tokens they request, so a
+    user with many queued calls cannot crowd out a user with a few. Only the
+    call at the head of the queue takes from the buckets.
+
+    The admitted rate is multiplied by rate_factor, which halves on every 429
+    (down to 10%) and recovers by 5% of the budget per successful call.
+
+    Args:
+        provider: Provider name, used for bucket names and metrics
+        requests_per_minute: Request budget (0 for unlimited)
+        tokens_per_minute: Prompt plus completion token budget (0 for unlimited)
+        timeout: Longest a call waits before RateLimitTimeout
+    """
+
+    def __init__(self, provider: str, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 timeout: float = LLM_QUEUE_TIMEOUT):
+        self.provider = provider
+        self.timeout = timeout
+        self.rate_factor = 1.0
+        self.rate_limited = 0
+        self.requests = (create_bucket(f"{provider}:requests", requests_per_minute, requests_per_minute / 60)
+                         if requests_per_minute > 0 else None)
+        self.tokens = (create_bucket(f"{provider}:tokens", tokens_per_minute, tokens_per_minute / 60)
+                       if tokens_per_minute > 0 else None)
+        # A pause after a 429 applies even without budgets; it is then kept in this process, so an
+        # unlimited provider's calls do not take a shared bucket (a database write) each
+        self.pause_bucket = self.requests or create_bucket(f"{provider}:pause", 1, 1000.0, backend="memory")
+        self.paused_until = 0.0
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[int, float, int, _Ticket]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._user_tags: Dict[str, float] = {}
+
+    def _try_take(self, ticket: _Ticket) -> float:
+        wait = self.pause_bucket.take(1, self.rate_factor)
+        if wait > 0 or self.tokens is None:
+            return wait
+        wait = self.tokens.take(ticket.tokens, self.rate_factor)
+        if wait > 0:
+            self.pause_bucket.adjust(-1)
+        return wait
+
+    def acquire(self, tokens: int, user: Optional[str] = None, priority: Optional[str] = None) -> float:
+        """
+        Wait until a call of about `tokens` tokens may run; returns the seconds waited.
+
+        Raises RateLimitTimeout after waiting `timeout` seconds, and
+        OperationCancelled once the current request is cancelled.
+        """
+        if self.requests is None and self.tokens is None and time.time() >= self.paused_until:
+            # Nothing to wait for without budgets, unless a 429 paused the provider
+            return 0.0
+        cancel = current_token()
+        user = user or _current_user.get()
+        priority = priority if priority in _PRIORITY_RANK else _current_priority.get()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        poll = CANCEL_POLL_INTERVAL if cancel is not None else self.timeout
+        with self._condition:
+            tag = max(self._virtual_time, self._user_tags.get(user, 0.0)) + max(tokens, 1)
+            self._user_tags[user] = tag
+            ticket = _Ticket(user, priority, tokens, tag)
+            entry = (_PRIORITY_RANK[priority], tag, next(self._sequence), ticket)
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    if cancel is not None:
+                        cancel.check()
+                    remaining = deadline - time.monotonic()
+                    if self._queue[0] is entry:
+                        wait = self._try_take(ticket)
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            self._virtual_time = max(self._virtual_time, tag - max(tokens, 1))
+                            if len(self._user_tags) > 10000:
+                                self._user_tags = {user: tag}
+                            self._condition.notify_all()
+                            return time.monotonic() - start
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"{self.provider} rate limit: waited {self.timeout:g}s")
+                        self._condition.wait(min(wait, remaining, poll))
+                    else:
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"{self.provider} rate limit: waited {self.timeout:g}s")
+                        self._condition.wait(min(remaining, poll))
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+
+    def settle(self, estimated_tokens: int, used_tokens: int) -> None:
+        """Charge the difference between the tokens a call used and its estimate, and speed back up."""
+        if self.tokens is not None and used_tokens:
+            self.tokens.adjust(used_tokens - min(estimated_tokens, self.tokens.capacity))
+        if self.rate_factor < 1.0:
+            self.rate_factor = min(1.0, self.rate_factor + 0.05)
+
+    def on_rate_limited(self, seconds: float) -> None:
+        """Pause every call to the provider for `seconds` and halve the admitted rate."""
+        self.rate_limited += 1
+        self.rate_factor = max(0.1, self.rate_factor / 2)
+        self.paused_until = max(self.paused_until, time.time() + seconds)
+        self.pause_bucket.pause(self.paused_until)
+        logger.warning(f"{self.provider} rate limited; pausing {seconds:.1f}s at {self.rate_factor:.0%} of budget")
+        with self._condition:
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            queued = {INTERACTIVE: 0, BATCH: 0}
+            for _, _, _, ticket in self._queue:
+                queued[ticket.priority] += 1
+        return {"provider": self.provider, "queued": queued, "rate_factor": self.rate_factor,
+                "rate_limited": self.rate_limited}
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider: str) -> LLMScheduler:
+    """Return the process-wide scheduler of a provider, configured from PROVIDER_LIMITS."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            requests_per_minute, tokens_per_minute = PROVIDER_LIMITS.get(provider, (0, 0))
+            scheduler = _schedulers[provider] = LLMScheduler(provider, requests_per_minute, tokens_per_minute)
+        return scheduler
+
+
+def scheduler_stats() -> List[dict]:
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return [scheduler.stats() for scheduler in schedulers]
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def current_user() -> str:
+    return _current_user.get()
+
+
+@contextmanager
+def llm_request_context(user: str, priority: str = BATCH):
+    """Attribute the LLM calls made within the block to user, at the given priority."""
+    user_token = _current_user.set(user)
+    priority_token = _current_priority.set(priority if priority in _PRIORITY_RANK else BATCH)
+    try:
+        yield
+    finally:
+        _current_user.reset(user_token)
+        _current_priority.reset(priority_token)
+
+
+def scheduled_call(provider: str, estimated_tokens: int, call: Callable[[float], Tuple[Any, int]]) -> Any:
+    """
+    Run call(queue_wait_ms) once the provider's scheduler admits it and return its result.
+
+    call returns (result, tokens used). A 429 pauses the provider for its
+    Retry-After and the call is queued again, up to LLM_RATE_LIMIT_RETRIES times.
+    """
+    scheduler = get_scheduler(provider)
+    for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+        waited = scheduler.acquire(estimated_tokens)
+        check_cancelled()
+        try:
+            result, used_tokens = call(waited * 1000)
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                raise
+            scheduler.on_rate_limited(retry_after(e))
+            if attempt == LLM_RATE_LIMIT_RETRIES:
+                raise
+            continue
+        scheduler.settle(estimated_tokens, used_tokens)
+        return result
+
+
+class LLMRequestContextMiddleware:
+    """
+    ASGI middleware that tags each request's LLM calls with a user and priority.
+
+    The user is the X-User-Id header, falling back to the client address; the
+    priority is interactive for INTERACTIVE_PATHS and batch otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        user = dict(scope.get("headers") or []).get(b"x-user-id", b"").decode("latin-1")
+        if not user:
+            user = (scope.get("client") or ("anonymous",))[0]
+        priority = INTERACTIVE if scope.get("path") in INTERACTIVE_PATHS else BATCH
+        with llm_request_context(user, priority):
+            await self.app(scope, receive, send)
@@ -0,0 +1,216 @@
+"""
+Project recommendation cache for JobSkillTracker.
+Recommendations are keyed on the canonical (taxonomy-normalized, sorted) skill
+gap and current skill sets, so users with the same gaps spelled differently
+share one entry. Lookups can fall back to the most similar cached gap set for
+the same current skills by Jaccard similarity, and the most requested gap sets are re-warmed so they stay
+cached after their entries expire.
+
+Entries live on the configured cache backend, so with a shared backend every
+worker sees them. The skill index used for near matches and the popularity
+counts are per process.
+"""
+
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from .cache import create_cache, make_key
+from .log import get_logger
+from .skill_taxonomy import canonical_skill_set
+
+logger = get_logger(__name__)
+
+# Bump when the project recommendation prompt changes so stale entries are not reused
+PROJECT_PROMPT_VERSION = "1"
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two sets (1.0 for two empty sets)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class RecommendationCache:
+    """
+    Cache of project recommendations keyed by canonical skill sets.
+
+    Args:
+        maxsize: Maximum number of cached recommendation sets
+        ttl: Time-to-live of an entry in seconds
+        near_match_threshold: Minimum Jaccard similarity between gap sets for a
+            near-match hit; 0 disables near matching
+        max_tracked: Number of distinct gap sets tracked for popularity
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 7 * 24 * 3600,
+                 near_match_threshold: float = 0.8, max_tracked: int = 10000):
+        self.cache = create_cache("project_recommendations", maxsize=maxsize, ttl=ttl)
+        self.near_match_threshold = near_match_threshold
+        self.max_tracked = max_tracked
+        self.near_hits = 0
+        self._lock = threading.Lock()
+        # skill -> keys of cached entries whose gap set contains it, and key -> its gap set
+        self._skill_index = defaultdict(set)
+        self._indexed_gaps = {}
+        # key -> (gap set, current skill set) for popularity tracking and warming
+        self._requests = Counter()
+        self._request_inputs = {}
+
+    def _key(self, gaps: Tuple[str, ...], current: Tuple[str, ...]) -> str:
+        return make_key(PROJECT_PROMPT_VERSION, gaps, current)
+
+    def _track(self, key: str, gaps: List[Any], current: List[Any]) -> None:
+        with self._lock:
+            self._requests[key] += 1
+            self._request_inputs[key] = (gaps, current)
+            if len(self._requests) > self.max_tracked:
+                # Keep the most requested half
+                for stale_key, _ in self._requests.most_common()[self.max_tracked // 2:]:
+                    del self._requests[stale_key]
+                    self._request_inputs.pop(stale_key, None)
+
+    def _near_match(self, gaps: Tuple[str, ...], current: Tuple[str, ...]) -> Optional[Any]:
+        """
+        Return the cached result for the same current skills whose gap set is
+        most similar to gaps, if close enough.
+        """
+        if self.near_match_threshold <= 0 or not gaps:
+            return None
+        gap_set = frozenset(gaps)
+        with self._lock:
+            candidates = set()
+            for skill in gap_set:
+                candidates |= self._skill_index.get(skill, set())
+
+        best_score, best_result = 0.0, None
+        for key in candidates:
+            entry = self.cache.peek(key)
+            if entry is None:
+                self._unindex(key)
+                continue
+            # The prompt includes the current skills, so only entries generated for the same ones are reused
+            if tuple(entry["current"]) != current:
+                continue
+            score = jaccard(gap_set, frozenset(entry["gaps"]))
+            if score > best_score:
+                best_score, best_result = score, entry["result"]
+        if best_score >= self.near_match_threshold:
+            with self._lock:
+                self.near_hits += 1
+            return best_result
+        return None
+
+    def _index(self, key: str, gaps: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._indexed_gaps[key] = gaps
+            for skill in gaps:
+                self._skill_index[skill].add(key)
+
+    def _unindex(self, key: str) -> None:
+        with self._lock:
+            for skill in self._indexed_gaps.pop(key, ()):
+                keys = self._skill_index.get(skill)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._skill_index[skill]
+
+    def _lookup(self, gaps: Tuple[str, ...], current: Tuple[str, ...]) -> Optional[Any]:
+        key = self._key(gaps, current)
+        entry = self.cache.get(key)
+        if entry is not None:
+            # Entries stored by other workers become near-match candidates once seen here
+            self._index(key, gaps)
+            return entry["result"]
+        return self._near_match(gaps, current)
+
+    def _store(self, gaps: Tuple[str, ...], current: Tuple[str, ...], result: Any) -> None:
+        key = self._key(gaps, current)
+        self.cache.set(key, {"gaps": list(gaps), "current": list(current), "result": result})
+        self._index(key, gaps)
+
+    def get(self, skill_gaps: Iterable[Any], current_skills: Iterable[Any]) -> Optional[Any]:
+        """Return cached recommendations for an exact or near-matching skill gap set."""
+        return self._lookup(canonical_skill_set(skill_gaps), canonical_skill_set(current_skills))
+
+    def set(self, skill_gaps: Iterable[Any], current_skills: Iterable[Any], result: Any) -> None:
+        self._store(canonical_skill_set(skill_gaps), canonical_skill_set(current_skills), result)
+
+    def get_or_compute(self, skill_gaps: List[Any], current_skills: List[Any],
+                       compute: Callable[[List[Any], List[Any]], Any]) -> Any:
+        """
+        Return cached recommendations, calling compute(skill_gaps, current_skills) on a miss.
+
+        Results that could not be parsed ({"raw_text": ...}) are not cached.
+        """
+        gaps = canonical_skill_set(skill_gaps)
+        current = canonical_skill_set(current_skills)
+        self._track(self._key(gaps, current), list(skill_gaps), list(current_skills))
+
+        result = self._lookup(gaps, current)
+        if result is not None:
+            return result
+        result = compute(skill_gaps, current_skills)
+        if not (isinstance(result, dict) and "raw_text" in result):
+            self._store(gaps, current, result)
+        return result
+
+    def most_common(self, n: int) -> List[Tuple[List[Any], List[Any]]]:
+        """Return the inputs of the n most requested gap sets."""
+        with self._lock:
+            return [self._request_inputs[key] for key, _ in self._requests.most_common(n)
+                    if key in self._request_inputs]
+
+    def warm(self, compute: Callable[[List[Any], List[Any]], Any],
+             combinations: Optional[List[Tuple[List[Any], List[Any]]]] = None, top_n: int = 20) -> int:
+        """
+        Precompute recommendations for common gap sets that are not cached.
+
+        Args:
+            compute: Function producing recommendations for (skill_gaps, current_skills)
+            combinations: Gap sets to warm; defaults to the top_n most requested ones
+            top_n: Number of popular gap sets to warm when combinations is not given
+
+        Returns:
+            The number of gap sets that were computed
+        """
+        if combinations is None:
+            combinations = self.most_common(top_n)
+        warmed = 0
+        for skill_gaps, current_skills in combinations:
+            gaps = canonical_skill_set(skill_gaps)
+            current = canonical_skill_set(current_skills)
+            if self.cache.peek(self._key(gaps, current)) is not None:
+                continue
+            try:
+                result = compute(skill_gaps, current_skills)
+            except Exception as e:
+                logger.error(f"Error warming project recommendations for {list(gaps)}: {str(e)}")
+                continue
+            if not (isinstance(result, dict) and "raw_text" in result):
+                self._store(gaps, current, result)
+                warmed += 1
+        return warmed
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        stats["near_hits"] = self.near_hits
+        stats["tracked_gap_sets"] = len(self._requests)
+        return stats
+
+
+def load_warm_combinations(path: str) -> List[Tuple[List[Any], List[Any]]]:
+    """
+    Load gap sets to warm from a JSON file.
+
+    The file holds a list of objects with "skill_gaps" and optional "current_skills" lists.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        entries = json.load(f)
+    return [(entry.get("skill_gaps", []), entry.get("current_skills", [])) for entry in entries]
@@ -0,0 +1,100 @@
+"""
+Rule-based skill extraction for JobSkillTracker.
+These functions detect skills in job descriptions and resumes without an LLM:
+they are the fallback when AI extraction is unavailable and the fast path for
+resume skill gap analysis.
+"""
+
+import re
+
+
+def extract_skills_rule_based(job_description, job_title):
+    """
+    Extract skills from job description using rule-based approach.
+    This is a fallback method when AI extraction is not available.
+    """
+    # Common technical skills to look for
+    tech_skills = [
+        "Python", "JavaScript", "Java", "C++", "C#", "Ruby", "PHP", "Swift", "Kotlin", "Go",
+        "React", "Angular", "Vue.js", "Node.js", "Django", "Flask", "Spring", "ASP.NET",
+        "SQL", "NoSQL", "MongoDB", "PostgreSQL", "MySQL", "Oracle", "Firebase",
+        "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "CI/CD", "Git",
+        "Machine Learning", "AI", "Data Science", "TensorFlow", "PyTorch", "NLP",
+        "HTML", "CSS", "SASS", "LESS", "Bootstrap", "Tailwind CSS",
+        "REST API", "GraphQL", "Microservices", "Serverless", "WebSockets",
+        "Agile", "Scrum", "Kanban", "JIRA", "Confluence", "DevOps"
+    ]
+    
+    # Common soft skills to look for
+    soft_skills = [
+        "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Adaptability",
+        "Time Management", "Leadership", "Creativity", "Attention to Detail", "Collaboration",
+        "Analytical Thinking", "Decision Making", "Emotional Intelligence", "Conflict Resolution",
+        "Project Management", "Presentation Skills", "Negotiation", "Customer Service",
+        "Interpersonal Skills", "Work Ethic", "Self-Motivation", "Organization"
+    ]
+    
+    # Combine all skills to check
+    all_skills = tech_skills + soft_skills
+    
+    # Convert job description to lowercase for case-insensitive matching
+    job_desc_lower = job_description.lower()
+    
+    # Find skills mentioned in the job description
+    found_skills = []
+    for skill in all_skills:
+        # Check for exact match or plural form
+        if skill.lower() in job_desc_lower or f"{skill.lower()}s" in job_desc_lower:
+            found_skills.append(skill)
+    
+    # If we found very few skills, add some based on the job title
+    if len(found_skills) < 3:
+        # Add skills based on job title keywords
+        title_lower = job_title.lower()
+        if "python" in title_lower or "data" in title_lower:
+            found_skills.extend(["Python", "SQL", "Data Analysis"])
+        elif "javascript" in title_lower or "frontend" in title_lower or "front-end" in title_lower:
+            found_skills.extend(["JavaScript", "HTML", "CSS", "React"])
+        elif "backend" in title_lower or "back-end" in title_lower:
+            found_skills.extend(["Node.js", "SQL", "API Design"])
+        elif "fullstack" in title_lower or "full-stack" in title_lower:
+            found_skills.extend(["JavaScript", "HTML", "CSS", "Node.js", "SQL"])
+        elif "devops" in title_lower or "cloud" in title_lower:
+            found_skills.extend(["AWS", "Docker", "CI/CD", "Kubernetes"])
+        elif "mobile" in title_lower or "android" in title_lower or "ios" in title_lower:
+            found_skills.extend(["Mobile Development", "Swift", "Kotlin", "React Native"])
+        elif "ui" in title_lower or "ux" in title_lower or "design" in title_lower:
+            found_skills.extend(["UI/UX Design", "Figma", "Adobe XD", "Wireframing"])
+        elif "product" in title_lower or "manager" in title_lower:
+            found_skills.extend(["Product Management", "Agile", "Leadership", "Communication"])
+        
+        # Add some generic soft skills
+        found_skills.extend(["Communication", "Problem Solving", "Teamwork"])
+    
+    # Remove duplicates and return
+    return list(set(found_skills))
+
+
+# Known skills detected in resumes by the regex fallback
+RESUME_SKILL_PATTERN = re.compile(r'\b(python|java|javascript|typescript|c\+\+|c#|ruby|php|swift|kotlin|go|rust|sql|html|css|react|angular|vue|node\.js|django|flask|spring|express|tensorflow|pytorch|docker|kubernetes|aws|azure|gcp|git)\b')
+
+# Section headings expected in a resume; a document needs at least two of them
+RESUME_SECTION_PATTERN = re.compile(r'\b(education|experience|employment|skills|projects|summary|objective|certifications?)\b', re.IGNORECASE)
+
+
+def is_valid_resume(text):
+    """
+    Check whether a document looks like a resume by counting the distinct section headings it mentions.
+    """
+    sections = {match.lower() for match in RESUME_SECTION_PATTERN.findall(text)}
+    return len(sections) >= 2
+
+
+def find_skill_gaps(resume_text, job_skills):
+    """
+    Detect known skills in a resume using regex and list the job skills it is missing.
+    """
+    skills = list(set(RESUME_SKILL_PATTERN.findall(resume_text.lower())))
+    detected = {skill.lower() for skill in skills}
+    missing = [skill for skill in job_skills if skill.lower() not in detected]
+    return skills, missing
@@ -0,0 +1,126 @@
+"""
+Skill gap analysis of one resume against many saved jobs for JobSkillTracker.
+The jobs' skills form a sparse job x skill incidence matrix, stored as the
+coordinates of its non-zero entries. Each distinct skill is checked against
+the resume once, and per-job coverage, gap frequency and the skills that would
+raise coverage most are computed from the matrix with NumPy in a single pass.
+"""
+
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .skill_matching import skill_key
+from .skill_taxonomy import skill_name
+
+# A job counts as a strong match from this coverage on; the ranking reports which skills get jobs there
+COVERAGE_TARGET = 0.8
+
+# (resume text, skills) -> (resume skills, the skills the resume is missing)
+FindGaps = Callable[[str, Sequence[str]], Tuple[List[str], List[str]]]
+
+
+def build_incidence(jobs: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Build the job x skill incidence matrix of saved jobs.
+
+    Skills are identified by their taxonomy key, so spellings of one skill
+    share a column that is named after its first spelling.
+
+    Returns:
+        (row index per entry, column index per entry, skill name per column)
+    """
+    columns: Dict[str, int] = {}
+    names: List[str] = []
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, job in enumerate(jobs):
+        seen = set()
+        for skill in job.get("skills") or []:
+            name = skill_name(skill).strip()
+            if not name:
+                continue
+            key = skill_key(name)
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = len(names)
+                names.append(name)
+            if column not in seen:
+                seen.add(column)
+                rows.append(row)
+                cols.append(column)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), names
+
+
+def analyze_job_gaps(resume_text: str, jobs: Sequence[Dict[str, Any]], find_gaps: FindGaps,
+                     limit: int = 10, target: float = COVERAGE_TARGET) -> dict:
+    """
+    Compare a resume with many jobs' skills.
+
+    Args:
+        jobs: Dicts with "id", "skills" (names, or dicts with a name) and optionally "title" and "company"
+        find_gaps: Detects the resume's skills and which of a list of skills it is missing
+        limit: Number of skills to rank by leverage
+        target: Coverage at which a job counts as unlocked
+
+    Returns:
+        {"skills": resume skills, "mean_coverage": ..., "jobs": per-job coverage, best first,
+         "gaps": missing skills by the number of jobs asking for them,
+         "top_skills": the skills that would raise coverage most}
+    """
+    rows, cols, names = build_incidence(jobs)
+    resume_skills, missing = find_gaps(resume_text, names)
+    missing_names = set(missing)
+    covered = np.fromiter((name not in missing_names for name in names), dtype=bool, count=len(names))
+
+    job_count = len(jobs)
+    entry_covered = covered[cols]
+    skill_counts = np.bincount(rows, minlength=job_count)
+    covered_counts = np.bincount(rows, weights=entry_covered, minlength=job_count)
+    # Jobs without skills have no coverage (NaN), and are left out of the mean
+    with np.errstate(invalid="ignore", divide="ignore"):
+        coverage = covered_counts / skill_counts
+
+    # Each missing entry is a skill a job asks for that the resume lacks
+    gap_rows, gap_cols = rows[~entry_covered], cols[~entry_covered]
+    gap_frequency = np.bincount(gap_cols, minlength=len(names))
+    # Learning a skill raises the coverage of each job missing it by 1 / that job's skill count
+    coverage_gain = np.bincount(gap_cols, weights=1.0 / skill_counts[gap_rows], minlength=len(names))
+    with np.errstate(invalid="ignore"):
+        unlockable = (coverage < target) & ((covered_counts + 1) / np.maximum(skill_counts, 1) >= target)
+    jobs_unlocked = np.bincount(gap_cols[unlockable[gap_rows]], minlength=len(names))
+
+    # Per-job skill lists; entries are already grouped by job, in order
+    boundaries = np.searchsorted(rows, np.arange(job_count + 1)).tolist()
+    entry_names = [names[column] for column in cols.tolist()]
+    entry_flags = entry_covered.tolist()
+    coverage_values = np.round(coverage, 3).tolist()
+    job_results = []
+    for index, job in enumerate(jobs):
+        start, end = boundaries[index], boundaries[index + 1]
+        job_coverage = coverage_values[index]
+        job_results.append({
+            "id": job.get("id"),
+            "title": job.get("title") or "",
+            "company": job.get("company") or "",
+            "coverage": None if job_coverage != job_coverage else job_coverage,
+            "matched": [entry_names[entry] for entry in range(start, end) if entry_flags[entry]],
+            "missing": [entry_names[entry] for entry in range(start, end) if not entry_flags[entry]],
+        })
+    job_results.sort(key=lambda job: -1.0 if job["coverage"] is None else job["coverage"], reverse=True)
+
+    gap_columns = np.flatnonzero(gap_frequency)
+    gap_columns = gap_columns[np.argsort(-gap_frequency[gap_columns], kind="stable")]
+    # Ranked by coverage gain, then by the number of jobs the skill appears in
+    ranked = np.lexsort((-gap_frequency, -coverage_gain))
+    ranked = ranked[gap_frequency[ranked] > 0][:limit]
+    return {
+        "skills": resume_skills,
+        "mean_coverage": round(float(np.nanmean(coverage)), 3) if skill_counts.any() else None,
+        "jobs": job_results,
+        "gaps": [{"skill": names[column], "jobs": int(gap_frequency[column]),
+                  "share": round(float(gap_frequency[column]) / job_count, 3)} for column in gap_columns],
+        "top_skills": [{"skill": names[column], "jobs": int(gap_frequency[column]),
+                        "mean_coverage_gain": round(float(coverage_gain[column]) / job_count, 3),
+                        "jobs_unlocked": int(jobs_unlocked[column])} for column in ranked],
+    }
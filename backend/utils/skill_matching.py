@@ -0,0 +1,231 @@
+"""
+Semantic skill matching for JobSkillTracker.
+Resume skill gap analysis compares skills by embedding similarity instead of
+exact names, so "Postgres" covers "PostgreSQL" and "CI/CD pipelines" covers
+"CI/CD". Every skill is mapped to its taxonomy name first, and each
+taxonomy skill is embedded once into a matrix that is saved to disk and
+memory-mapped by every worker. The skill mentions of a request are embedded
+together, and all job skills are compared with all resume skills in one
+matrix product.
+
+Embeddings come from one of two backends:
+- hashing (default): hashed character n-grams and words, computed locally
+  with no network calls. It matches spelling variants, not synonyms, so
+  synonyms rely on the taxonomy's aliases.
+- openai: the OpenAI embeddings API (OPENAI_EMBEDDING_MODEL), whose vectors
+  also place related names close together.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .log import get_logger
+from .paths import data_path
+from .skill_tagger import tag_skills
+from .skill_taxonomy import all_skills, canonical_skill, is_known_skill
+
+logger = get_logger(__name__)
+
+SKILL_EMBEDDINGS = os.getenv("SKILL_EMBEDDINGS", "hashing")
+# Directory of the saved taxonomy embedding matrices
+SKILL_EMBEDDINGS_PATH = os.getenv("SKILL_EMBEDDINGS_PATH") or data_path("skill_embeddings")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+# Cosine similarity at which two skills count as the same; the backends' similarities have different scales
+DEFAULT_THRESHOLDS = {"hashing": 0.75, "openai": 0.6}
+
+HASHING_DIMENSIONS = 1024
+# Embeddings of skills outside the taxonomy kept in memory
+MENTION_CACHE_SIZE = 4096
+
+# Words that qualify a skill without changing it ("CI/CD pipelines", "Python programming")
+GENERIC_WORDS = {
+    "skill", "skills", "experience", "knowledge", "pipeline", "pipelines", "framework", "frameworks",
+    "programming", "language", "languages", "tools", "tooling", "platform", "proficiency", "development",
+    "strong", "excellent", "good", "solid",
+}
+_WORD_RE = re.compile(r"[\w+#./-]+")
+_PARENTHESES_RE = re.compile(r"[()]")
+# Longest skill name looked up verbatim in a resume, in words
+MAX_PHRASE_WORDS = 4
+
+# Turns a batch of texts into unit vectors, one row per text
+EmbedFunction = Callable[[Sequence[str]], np.ndarray]
+
+
+@lru_cache(maxsize=MENTION_CACHE_SIZE)
+def skill_key(skill: str) -> str:
+    """
+    The text embedded for a skill: its taxonomy name without generic qualifiers.
+    "Amazon Web Services (AWS)" and "RESTful APIs" are tried as each part and
+    in the singular, so they reach the taxonomy name.
+    """
+    variants = []
+    for part in [skill] + [part for part in _PARENTHESES_RE.split(skill) if part.strip()]:
+        words = [word for word in _WORD_RE.findall(part.lower()) if word not in GENERIC_WORDS]
+        text = " ".join(words) if words else part
+        variants += [text, text[:-1]] if text.endswith("s") else [text]
+    for variant in variants:
+        if is_known_skill(variant):
+            return canonical_skill(variant)
+    return canonical_skill(variants[0])
+
+
+def _words(text: str) -> List[str]:
+    return [word.strip(".-/") for word in _WORD_RE.findall(text.lower())]
+
+
+def _phrases(text: str) -> set:
+    """Every run of up to MAX_PHRASE_WORDS words in text, for looking up skill names."""
+    words = _words(text)
+    return {" ".join(words[start:start + length])
+            for length in range(1, MAX_PHRASE_WORDS + 1) for start in range(len(words) - length + 1)}
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def hashing_embed(texts: Sequence[str]) -> np.ndarray:
+    """Embed texts as hashed character 3- and 4-grams plus whole words."""
+    matrix = np.zeros((len(texts), HASHING_DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        lowered = text.lower()
+        padded = f" {lowered} "
+        features = [padded[i:i + n] for n in (3, 4) for i in range(len(padded) - n + 1)]
+        # Whole words count double, so "Java" stays apart from "JavaScript"
+        features += [f"w:{word}" for word in _WORD_RE.findall(lowered)] * 2
+        for feature in features:
+            matrix[row, zlib.crc32(feature.encode()) % HASHING_DIMENSIONS] += 1.0
+    return _normalize_rows(matrix)
+
+
+def openai_embed(texts: Sequence[str]) -> np.ndarray:
+    """Embed texts with the OpenAI embeddings API."""
+    from .llm import openai_embeddings
+    from .providers import get_openai_client
+
+    client = get_openai_client()
+    if client is None:
+        raise RuntimeError("SKILL_EMBEDDINGS=openai needs OPENAI_API_KEY")
+    response = openai_embeddings(client, model=OPENAI_EMBEDDING_MODEL, input=list(texts))
+    vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+EMBEDDING_BACKENDS = {"hashing": hashing_embed, "openai": openai_embed}
+
+
+class SkillMatcher:
+    """
+    Skill similarity over a persisted matrix of taxonomy skill embeddings.
+
+    Args:
+        backend: "hashing" or "openai"
+        threshold: Cosine similarity at which two skills match (default per backend)
+        path: Directory where the taxonomy matrix is saved and memory-mapped from
+        embed: Embedding function, overriding the backend's
+    """
+
+    def __init__(self, backend: str = SKILL_EMBEDDINGS, threshold: Optional[float] = None,
+                 path: str = SKILL_EMBEDDINGS_PATH, embed: Optional[EmbedFunction] = None):
+        if embed is None and backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown SKILL_EMBEDDINGS backend: {backend}")
+        self.backend = backend
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("SKILL_MATCH_THRESHOLD", DEFAULT_THRESHOLDS.get(backend, 0.75)))
+        self.path = path
+        self._embed = embed or EMBEDDING_BACKENDS[backend]
+        self.skills = all_skills()
+        self._rows = {skill: row for row, skill in enumerate(self.skills)}
+        self._mentions: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.matrix = self._load_matrix()
+
+    def _fingerprint(self) -> str:
+        """Identifies the backend and taxonomy a saved matrix was built from."""
+        model = OPENAI_EMBEDDING_MODEL if self.backend == "openai" else HASHING_DIMENSIONS
+        source = "\n".join([self.backend, str(model)] + [skill_key(skill) for skill in self.skills])
+        return hashlib.sha1(source.encode()).hexdigest()[:12]
+
+    def _load_matrix(self) -> np.ndarray:
+        filename = os.path.join(self.path, f"{self.backend}-{self._fingerprint()}.npy")
+        if os.path.exists(filename):
+            return np.load(filename, mmap_mode="r")
+        matrix = self._embed([skill_key(skill) for skill in self.skills])
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # Written under a temporary name, so workers starting at once never map a partial file
+            temporary = f"{filename}.{os.getpid()}.tmp"
+            saved = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.float32, shape=matrix.shape)
+            saved[:] = matrix
+            saved.flush()
+            del saved
+            os.replace(temporary, filename)
+            logger.info(f"Saved {len(self.skills)} skill embeddings to {filename}")
+            return np.load(filename, mmap_mode="r")
+        except OSError as e:
+            logger.warning(f"Could not save skill embeddings to {filename}: {str(e)}")
+            return matrix
+
+    def embed(self, skills: Sequence[str]) -> np.ndarray:
+        """
+        Embed skills as rows of a matrix. Taxonomy skills are read from the
+        taxonomy matrix; other skills are embedded in one batch and cached.
+        """
+        keys = [skill_key(skill) for skill in skills]
+        vectors: List[Any] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is not None:
+                    vectors[index] = self.matrix[row]
+                elif key in self._mentions:
+                    self._mentions.move_to_end(key)
+                    vectors[index] = self._mentions[key]
+                elif key not in missing:
+                    missing.append(key)
+        if missing:
+            embedded = dict(zip(missing, self._embed(missing)))
+            with self._lock:
+                for key, vector in embedded.items():
+                    self._mentions[key] = vector
+                while len(self._mentions) > MENTION_CACHE_SIZE:
+                    self._mentions.popitem(last=False)
+            vectors = [vector if vector is not None else embedded[key] for vector, key in zip(vectors, keys)]
+        if not vectors:
+            return np.zeros((0, self.matrix.shape[1]), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def covered(self, job_skills: Sequence[str], resume_skills: Sequence[str]) -> List[bool]:
+        """For each job skill, whether some resume skill matches it."""
+        if not job_skills or not resume_skills:
+            return [False] * len(job_skills)
+        similarity = self.embed(job_skills) @ self.embed(resume_skills).T
+        return (similarity.max(axis=1) >= self.threshold).tolist()
+
+    def find_skill_gaps(self, resume_text: str, job_skills: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """
+        Detect skills in a resume and list the job skills it is missing.
+
+        Resume skills are the dictionary skills the tagger finds, plus job
+        skills named verbatim in the resume.
+        """
+        skills = tag_skills(resume_text)["skills"]
+        known = {canonical_skill(skill) for skill in skills}
+        phrases = _phrases(resume_text)
+        for skill in job_skills:
+            if canonical_skill(skill) not in known and " ".join(_words(skill)) in phrases:
+                skills.append(skill)
+                known.add(canonical_skill(skill))
+        missing = [skill for skill, found in zip(job_skills, self.covered(job_skills, skills)) if not found]
+        return skills, missing
@@ -0,0 +1,237 @@
+"""
+Local skill extraction for JobSkillTracker.
+A dictionary tagger that finds skills in job postings on the CPU and scores
+its confidence, so that /extract-job-skills only sends ambiguous postings to
+the LLM.
+
+Every mention of a dictionary skill (the taxonomy, its aliases and
+EXTRA_SKILLS) is scored from its context. Names that are also common words
+("Go", "Spring", "Leadership") only count when they appear in a list of other
+skills, after a phrase like "experience with", or with their technical
+capitalization. A posting's confidence falls with every capitalized term
+that looks like a skill but is not in the dictionary, since those are the
+skills only the LLM would find. Skills written in lowercase and missing from
+the dictionary go unnoticed, so the dictionary should grow with the postings.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from .providers import LazyProvider
+from .skill_taxonomy import SKILL_ALIASES, SOFT_SKILLS, TECHNICAL_SKILLS
+
+# Use the local extractor in /extract-job-skills (postings below the confidence threshold still go to the LLM)
+LOCAL_SKILL_EXTRACTOR = os.getenv("LOCAL_SKILL_EXTRACTOR", "0") == "1"
+LOCAL_SKILL_CONFIDENCE = float(os.getenv("LOCAL_SKILL_CONFIDENCE", "0.8"))
+# Processes running the tagger (0 runs it in a worker thread of the API process)
+LOCAL_SKILL_PROCESSES = int(os.getenv("LOCAL_SKILL_PROCESSES", "0"))
+
+# Common tools and topics found in postings that are not in the taxonomy
+EXTRA_SKILLS = [
+    "Scala", "R", "Bash", "Perl", "MATLAB", "Dart", "Flutter", "React Native", "Next.js", "jQuery", "Redux",
+    "FastAPI", "Ruby on Rails", ".NET", "Pandas", "NumPy", "scikit-learn", "Spark", "Hadoop", "Kafka",
+    "Airflow", "Snowflake", "Databricks", "dbt", "Tableau", "Power BI", "Excel", "Elasticsearch", "RabbitMQ",
+    "DynamoDB", "Cassandra", "SQLite", "Jenkins", "GitHub Actions", "Ansible", "Helm", "Prometheus", "Grafana",
+    "Datadog", "Nginx", "Unix", "Distributed Systems", "System Design", "Unit Testing", "Selenium", "Jest",
+    "Cypress", "Figma", "Sketch", "Adobe XD", "UI/UX Design", "Wireframing", "Computer Vision", "Deep Learning",
+    "LLMs", "Data Engineering", "ETL", "Data Visualization", "Statistics", "A/B Testing", "Cybersecurity",
+    "Networking", "Mobile Development", "iOS", "Android", "Product Management", "Stakeholder Management",
+    "Mentoring", "Spring Boot", "Hibernate", "JUnit", "Maven", "Gradle", "Looker", "MLflow", "MLOps", "Splunk",
+    "Data Modeling", "Responsive Design", "Penetration Testing", "Backend Development", "Frontend Development",
+]
+
+# Other phrasings of dictionary skills seen in postings
+TAGGER_ALIASES = {
+    "communicate": "Communication",
+    "collaborate": "Collaboration",
+    "unit tests": "Unit Testing",
+    "a/b tests": "A/B Testing",
+    "a/b test": "A/B Testing",
+    "data models": "Data Modeling",
+    "penetration tests": "Penetration Testing",
+}
+
+# Dictionary names that are also ordinary words, so need supporting context
+AMBIGUOUS_NAMES = {
+    "go", "rust", "swift", "spring", "express", "less", "sass", "oracle", "ai", "rest", "node", "tf", "ts", "py",
+    "ml", "r", "excel", "dart", "spark", "helm", "sketch", "jest", "statistics", "networking", "leadership",
+    "organization", "negotiation", "creativity", "mentoring", "android",
+}
+
+# Phrases after which a clause's mentions are almost certainly skills
+CUE_PATTERN = re.compile(
+    r"\b(experience (?:with|in|using)|knowledge of|proficien\w* (?:in|with)|familiar\w* with|expertise in|"
+    r"skills? in|background in|understanding of|fluen\w* in|using|such as|including)\b", re.IGNORECASE)
+
+# A clause is the text between sentence or line breaks
+CLAUSE_PATTERN = re.compile(r"[^.;:\n!?]+(?:\.(?=\w)[^.;:\n!?]*)*")
+WORD_PATTERN = re.compile(r"[A-Za-z][\w+#./'-]*")
+
+# Capitalized words that look like skill names but are ordinary words
+NON_SKILL_WORDS = {
+    "experience", "knowledge", "strong", "excellent", "ability", "degree", "bachelor's", "master's", "phd",
+    "equivalent", "years", "year", "etc", "other", "similar", "including", "plus", "preferred", "required",
+    "minimum", "the", "a", "an", "and", "or", "our", "we", "you", "your", "us", "i", "team", "teams", "work",
+    "working", "must", "nice", "bonus", "familiarity", "understanding", "proficiency", "tools", "technologies",
+    "frameworks", "languages", "platforms", "services", "systems", "remote", "hybrid", "senior", "junior",
+    "full-time", "requirements", "responsibilities", "qualifications", "certifications", "certification",
+}
+# Words ending a job title ("Data Engineer"), whose capitalized run is not a skill
+ROLE_WORDS = {
+    "engineer", "engineers", "developer", "developers", "manager", "analyst", "scientist", "designer", "architect",
+    "lead", "intern", "specialist", "administrator", "consultant", "director",
+}
+# Longest run of unknown capitalized words counted as one possible skill
+MAX_UNKNOWN_WORDS = 3
+
+# Skills needed before a posting can be confidently handled locally
+MIN_SKILLS = 3
+# Confidence a skill needs to be returned, and below which a candidate is ignored rather than counted as uncertain
+KEEP_CONFIDENCE = 0.5
+UNCERTAIN_CONFIDENCE = 0.3
+
+
+def _build_dictionary() -> Tuple[Dict[str, str], Dict[str, str], "re.Pattern"]:
+    """Map lowercase surface forms to skill names and compile one pattern matching them all."""
+    forms: Dict[str, str] = {}
+    casing: Dict[str, str] = {}
+    for skill in TECHNICAL_SKILLS + SOFT_SKILLS + EXTRA_SKILLS:
+        forms[skill.lower()] = skill
+        casing[skill.lower()] = skill
+    for alias, skill in list(SKILL_ALIASES.items()) + list(TAGGER_ALIASES.items()):
+        forms.setdefault(alias.lower(), skill)
+    # Longest forms first, so "Google Cloud Platform" wins over "Google Cloud"
+    alternatives = "|".join(re.escape(form).replace(r"\ ", r"[\s-]+") for form in sorted(forms, key=len, reverse=True))
+    pattern = re.compile(rf"(?<![\w+#.])(?:{alternatives})s?(?![\w+#]|\.\w)", re.IGNORECASE)
+    return forms, casing, pattern
+
+
+_FORMS, _CASING, _SKILL_PATTERN = _build_dictionary()
+
+
+def _surface_form(text: str) -> str:
+    form = re.sub(r"[\s-]+", " ", text.lower())
+    if form not in _FORMS and form.endswith("s") and form[:-1] in _FORMS:
+        form = form[:-1]
+    return form
+
+
+def _mention_confidence(text: str, start: int, end: int, form: str, in_list: bool) -> float:
+    has_cue = bool(CUE_PATTERN.search(text, 0, start))
+    if form not in AMBIGUOUS_NAMES:
+        return 0.95 if has_cue or in_list else 0.9
+    confidence = 0.3
+    if in_list:
+        confidence += 0.35
+    if has_cue:
+        confidence += 0.25
+    canonical = _CASING.get(form)
+    at_sentence_start = not text[:start].strip(" \t\"'(-*•")
+    if canonical and text[start:end].rstrip("s") == canonical and canonical != canonical.capitalize():
+        confidence += 0.25  # Distinctive casing such as "AI", "TensorFlow" or "iOS"
+    elif canonical and text[start:end] == canonical and not at_sentence_start and canonical[0].isupper():
+        confidence += 0.15
+    return min(confidence, 0.95)
+
+
+def _unknown_terms(clause: str, mentions: List[Tuple[int, int]]) -> List[str]:
+    """Runs of capitalized or code-like words in a clause that are not dictionary skills."""
+    terms = []
+    run: List[str] = []
+    for index, match in enumerate(WORD_PATTERN.finditer(clause)):
+        word = match.group().rstrip(".'")
+        if word.lower() in ROLE_WORDS:
+            run = []
+            continue
+        inside = any(start < match.end() and end > match.start() for start, end in mentions)
+        # The clause's first word is capitalized as the start of a sentence
+        looks_like_skill = (index > 0 and not inside and word.lower() not in NON_SKILL_WORDS
+                            and (word[0].isupper() or any(character.isdigit() or character in "+#" for character in word)))
+        if looks_like_skill:
+            run.append(word)
+            continue
+        if 0 < len(run) <= MAX_UNKNOWN_WORDS:
+            terms.append(" ".join(run))
+        run = []
+    if 0 < len(run) <= MAX_UNKNOWN_WORDS:
+        terms.append(" ".join(run))
+    return terms
+
+
+def tag_skills(job_description: str, job_title: str = "") -> dict:
+    """
+    Find the skills in a job posting and how confident the tagger is in them.
+
+    Returns:
+        {"skills": [...], "skill_confidence": {skill: 0-1}, "confidence": 0-1,
+         "unknown": [terms that may be skills missing from the dictionary]}
+    """
+    text = f"{job_title}\n{job_description}" if job_title else job_description
+    title_end = len(job_title)
+    scores: Dict[str, List[float]] = {}
+    unknown: List[str] = []
+    for clause_match in CLAUSE_PATTERN.finditer(text):
+        clause = clause_match.group()
+        matches = list(_SKILL_PATTERN.finditer(clause))
+        # Unknown skills are looked for in the description's clauses that mention or introduce skills
+        if clause_match.start() >= title_end and (matches or CUE_PATTERN.search(clause)):
+            unknown.extend(_unknown_terms(clause, [(match.start(), match.end()) for match in matches]))
+        if not matches:
+            continue
+        # A clause mentioning several skills is a skill list
+        in_list = len(matches) > 1
+        for match in matches:
+            form = _surface_form(match.group())
+            skill = _FORMS.get(form)
+            if skill is None:
+                continue
+            scores.setdefault(skill, []).append(
+                _mention_confidence(clause, match.start(), match.end(), form, in_list))
+
+    skill_confidence = {}
+    for skill, mentions in scores.items():
+        missing = 1.0
+        for confidence in mentions:
+            missing *= 1.0 - confidence
+        skill_confidence[skill] = round(1.0 - missing, 3)
+    skills = [skill for skill, confidence in skill_confidence.items() if confidence >= KEEP_CONFIDENCE]
+    uncertain = sum(1 for confidence in skill_confidence.values()
+                    if UNCERTAIN_CONFIDENCE <= confidence < KEEP_CONFIDENCE)
+    unknown = list(dict.fromkeys(unknown))
+
+    confidence = 0.0
+    if skills:
+        coverage = len(skills) / (len(skills) + len(unknown) + uncertain)
+        mean = sum(skill_confidence[skill] for skill in skills) / len(skills)
+        confidence = coverage * mean * min(1.0, len(skills) / MIN_SKILLS)
+    return {
+        "skills": skills,
+        "skill_confidence": {skill: skill_confidence[skill] for skill in skills},
+        "confidence": round(confidence, 3),
+        "unknown": unknown,
+    }
+
+
+def _create_pool() -> ProcessPoolExecutor:
+    # Spawned rather than forked, since the API process runs threads that may hold locks
+    return ProcessPoolExecutor(max_workers=LOCAL_SKILL_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+
+_pool = LazyProvider("skill_tagger_pool", _create_pool)
+
+
+async def tag_skills_async(job_description: str, job_title: str = "") -> dict:
+    """Run tag_skills in the tagger process pool, or in a worker thread without one."""
+    if LOCAL_SKILL_PROCESSES > 0:
+        return await asyncio.get_running_loop().run_in_executor(_pool.get(), tag_skills, job_description, job_title)
+    return await asyncio.to_thread(tag_skills, job_description, job_title)
+
+
+def shutdown_tagger_pool() -> None:
+    if _pool.initialized:
+        _pool.get().shutdown(wait=False, cancel_futures=True)
+        _pool.reset()
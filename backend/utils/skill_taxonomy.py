@@ -0,0 +1,150 @@
+"""
+Skill taxonomy for JobSkillTracker.
+This module maps the many spellings of a skill ("Postgres", "postgresql",
+"PostgreSQL") to one canonical name so that skill sets can be compared and
+used as cache keys.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Canonical skill names
+TECHNICAL_SKILLS = [
+    "Python", "JavaScript", "TypeScript", "Java", "C++", "C#", "Ruby", "PHP", "Swift", "Kotlin", "Go", "Rust",
+    "React", "Angular", "Vue.js", "Node.js", "Express", "Django", "Flask", "Spring", "ASP.NET",
+    "SQL", "NoSQL", "MongoDB", "PostgreSQL", "MySQL", "Oracle", "Firebase", "Redis",
+    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Terraform", "CI/CD", "Git", "Linux",
+    "Machine Learning", "AI", "Data Science", "Data Analysis", "TensorFlow", "PyTorch", "NLP",
+    "HTML", "CSS", "SASS", "LESS", "Bootstrap", "Tailwind CSS",
+    "REST API", "GraphQL", "Microservices", "Serverless", "WebSockets",
+    "Agile", "Scrum", "Kanban", "JIRA", "Confluence", "DevOps"
+]
+
+SOFT_SKILLS = [
+    "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Adaptability",
+    "Time Management", "Leadership", "Creativity", "Attention to Detail", "Collaboration",
+    "Analytical Thinking", "Decision Making", "Emotional Intelligence", "Conflict Resolution",
+    "Project Management", "Presentation Skills", "Negotiation", "Customer Service",
+    "Interpersonal Skills", "Work Ethic", "Self-Motivation", "Organization"
+]
+
+# Alternative spellings and abbreviations, keyed by normalized form
+SKILL_ALIASES = {
+    "py": "Python",
+    "python3": "Python",
+    "js": "JavaScript",
+    "ecmascript": "JavaScript",
+    "ts": "TypeScript",
+    "cpp": "C++",
+    "c plus plus": "C++",
+    "csharp": "C#",
+    "c sharp": "C#",
+    "golang": "Go",
+    "reactjs": "React",
+    "react.js": "React",
+    "angularjs": "Angular",
+    "vue": "Vue.js",
+    "vuejs": "Vue.js",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "express.js": "Express",
+    "expressjs": "Express",
+    "postgres": "PostgreSQL",
+    "postgre": "PostgreSQL",
+    "psql": "PostgreSQL",
+    "mongo": "MongoDB",
+    "amazon web services": "AWS",
+    "microsoft azure": "Azure",
+    "gcp": "Google Cloud",
+    "google cloud platform": "Google Cloud",
+    "k8s": "Kubernetes",
+    "ci cd": "CI/CD",
+    "continuous integration": "CI/CD",
+    "github": "Git",
+    "ml": "Machine Learning",
+    "artificial intelligence": "AI",
+    "natural language processing": "NLP",
+    "data analytics": "Data Analysis",
+    "tf": "TensorFlow",
+    "html5": "HTML",
+    "css3": "CSS",
+    "scss": "SASS",
+    "tailwind": "Tailwind CSS",
+    "rest": "REST API",
+    "restful api": "REST API",
+    "rest apis": "REST API",
+    "microservice": "Microservices",
+    "websocket": "WebSockets",
+    "jira": "JIRA",
+    "communication skills": "Communication",
+    "written communication": "Communication",
+    "verbal communication": "Communication",
+    "team work": "Teamwork",
+    "problem-solving": "Problem Solving",
+    "problem solving skills": "Problem Solving",
+    "leadership skills": "Leadership",
+}
+
+_SEPARATOR_RE = re.compile(r"[\s_]+")
+_STRIP_RE = re.compile(r"^[^\w+#.]+|[^\w+#]+$")
+
+
+def _normalize(name: str) -> str:
+    """Lowercase a skill name and collapse whitespace and surrounding punctuation."""
+    return _SEPARATOR_RE.sub(" ", _STRIP_RE.sub("", name.strip().lower()))
+
+
+_CANONICAL: Dict[str, str] = {}
+for _skill in TECHNICAL_SKILLS + SOFT_SKILLS:
+    _CANONICAL[_normalize(_skill)] = _skill
+for _alias, _skill in SKILL_ALIASES.items():
+    _CANONICAL[_normalize(_alias)] = _skill
+
+
+def canonical_skill(name: str) -> str:
+    """
+    Return the canonical name of a skill.
+
+    Skills that are not in the taxonomy are returned in normalized form so that
+    case and spacing differences still compare equal.
+    """
+    normalized = _normalize(name)
+    return _CANONICAL.get(normalized, normalized)
+
+
+def skill_name(skill: Any) -> str:
+    """Return the name of a skill given as a string or a dict with a name/skill field."""
+    if isinstance(skill, dict):
+        return str(skill.get("name") or skill.get("skill") or "")
+    return str(skill)
+
+
+def canonical_skill_set(skills: Iterable[Any]) -> Tuple[str, ...]:
+    """Return the sorted, de-duplicated canonical names of a list of skills."""
+    names = {canonical_skill(skill_name(skill)) for skill in skills}
+    names.discard("")
+    return tuple(sorted(names))
+
+
+def is_known_skill(name: str) -> bool:
+    """Return True if the skill (or one of its aliases) is in the taxonomy."""
+    return _normalize(name) in _CANONICAL
+
+
+def all_skills() -> List[str]:
+    """Return every canonical skill name in the taxonomy."""
+    return TECHNICAL_SKILLS + SOFT_SKILLS
+
+
+def skill_diff(before: Iterable[Any], after: Iterable[Any]) -> Tuple[List[str], List[str]]:
+    """
+    Return the skills added and removed going from before to after.
+
+    Skills are compared by canonical name and returned as named in after
+    (added) or before (removed), in their original order.
+    """
+    before_names = {canonical_skill(skill_name(skill)) for skill in before}
+    after_names = {canonical_skill(skill_name(skill)) for skill in after}
+    added = [skill_name(skill) for skill in after if canonical_skill(skill_name(skill)) not in before_names]
+    removed = [skill_name(skill) for skill in before if canonical_skill(skill_name(skill)) not in after_names]
+    return added, removed
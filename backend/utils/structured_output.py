@@ -0,0 +1,330 @@
+"""
+Structured output utilities for JobSkillTracker.
+This module turns raw LLM responses into validated Python objects. It provides
+the output schemas used by the API and agents, an incremental JSON parser that
+can consume streamed chunks, and a single targeted repair pass for malformed
+output so that each logical request costs one LLM call.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM response cannot be parsed or validated."""
+
+    def __init__(self, message: str, raw_text: str = ""):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+
+# Output schemas
+# The fields each schema is about are required, so an object with other keys
+# (a mis-keyed reply or a stray object in prose) fails validation and is
+# repaired instead of parsing to an empty result.
+
+class SkillList(BaseModel):
+    skills: List[str]
+
+
+class JobExtraction(BaseModel):
+    company: str
+    role: str
+    key_skills: List[str]
+    requirements: List[str] = Field(default_factory=list)
+    salary: str = ""
+
+
+class PresentSkill(BaseModel):
+    name: str
+    type: str = "technical"
+    level: str = "intermediate"
+
+
+class MissingSkill(BaseModel):
+    name: str
+    type: str = "technical"
+    importance: str = "medium"
+
+
+class ResumeAnalysis(BaseModel):
+    present_skills: List[PresentSkill] = Field(default_factory=list)
+    missing_skills: List[MissingSkill] = Field(default_factory=list)
+    strengths: List[str] = Field(default_factory=list)
+    improvement_areas: List[str] = Field(default_factory=list)
+
+
+class ProjectRecommendation(BaseModel):
+    title: str
+    description: str = ""
+    skills_targeted: List[str] = Field(default_factory=list)
+    time_estimate: str = ""
+    difficulty: str = ""
+    resources: List[str] = Field(default_factory=list)
+
+
+class ResourceItem(BaseModel):
+    title: str
+    description: str = ""
+
+
+class SkillResources(BaseModel):
+    skill: str
+    projects: List[ResourceItem] = Field(default_factory=list)
+    websites: List[ResourceItem] = Field(default_factory=list)
+    videos: List[ResourceItem] = Field(default_factory=list)
+    books: List[ResourceItem] = Field(default_factory=list)
+
+
+class LearningResources(BaseModel):
+    resources: List[SkillResources]
+
+
+ProjectRecommendationList = List[ProjectRecommendation]
+
+Schema = Union[Type[BaseModel], Any]
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def _adapter(schema: Schema) -> TypeAdapter:
+    """Return a cached TypeAdapter so schema compilation happens once per process."""
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = TypeAdapter(schema)
+        _adapters[schema] = adapter
+    return adapter
+
+
+def json_schema(schema: Schema) -> Dict[str, Any]:
+    """Return the JSON schema for an output schema (for provider response schemas)."""
+    return _adapter(schema).json_schema()
+
+
+# Incremental JSON parsing
+
+class IncrementalJSONParser:
+    """
+    Incrementally scans streamed text for complete top-level JSON values.
+
+    Prose, markdown code fences and other text outside of JSON values are
+    skipped. Each call to feed() only scans the newly received characters, so
+    parsing a streamed response is linear in its length.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of text and return any JSON values completed by it."""
+        self._buffer += chunk
+        values = []
+        buffer = self._buffer
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if self._start < 0:
+                if char in "{[":
+                    self._start = index
+                    self._stack = ["}" if char == "{" else "]"]
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append("}" if char == "{" else "]")
+            elif char in "}]":
+                if self._stack and self._stack[-1] == char:
+                    self._stack.pop()
+                if not self._stack:
+                    candidate = buffer[self._start:index + 1]
+                    try:
+                        values.append(json.loads(candidate))
+                    except json.JSONDecodeError:
+                        repaired = _strip_trailing_commas(candidate)
+                        try:
+                            values.append(json.loads(repaired))
+                        except json.JSONDecodeError:
+                            pass
+                    self._start = -1
+        self._pos = len(buffer)
+        return values
+
+    def pending(self) -> Optional[str]:
+        """Return the text of an unfinished JSON value, if one is open."""
+        if self._start < 0:
+            return None
+        return self._buffer[self._start:]
+
+    def close_pending(self) -> Optional[str]:
+        """Return the unfinished JSON value with open strings and brackets closed."""
+        text = self.pending()
+        if text is None:
+            return None
+        if self._in_string:
+            text += '"'
+        text = _strip_trailing_commas(text.rstrip().rstrip(",").rstrip(":"))
+        return text + "".join(reversed(self._stack))
+
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_CODE_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+
+
+def _strip_trailing_commas(text: str) -> str:
+    return _TRAILING_COMMA_RE.sub(r"\1", text)
+
+
+def extract_json_values(text: str) -> List[Any]:
+    """
+    Extract all top-level JSON values from a response.
+
+    If the response ends inside an unterminated value (for example because the
+    model hit its token limit), the value is closed and included as well.
+    """
+    parser = IncrementalJSONParser()
+    values = parser.feed(_CODE_FENCE_RE.sub("", text))
+    pending = parser.pending()
+    # Drop the trailing partial member until the truncated value closes cleanly
+    while pending:
+        tail_parser = IncrementalJSONParser()
+        tail_parser.feed(pending)
+        try:
+            values.append(json.loads(tail_parser.close_pending()))
+            break
+        except json.JSONDecodeError:
+            pending = pending[:pending.rfind(",")] if "," in pending else ""
+    return values
+
+
+# Validation
+
+def _coerce(value: Any, schema: Schema) -> Any:
+    """
+    Adapt common near-misses to the schema shape.
+
+    Models often wrap a list in an object ({"projects": [...]}) when a list was
+    asked for, or return a bare list when an object with a single list field
+    was asked for.
+    """
+    is_model = isinstance(schema, type) and issubclass(schema, BaseModel)
+    if is_model and isinstance(value, list):
+        list_fields = [name for name, field in schema.model_fields.items()
+                       if getattr(field.annotation, "__origin__", None) in (list, List)]
+        if len(list_fields) == 1:
+            return {list_fields[0]: value}
+    if not is_model and isinstance(value, dict) and len(value) == 1:
+        (inner,) = value.values()
+        if isinstance(inner, list):
+            return inner
+    return value
+
+
+def validate_output(value: Any, schema: Schema) -> Any:
+    """Validate an already decoded JSON value against a schema."""
+    try:
+        return _adapter(schema).validate_python(_coerce(value, schema))
+    except ValidationError as e:
+        raise StructuredOutputError(f"Output did not match schema: {e}") from e
+
+
+def parse_structured(text: str, schema: Schema) -> Any:
+    """
+    Parse and validate an LLM response against a schema.
+
+    The fast path is a direct json.loads of the response (what provider JSON
+    mode returns). Otherwise every JSON value found in the text is tried in
+    order, and the first one that validates is returned.
+    """
+    if text is None:
+        raise StructuredOutputError("Empty response", "")
+    try:
+        return validate_output(json.loads(text), schema)
+    except (json.JSONDecodeError, StructuredOutputError):
+        pass
+
+    last_error = "No JSON value found in response"
+    for value in extract_json_values(text):
+        try:
+            return validate_output(value, schema)
+        except StructuredOutputError as e:
+            last_error = str(e)
+    raise StructuredOutputError(last_error, text)
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert a validated output (model or list of models) to plain JSON types."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, list):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+REPAIR_PROMPT = """The following response was supposed to be JSON matching this schema:
+{schema}
+
+It failed validation with this error:
+{error}
+
+Response:
+{response}
+
+Return ONLY the corrected JSON, nothing else before or after."""
+
+
+def generate_structured(call: Callable[[str], str], prompt: str, schema: Schema,
+                        repair: bool = True) -> Any:
+    """
+    Run one LLM call and return its validated, structured output.
+
+    Args:
+        call: Function that sends a prompt to the LLM and returns the response text
+        prompt: The prompt to send
+        schema: Pydantic model or type describing the expected output
+        repair: Whether to spend one extra call repairing output that fails validation
+
+    Returns:
+        The validated output
+
+    Raises:
+        StructuredOutputError: If the output could not be parsed or repaired
+    """
+    response_text = call(prompt)
+    try:
+        return parse_structured(response_text, schema)
+    except StructuredOutputError as e:
+        if not repair:
+            raise
+        repair_prompt = REPAIR_PROMPT.format(
+            schema=json.dumps(json_schema(schema)),
+            error=str(e)[:1000],
+            response=response_text
+        )
+        return parse_structured(call(repair_prompt), schema)
+
+
+def openai_json_kwargs() -> Dict[str, Any]:
+    """Extra chat.completions.create arguments enabling OpenAI JSON mode."""
+    return {"response_format": {"type": "json_object"}}
+
+
+def gemini_json_config(generation_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a Gemini generation config with JSON output mode enabled."""
+    config = dict(generation_config)
+    config["response_mime_type"] = "application/json"
+    return config
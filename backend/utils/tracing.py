@@ -0,0 +1,223 @@
+"""
+Request tracing for JobSkillTracker.
+This module records nested timing spans for API requests, CrewAI runs, LLM calls
+and Vectara HTTP calls. Spans use the OpenTelemetry data model (trace/span ids,
+parent span id, start/end time in unix nanoseconds, attributes, status) and are
+exported as one JSON object per line to a file and/or the console, so they can be
+inspected locally or shipped to an OpenTelemetry collector with a file receiver.
+
+Configuration:
+    TRACING_ENABLED: "1" to record spans (default "1")
+    TRACE_EXPORTER: Comma-separated list of "file" and/or "console"; spans are
+        not exported when empty (default "")
+    TRACE_FILE: Path of the JSONL file exporter (default "traces.jsonl" in DATA_DIR)
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from .paths import data_path, ensure_parent
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "")
+TRACE_FILE = os.getenv("TRACE_FILE") or data_path("traces.jsonl")
+
+SERVICE_NAME = "jobskilltracker-api"
+
+logger = logging.getLogger(__name__)
+
+# The span currently active in this task or thread
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation within a trace.
+
+    Args:
+        name: Span name, e.g. "POST /process-job" or "llm.openai"
+        kind: OpenTelemetry span kind ("SERVER", "CLIENT" or "INTERNAL")
+        parent: Parent span; a new trace is started when None
+        attributes: Initial span attributes
+    """
+
+    def __init__(self, name: str, kind: str = "INTERNAL", parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message = ""
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano = None
+        self._start = time.perf_counter()
+        self.duration_ms = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_time_unix_nano is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        self.end_time_unix_nano = self.start_time_unix_nano + int(self.duration_ms * 1e6)
+        if self.status == "UNSET":
+            self.status = "OK"
+        for processor in _processors:
+            try:
+                processor(self)
+            except Exception as e:
+                logger.error(f"Error exporting span {self.name}: {str(e)}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "resource": {"service.name": SERVICE_NAME},
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class JSONLSpanExporter:
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            ensure_parent(self.path)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def console_span_exporter(span: Span) -> None:
+    """Log a one-line summary of a finished span."""
+    logger.info(f"{span.name} {span.duration_ms:.1f}ms {span.status}",
+                extra={"trace_id": span.trace_id, "span_id": span.span_id, "duration_ms": span.duration_ms})
+
+
+# Callables invoked with every finished span (exporters, metrics)
+_processors: List[Callable[[Span], None]] = []
+
+
+def add_span_processor(processor: Callable[[Span], None]) -> None:
+    """Register a callable that receives every finished span."""
+    _processors.append(processor)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, kind: str = "INTERNAL", attributes: Optional[Dict[str, Any]] = None):
+    """
+    Record a span around a block of code, nested under the current span.
+
+    Exceptions raised in the block mark the span as failed and are re-raised.
+    The context is copied by asyncio tasks and asyncio.to_thread, so spans
+    started in worker threads are parented correctly.
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+    span = Span(name, kind=kind, parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+class _NoopSpan:
+    """Span stand-in used when tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def set_error(self, error: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware recording a server span for each HTTP request.
+
+    The span covers the whole response, including streamed bodies, and is named
+    after the matched route template (e.g. "POST /process-job").
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        attributes = {"http.method": method, "http.target": scope.get("path", "")}
+        with start_span(f"{method} {scope.get('path', '')}", kind="SERVER", attributes=attributes) as span:
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "ERROR"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    span.name = f"{method} {route.path}"
+                    span.set_attribute("http.route", route.path)
+
+
+def _configure_exporters() -> None:
+    exporters = {name.strip() for name in TRACE_EXPORTER.split(",") if name.strip()}
+    if "file" in exporters:
+        add_span_processor(JSONLSpanExporter(TRACE_FILE))
+    if "console" in exporters:
+        add_span_processor(console_span_exporter)
+
+
+if TRACING_ENABLED:
+    _configure_exporters()
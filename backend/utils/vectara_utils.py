@@ -12,6 +12,11 @@ from typing import List, Dict, Any, Optional
 import httpx
 from dotenv import load_dotenv
 
+from .log import get_logger, log_payload
+from .tracing import start_span
+
+logger = get_logger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -21,8 +26,9 @@ VECTARA_CUSTOMER_ID = os.getenv("VECTARA_CUSTOMER_ID", "2310034097")
 VECTARA_CORPUS_ID = os.getenv("VECTARA_CORPUS_ID", "4")
 
 # Vectara API endpoints - updated to ensure correct version
-VECTARA_INDEX_ENDPOINT = "https://api.vectara.io/v1/index"
-VECTARA_QUERY_ENDPOINT = "https://api.vectara.io/v1/query"
+VECTARA_API_URL = os.getenv("VECTARA_API_URL", "https://api.vectara.io").rstrip("/")
+VECTARA_INDEX_ENDPOINT = f"{VECTARA_API_URL}/v1/index"
+VECTARA_QUERY_ENDPOINT = f"{VECTARA_API_URL}/v1/query"
 
 # Simple API client for Vectara with improved error handling and authentication
 class VectaraClient:
@@ -35,7 +41,23 @@ class VectaraClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
-        print(f"Initialized VectaraClient with customer_id: {customer_id} and API key: {api_key[:5]}...")
+        logger.info(f"Initialized VectaraClient with customer_id: {customer_id} and API key: {api_key[:5]}...")
+    
+    async def _post(self, operation, endpoint, payload, timeout):
+        """POST a JSON payload to a Vectara endpoint inside a tracing span"""
+        with start_span(f"vectara.{operation}", kind="CLIENT",
+                        attributes={"http.method": "POST", "http.url": endpoint}) as span:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    endpoint,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=timeout
+                )
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code != 200:
+                span.status = "ERROR"
+            return response
     
     async def test_connection(self):
         """Test the Vectara connection"""
@@ -49,23 +71,17 @@ class VectaraClient:
                 }]
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    VECTARA_QUERY_ENDPOINT,
-                    headers=self.headers,
-                    json=test_request,
-                    timeout=10.0
-                )
+            response = await self._post("test_connection", VECTARA_QUERY_ENDPOINT, test_request, timeout=10.0)
+            
+            logger.debug(f"Vectara test connection status: {response.status_code}")
+            logger.debug(f"Vectara test response headers: {response.headers}")
+            if response.status_code != 200:
+                logger.error(f"Vectara test connection error: {response.text}")
+                return False
                 
-                print(f"Vectara test connection status: {response.status_code}")
-                print(f"Vectara test response headers: {response.headers}")
-                if response.status_code != 200:
-                    print(f"Vectara test connection error: {response.text}")
-                    return False
-                    
-                return True
+            return True
         except Exception as e:
-            print(f"Vectara test connection exception: {str(e)}")
+            logger.error(f"Vectara test connection exception: {str(e)}")
             return False
     
     async def index_document(self, corpus_id, document, metadata=None):
@@ -88,51 +104,39 @@ class VectaraClient:
                 }
             }
             
-            print(f"Indexing document with ID: {document_id}")
+            logger.debug(f"Indexing document with ID: {document_id}")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    VECTARA_INDEX_ENDPOINT,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30.0
-                )
+            response = await self._post("index", VECTARA_INDEX_ENDPOINT, payload, timeout=30.0)
+            
+            logger.debug(f"Vectara index response status: {response.status_code}")
+            if response.status_code != 200:
+                logger.error(f"Error indexing document: {response.text}")
+                return None
                 
-                print(f"Vectara index response status: {response.status_code}")
-                if response.status_code != 200:
-                    print(f"Error indexing document: {response.text}")
-                    return None
-                    
-                result = response.json()
-                print(f"Successfully indexed document: {result}")
-                return result
+            result = response.json()
+            logger.debug(f"Successfully indexed document: {result}")
+            return result
         except Exception as e:
-            print(f"Exception in index_document: {str(e)}")
+            logger.error(f"Exception in index_document: {str(e)}")
             return None
     
     async def query(self, query_request):
         """Query Vectara for relevant documents"""
         try:
-            print(f"Querying Vectara with request: {json.dumps(query_request)[:200]}...")
+            log_payload(logger, "Vectara query request", query_request)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    VECTARA_QUERY_ENDPOINT,
-                    headers=self.headers,
-                    json=query_request,
-                    timeout=30.0
-                )
+            response = await self._post("query", VECTARA_QUERY_ENDPOINT, query_request, timeout=30.0)
+            
+            logger.debug(f"Vectara query response status: {response.status_code}")
+            if response.status_code != 200:
+                logger.error(f"Error querying Vectara: {response.text}")
+                return {"responseSet": []}
                 
-                print(f"Vectara query response status: {response.status_code}")
-                if response.status_code != 200:
-                    print(f"Error querying Vectara: {response.text}")
-                    return {"responseSet": []}
-                    
-                result = response.json()
-                print(f"Received Vectara query response with {len(result.get('responseSet', []))} response sets")
-                return result
+            result = response.json()
+            logger.debug(f"Received Vectara query response with {len(result.get('responseSet', []))} response sets")
+            return result
         except Exception as e:
-            print(f"Exception in query: {str(e)}")
+            logger.error(f"Exception in query: {str(e)}")
             return {"responseSet": []}
 
 # Initialize Vectara client
@@ -176,14 +180,14 @@ class VectaraInterviewHelper:
             )
             
             if response:
-                print(f"Successfully indexed job description: {job_title}")
+                logger.debug(f"Successfully indexed job description: {job_title}")
                 return response.get("document_id", "")
             else:
-                print("Failed to index job description")
+                logger.warning("Failed to index job description")
                 return ""
                 
         except Exception as e:
-            print(f"Error indexing job description: {str(e)}")
+            logger.error(f"Error indexing job description: {str(e)}")
             return ""
     
     async def index_resume(self, resume_text: str, metadata: Optional[Dict] = None) -> str:
@@ -213,14 +217,14 @@ class VectaraInterviewHelper:
             )
             
             if response:
-                print("Successfully indexed resume")
+                logger.debug("Successfully indexed resume")
                 return response.get("document_id", "")
             else:
-                print("Failed to index resume")
+                logger.warning("Failed to index resume")
                 return ""
                 
         except Exception as e:
-            print(f"Error indexing resume: {str(e)}")
+            logger.error(f"Error indexing resume: {str(e)}")
             return ""
     
     async def index_interview_question(self, question: str, sample_answer: str, category: str, difficulty: str) -> str:
@@ -256,14 +260,14 @@ class VectaraInterviewHelper:
             )
             
             if response:
-                print(f"Successfully indexed interview question: {question[:30]}...")
+                logger.debug(f"Successfully indexed interview question: {question[:30]}...")
                 return response.get("document_id", "")
             else:
-                print("Failed to index interview question")
+                logger.warning("Failed to index interview question")
                 return ""
                 
         except Exception as e:
-            print(f"Error indexing interview question: {str(e)}")
+            logger.error(f"Error indexing interview question: {str(e)}")
             return ""
     
     async def get_interview_questions(self, query: str, job_description: str, resume_text: str, 
@@ -323,7 +327,7 @@ class VectaraInterviewHelper:
             return questions
             
         except Exception as e:
-            print(f"Error getting interview questions: {str(e)}")
+            logger.error(f"Error getting interview questions: {str(e)}")
             return []
     
     async def generate_interview_question(self, job_description: str, resume_text: str, 
@@ -429,7 +433,7 @@ class VectaraInterviewHelper:
             }
             
         except Exception as e:
-            print(f"Error generating interview question: {str(e)}")
+            logger.error(f"Error generating interview question: {str(e)}")
             return {
                 "question": "Tell me about your experience and how it relates to this position.",
                 "is_fallback": True
@@ -589,19 +593,19 @@ async def initialize_vectara_corpus():
     This should be called once when the application starts.
     """
     try:
-        print("Testing Vectara connection...")
+        logger.debug("Testing Vectara connection...")
         # Test connection to Vectara before proceeding
         connection_successful = await vectara_client.test_connection()
         
         if not connection_successful:
-            print("WARNING: Could not connect to Vectara. Using fallback interview questions.")
+            logger.warning("Could not connect to Vectara. Using fallback interview questions.")
             return False
             
-        print("Vectara connection successful. Using existing corpus data from https://console.vectara.com/console/corpus/key/cruzhacks/data")
+        logger.info("Vectara connection successful. Using existing corpus data from https://console.vectara.com/console/corpus/key/cruzhacks/data")
         return True
                 
-        print(f"Successfully initialized Vectara corpus with {question_count} sample interview questions")
+        logger.info(f"Successfully initialized Vectara corpus with {question_count} sample interview questions")
         return True
     except Exception as e:
-        print(f"Error initializing Vectara corpus: {str(e)}")
+        logger.error(f"Error initializing Vectara corpus: {str(e)}")
         return False